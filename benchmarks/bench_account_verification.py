@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Задержка проверки аккаунта: новая сессия на каждый вызов против общего пула.
+
+По умолчанию поднимает локальный сервер, имитирующий GetPlayerSummaries.
+С --url можно мерить реальный эндпоинт (разница заметнее из-за TLS).
+
+    python benchmarks/bench_account_verification.py --calls 500
+    python benchmarks/bench_account_verification.py --url https://api.steampowered.com/...
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.services.http_session import get_http_session, close_http_sessions
+
+
+async def player_summaries(request):
+    return web.json_response({'response': {'players': [{'steamid': request.query.get('steamids')}]}})
+
+
+async def verify_fresh_session(url: str) -> bool:
+    """Прежний вариант: своя ClientSession на каждую проверку"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, params={'steamids': '76561197960435530'}) as response:
+            data = await response.json()
+            return bool(data.get('response', {}).get('players'))
+
+
+async def verify_shared_session(url: str) -> bool:
+    async with get_http_session().get(url, params={'steamids': '76561197960435530'}) as response:
+        data = await response.json()
+        return bool(data.get('response', {}).get('players'))
+
+
+async def measure(verify, url: str, calls: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await verify(url)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return sorted(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--url', default=None)
+    args = parser.parse_args()
+
+    runner = None
+    url = args.url
+    if url is None:
+        app = web.Application()
+        app.router.add_get('/ISteamUser/GetPlayerSummaries/v2/', player_summaries)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}/ISteamUser/GetPlayerSummaries/v2/"
+
+    for name, verify in (('новая сессия', verify_fresh_session), ('общий пул', verify_shared_session)):
+        latencies = await measure(verify, url, args.calls, args.concurrency)
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+        print(f"{name:>13}: p50={p50:.2f} мс p99={p99:.2f} мс")
+
+    await close_http_sessions()
+    if runner:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
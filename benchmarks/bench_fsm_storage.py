@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Накладные расходы FSM на апдейт: MemoryStorage против RedisFSMStorage.
+
+Апдейт моделируется так, как его видит хранилище в aiogram: фильтр
+состояния читает get_state, хендлер — get_data, часть апдейтов меняет
+данные и состояние. Для Redis показаны время и число запросов к серверу
+на апдейт с чтением состояния и данных одним HMGET и без него.
+
+    python benchmarks/bench_fsm_storage.py --redis redis://localhost:6379/15 --updates 5000
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis.asyncio as aioredis
+from aiogram import types
+from aiogram.contrib.fsm_storage.memory import MemoryStorage
+
+from bot.utils.fsm_storage import RedisFSMStorage
+
+
+class CountingRedis:
+    """Считает запросы к серверу: одиночные команды и выполнение пайплайна"""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self.round_trips = 0
+
+    def pipeline(self, *args, **kwargs):
+        pipe = self._redis.pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def counted_execute(*a, **kw):
+            self.round_trips += 1
+            return await execute(*a, **kw)
+
+        pipe.execute = counted_execute
+        return pipe
+
+    def __getattr__(self, name):
+        attr = getattr(self._redis, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                self.round_trips += 1
+            return result
+
+        return counted
+
+
+async def handle_update(storage, update_id: int, chat: int):
+    """Обращения к хранилищу за один апдейт диалога"""
+    types.Update.set_current(types.Update(update_id=update_id))
+    state = await storage.get_state(chat=chat, user=chat)
+    data = await storage.get_data(chat=chat, user=chat)
+    if update_id % 3 == 0:
+        await storage.update_data(chat=chat, user=chat, step=data.get('step', 0) + 1,
+                                  account_id='76561198000000000')
+    if update_id % 3 == 1:
+        await storage.set_state(chat=chat, user=chat,
+                                state='BindAccount:waiting' if state is None else None)
+
+
+async def bench(name: str, storage, updates: int, chats: int, counter=None):
+    started = time.perf_counter()
+    for update_id in range(updates):
+        await handle_update(storage, update_id, update_id % chats)
+    elapsed = time.perf_counter() - started
+    line = f"{name:>18}: {elapsed / updates * 1e6:8.1f} мкс/апдейт"
+    if counter is not None:
+        line += f", {counter.round_trips / updates:.2f} запроса/апдейт"
+    print(line)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--redis', default=os.getenv('REDIS_URL', 'redis://localhost:6379/15'))
+    parser.add_argument('--updates', type=int, default=5000)
+    parser.add_argument('--chats', type=int, default=200)
+    args = parser.parse_args()
+
+    await bench('MemoryStorage', MemoryStorage(), args.updates, args.chats)
+
+    for name, prefetch in (('Redis без prefetch', False), ('RedisFSMStorage', True)):
+        client = aioredis.from_url(args.redis)
+        counter = CountingRedis(client)
+        storage = RedisFSMStorage(redis_client=counter, prefix=f'bench:fsm:{prefetch:d}',
+                                  prefetch=prefetch)
+        await bench(name, storage, args.updates, args.chats, counter)
+        keys = [key async for key in client.scan_iter(match=f'bench:fsm:{prefetch:d}:*')]
+        if keys:
+            await client.delete(*keys)
+        await storage.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
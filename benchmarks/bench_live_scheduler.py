@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Бенчмарк планировщика live-опросов.
+
+Ставит на отслеживание N синтетических матчей в LiveMatchUpdater с заглушкой
+вместо коллектора и измеряет задержку event loop (насколько позже просыпается
+контрольный sleep). Для сравнения режим --mode tasks воспроизводит старую
+схему «одна задача asyncio на матч».
+
+    python benchmarks/bench_live_scheduler.py --matches 50000 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.services.live_updater import LiveMatchUpdater
+
+GAMES = ['csgo', 'dota2', 'valorant', 'lol', 'wot', 'pubg']
+
+
+class StubCollector:
+    """Заглушка ExtendedStatsCollector с фиксированной задержкой ответа"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def get_live_match_updates(self, game: str, match_id: str, region: str = None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return {'match_id': match_id, 'kills': self.calls % 30}
+
+    async def close(self):
+        pass
+
+
+async def measure_lag(duration: float, tick: float = 0.05) -> list:
+    """Замерить отставание loop от запрошенного sleep"""
+    loop = asyncio.get_running_loop()
+    lags = []
+    end = loop.time() + duration
+    while loop.time() < end:
+        start = loop.time()
+        await asyncio.sleep(tick)
+        lags.append((loop.time() - start - tick) * 1000)
+    return lags
+
+
+async def run_scheduler(args, collector: StubCollector):
+    updater = LiveMatchUpdater(bot=None)
+    await updater.stats_collector.close()
+    updater.stats_collector = collector
+    updater.update_intervals = {game: args.interval for game in GAMES}
+
+    async def _noop(*_):
+        pass
+
+    updater._save_match_update = _noop
+    updater._send_update_to_user = _noop
+
+    started = time.perf_counter()
+    for i in range(args.matches):
+        await updater.start_tracking(i, GAMES[i % len(GAMES)], f'match_{i}', f'acc_{i}')
+    setup = time.perf_counter() - started
+
+    lags = await measure_lag(args.duration)
+
+    started = time.perf_counter()
+    for i in range(args.matches):
+        await updater.stop_tracking(i, GAMES[i % len(GAMES)], f'match_{i}')
+    cancel = time.perf_counter() - started
+
+    await updater.scheduler.stop()
+    return setup, cancel, lags
+
+
+async def run_tasks(args, collector: StubCollector):
+    """Старая схема: отдельная задача с бесконечным циклом на каждый матч"""
+
+    async def track(i):
+        while True:
+            await collector.get_live_match_updates(GAMES[i % len(GAMES)], f'match_{i}')
+            await asyncio.sleep(args.interval)
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(track(i)) for i in range(args.matches)]
+    setup = time.perf_counter() - started
+
+    lags = await measure_lag(args.duration)
+
+    started = time.perf_counter()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    cancel = time.perf_counter() - started
+    return setup, cancel, lags
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--matches', type=int, default=50000)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--interval', type=float, default=5.0, help='интервал опроса, сек')
+    parser.add_argument('--latency', type=float, default=0.05, help='задержка заглушки API, сек')
+    parser.add_argument('--mode', choices=['scheduler', 'tasks'], default='scheduler')
+    args = parser.parse_args()
+
+    collector = StubCollector(args.latency)
+    runner = run_scheduler if args.mode == 'scheduler' else run_tasks
+    setup, cancel, lags = await runner(args, collector)
+
+    lags.sort()
+    print(f"Режим: {args.mode}, матчей: {args.matches}, интервал: {args.interval} сек")
+    print(f"Постановка: {setup * 1000:.1f} мс, отмена: {cancel * 1000:.1f} мс")
+    print(f"Опросов выполнено: {collector.calls} ({collector.calls / args.duration:.0f}/сек)")
+    print(f"Задержка loop, мс: p50={statistics.median(lags):.2f} "
+          f"p99={lags[int(len(lags) * 0.99) - 1]:.2f} max={lags[-1]:.2f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
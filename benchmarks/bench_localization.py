@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Микробенчмарк локализации: скомпилированный каталог против прежнего
+обхода вложенных словарей.
+
+Сравниваются get_text по ключу с точками, get_text + .format и
+получение таблицы подписей отчета о матче (раньше словарь переводов
+собирался заново в каждом вызове форматтера).
+
+    python benchmarks/bench_localization.py --calls 200000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.utils.localization import Localization
+
+
+class LegacyLocalization:
+    """Прежний алгоритм: split ключа и проход по вложенным словарям на каждый вызов"""
+
+    def __init__(self, locales_path):
+        self.locales = {}
+        for file_path in locales_path.glob('*.json'):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self.locales[file_path.stem] = json.load(f)
+
+    def get_text(self, key: str, lang: str = 'en') -> str:
+        if lang not in self.locales:
+            lang = 'en'
+        value = self.locales[lang]
+        for k in key.split('.'):
+            if isinstance(value, dict) and k in value:
+                value = value[k]
+            else:
+                return f"[{key}]"
+        return value
+
+
+def legacy_report_table(language: str) -> dict:
+    """Как в прежнем format_csgo_match_report: таблица строится заново"""
+    translations = {
+        'ru': {'match_report': 'ОТЧЕТ О МАТЧЕ', 'account': 'Аккаунт', 'result': 'Результат',
+               'date': 'Дата', 'time': 'Время', 'map': 'Карта', 'player': 'Игрок',
+               'kills': 'Убийства', 'assists': 'Помощи', 'deaths': 'Смерти', 'kd': 'K/D',
+               'adr': 'ADR', 'hs': 'HS%', 'mvp': 'MVP', 'rating': 'Рейтинг',
+               'avg_kda': 'Средний KDA', 'avg_adr': 'Средний ADR', 'avg_hs': 'Средний HS%'},
+        'en': {'match_report': 'MATCH REPORT', 'account': 'Account', 'result': 'Result',
+               'date': 'Date', 'time': 'Time', 'map': 'Map', 'player': 'Player',
+               'kills': 'Kills', 'assists': 'Assists', 'deaths': 'Deaths', 'kd': 'K/D',
+               'adr': 'ADR', 'hs': 'HS%', 'mvp': 'MVP', 'rating': 'Rating',
+               'avg_kda': 'Average KDA', 'avg_adr': 'Average ADR', 'avg_hs': 'Average HS%'}
+    }
+    return translations.get(language, translations['en'])
+
+
+def timed(name: str, calls: int, fn):
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{name:>28}: {elapsed / calls * 1e9:7.0f} нс/вызов")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    catalog = Localization()
+    legacy = LegacyLocalization(catalog.locales_path)
+    calls = args.calls
+
+    print("Текст по ключу:")
+    timed('legacy get_text', calls, lambda: legacy.get_text('menu.settings', 'ru'))
+    timed('catalog get_text', calls, lambda: catalog.get_text('menu.settings', 'ru'))
+
+    print("\nТекст с подстановкой:")
+    timed('legacy get_text().format', calls,
+          lambda: legacy.get_text('subscription.active', 'ru').format(date='01.01.2027'))
+    timed('catalog format_text', calls,
+          lambda: catalog.format_text('subscription.active', 'ru', date='01.01.2027'))
+
+    print("\nТаблица подписей отчета:")
+    timed('legacy translations dict', calls, lambda: legacy_report_table('ru'))
+    timed('catalog get_section', calls, lambda: catalog.get_section('reports.csgo', 'ru'))
+
+    print("\nЯзык без файла (fallback на en):")
+    timed('legacy get_text', calls, lambda: legacy.get_text('menu.settings', 'pt-br'))
+    timed('catalog get_text', calls, lambda: catalog.get_text('menu.settings', 'pt-br'))
+
+
+if __name__ == '__main__':
+    main()
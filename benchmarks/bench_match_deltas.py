@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Размер истории live-обновлений: полные снимки против ключевых кадров с дельтами.
+
+Моделирует live-опросы матча Dota 2 (10 игроков, счет, растущий список
+событий), кодирует их так же, как MatchUpdateWriter, и печатает средний
+размер строки в байтах (компактный JSON) и время восстановления снимка.
+
+    python benchmarks/bench_match_deltas.py --polls 120 --keyframe-interval 30
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.services.match_history import replay
+from bot.utils import json_delta
+
+
+def simulate(polls: int):
+    """Последовательность снимков live-матча; между опросами меняется немногое"""
+    random.seed(7)
+    players = [
+        {
+            'account_id': 100000 + i, 'hero_id': random.randint(1, 120), 'team': i // 5,
+            'kills': 0, 'deaths': 0, 'assists': 0, 'last_hits': 0, 'denies': 0,
+            'gold': 600, 'gold_per_min': 0, 'xp_per_min': 0, 'net_worth': 600, 'level': 1,
+            'items': [0, 0, 0, 0, 0, 0]
+        }
+        for i in range(10)
+    ]
+    snapshot = {
+        'match_id': '7512345678', 'game_time': 0, 'radiant_score': 0, 'dire_score': 0,
+        'radiant_tower_state': 2047, 'dire_tower_state': 2047, 'players': players, 'events': []
+    }
+
+    snapshots = []
+    for poll in range(polls):
+        snapshot = json.loads(json.dumps(snapshot))
+        snapshot['game_time'] = poll * 30
+        for player in snapshot['players']:
+            player['last_hits'] += random.randint(0, 6)
+            player['gold'] += random.randint(50, 250)
+            player['net_worth'] += random.randint(50, 250)
+            player['gold_per_min'] = player['net_worth'] * 60 // max(snapshot['game_time'], 30)
+            player['xp_per_min'] = player['gold_per_min'] + 40
+            if random.random() < 0.1:
+                player['level'] = min(player['level'] + 1, 30)
+        if random.random() < 0.4:
+            killer = random.choice(snapshot['players'])
+            killer['kills'] += 1
+            snapshot['radiant_score' if killer['team'] == 0 else 'dire_score'] += 1
+            snapshot['events'].append({'type': 'kill', 'time': snapshot['game_time'],
+                                       'killer': killer['account_id']})
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def encode(snapshots, keyframe_interval: int):
+    """Строки (время, player_stats, is_keyframe) как их пишет MatchUpdateWriter"""
+    rows = []
+    previous, deltas = None, 0
+    started = datetime(2024, 1, 1)
+    for index, snapshot in enumerate(snapshots):
+        at = started + timedelta(seconds=30 * index)
+        if previous is not None and deltas + 1 < keyframe_interval:
+            rows.append((at, json_delta.diff(previous, snapshot), False))
+            deltas += 1
+        else:
+            rows.append((at, snapshot, True))
+            deltas = 0
+        previous = snapshot
+    return rows
+
+
+def size(value) -> int:
+    return len(json.dumps(value, separators=(',', ':')))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--polls', type=int, default=120)
+    parser.add_argument('--keyframe-interval', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    snapshots = simulate(args.polls)
+    rows = encode(snapshots, args.keyframe_interval)
+    assert [snapshot for _, snapshot in replay(rows)] == snapshots, "Восстановление не совпало"
+
+    full_bytes = sum(size(snapshot) for snapshot in snapshots)
+    delta_bytes = sum(size(stats) for _, stats, _ in rows)
+    print(f"Полные снимки: {full_bytes / len(snapshots):8.0f} байт/обновление")
+    print(f"Кадры+дельты:  {delta_bytes / len(rows):8.0f} байт/обновление "
+          f"({full_bytes / delta_bytes:.1f}x меньше)")
+
+    # Худший случай чтения: ключевой кадр и все дельты после него
+    last_keyframe = max(i for i, row in enumerate(rows) if row[2])
+    tail = rows[last_keyframe:]
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        replay(tail)
+    elapsed = (time.perf_counter() - started) / args.repeat
+    print(f"Восстановление последнего снимка ({len(tail)} строк): {elapsed * 1e6:.0f} мкс")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        replay(rows)
+    elapsed = (time.perf_counter() - started) / args.repeat
+    print(f"Вся история ({len(rows)} снимков): {elapsed * 1e3:.2f} мс")
+
+
+if __name__ == '__main__':
+    main()
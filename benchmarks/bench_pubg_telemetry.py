@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Пиковая память разбора телеметрии PUBG: json.load целиком против потока.
+
+Генерирует синтетический gzip-файл телеметрии нужного размера (в распакованном
+виде) и разбирает его в отдельном процессе каждым способом, чтобы пиковый RSS
+одного способа не влиял на другой.
+
+    python benchmarks/bench_pubg_telemetry.py --size-mb 50
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PLAYER = 'account.tracked'
+CHUNK_SIZE = 64 * 1024
+
+
+def character(account_id: str) -> dict:
+    return {
+        'name': account_id.split('.')[-1],
+        'teamId': random.randint(1, 25),
+        'health': 100,
+        'location': {
+            'x': random.uniform(0, 816000),
+            'y': random.uniform(0, 816000),
+            'z': random.uniform(0, 5000)
+        },
+        'ranking': 0,
+        'accountId': account_id
+    }
+
+
+def make_event(elapsed: float) -> dict:
+    account_id = PLAYER if random.random() < 0.01 else f'account.{random.randint(0, 99)}'
+    kind = random.choice(('LogPlayerPosition', 'LogPlayerTakeDamage', 'LogItemPickup', 'LogPlayerKillV2'))
+    event = {'_D': '2024-01-01T00:00:00.000Z', '_T': kind, 'common': {'isGame': 1}}
+    if kind == 'LogPlayerPosition':
+        event.update(character=character(account_id), elapsedTime=elapsed, numAlivePlayers=64)
+    elif kind == 'LogPlayerTakeDamage':
+        event.update(attacker=character(account_id), victim=character(f'account.{random.randint(0, 99)}'),
+                     damageTypeCategory='Damage_Gun', damageCauserName='WeapHK416_C',
+                     damage=random.uniform(1, 60))
+    elif kind == 'LogPlayerKillV2':
+        event.update(killer=character(account_id), victim=character(f'account.{random.randint(0, 99)}'),
+                     killerDamageInfo={'damageCauserName': 'WeapHK416_C', 'distance': random.uniform(100, 30000)})
+    else:
+        event.update(character=character(account_id),
+                     item={'itemId': 'Item_Heal_FirstAid_C', 'stackCount': 1, 'category': 'Use'})
+    return event
+
+
+def generate(path: str, size_mb: int):
+    """Записать gzip-файл с JSON-массивом событий ~size_mb МБ в распакованном виде"""
+    random.seed(42)
+    target = size_mb * 1024 * 1024
+    written = 0
+    elapsed = 0.0
+    with gzip.open(path, 'wt', encoding='utf-8') as out:
+        out.write('[')
+        first = True
+        while written < target:
+            elapsed += 0.1
+            line = json.dumps(make_event(elapsed))
+            out.write(line if first else ',' + line)
+            first = False
+            written += len(line) + 1
+        out.write(']')
+
+
+def run_full(path: str):
+    """Прежний подход: прочитать и распарсить документ целиком"""
+    from bot.services.pubg_telemetry import PlayerTelemetry
+
+    player = PlayerTelemetry(PLAYER)
+    with gzip.open(path, 'rb') as f:
+        for event in json.load(f):
+            player.add(event)
+    return player.summary()
+
+
+def run_stream(path: str):
+    from bot.services.pubg_telemetry import PLAYER_EVENTS, PlayerTelemetry, TelemetryStreamParser
+
+    player = PlayerTelemetry(PLAYER)
+    parser = TelemetryStreamParser()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            for event in parser.feed(chunk):
+                if event.get('_T') in PLAYER_EVENTS:
+                    player.add(event)
+    for event in parser.close():
+        if event.get('_T') in PLAYER_EVENTS:
+            player.add(event)
+    return player.summary()
+
+
+def child(mode: str, path: str):
+    started = time.perf_counter()
+    summary = (run_full if mode == 'full' else run_stream)(path)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss в Linux — килобайты
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'mode': mode, 'seconds': elapsed, 'peak_rss_mb': peak_mb,
+                      'kills': summary['kills'], 'distance': summary['distance_moved']}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=50)
+    parser.add_argument('--child', choices=('full', 'stream'))
+    parser.add_argument('--path')
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'telemetry.json.gz')
+        print(f"Генерация {args.size_mb} МБ телеметрии...")
+        generate(path, args.size_mb)
+        print(f"gzip: {os.path.getsize(path) / 1024 / 1024:.1f} МБ")
+
+        results = {}
+        for mode in ('full', 'stream'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', mode, '--path', path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+            result = results[mode]
+            print(f"{mode:>7}: пик RSS {result['peak_rss_mb']:.0f} МБ, {result['seconds']:.2f} с")
+
+        assert results['full']['kills'] == results['stream']['kills'], "Сводки не совпадают"
+        assert abs(results['full']['distance'] - results['stream']['distance']) < 1e-6
+
+
+if __name__ == '__main__':
+    main()
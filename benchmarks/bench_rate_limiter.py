@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Микробенчмарк RateLimiter: GCRA против прежней реализации со списком.
+
+Стоимость одного вызова при заполненном окне и точность лимита при
+конкурентных вызовах.
+
+    python benchmarks/bench_rate_limiter.py --calls 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.services.rate_limiter import RateLimiter
+
+
+class LegacyRateLimiter:
+    """Прежний алгоритм: пересборка списка времен запросов на каждый вызов"""
+
+    def __init__(self, per_minute: float, per_second: float):
+        self.requests = defaultdict(list)
+        self.limits = {'bench': {'per_minute': per_minute, 'per_second': per_second}}
+
+    async def wait_if_needed(self, api: str):
+        now = datetime.now()
+        limit = self.limits[api]
+        self.requests[api] = [
+            req_time for req_time in self.requests[api]
+            if now - req_time < timedelta(minutes=1)
+        ]
+        if len(self.requests[api]) >= limit['per_minute']:
+            oldest = min(self.requests[api])
+            wait_time = 60 - (now - oldest).total_seconds()
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+        recent_requests = [
+            req_time for req_time in self.requests[api]
+            if now - req_time < timedelta(seconds=1)
+        ]
+        if len(recent_requests) >= limit['per_second']:
+            wait_time = 1 - (now - min(recent_requests)).total_seconds()
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+        self.requests[api].append(now)
+
+
+def make_limiter(per_minute: int, per_second: int) -> RateLimiter:
+    return RateLimiter(limits={'bench': [(per_second, 1), (per_minute, 60)]})
+
+
+async def bench_throughput(calls: int):
+    """Лимиты заведомо не достигаются — меряем только накладные расходы"""
+    big = 10 ** 9
+    for name, limiter in (('legacy', LegacyRateLimiter(big, big)), ('gcra', make_limiter(big, big))):
+        started = time.perf_counter()
+        for _ in range(calls):
+            await limiter.wait_if_needed('bench')
+        elapsed = time.perf_counter() - started
+        print(f"{name:>7}: {calls} вызовов за {elapsed * 1000:.1f} мс, "
+              f"{elapsed / calls * 1e6:.2f} мкс/вызов")
+
+
+async def bench_accuracy(workers: int, per_second: int, duration: float):
+    """Конкурентные вызовы: сколько запросов реально прошло за `duration` секунд"""
+    for name, limiter in (('legacy', LegacyRateLimiter(10 ** 9, per_second)),
+                          ('gcra', make_limiter(10 ** 9, per_second))):
+        passed = 0
+        deadline = time.monotonic() + duration
+
+        async def worker():
+            nonlocal passed
+            while time.monotonic() < deadline:
+                await limiter.wait_if_needed('bench')
+                if time.monotonic() < deadline:
+                    passed += 1
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        expected = per_second * duration + per_second
+        print(f"{name:>7}: прошло {passed} запросов, допустимо не более {expected:.0f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=50)
+    parser.add_argument('--per-second', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print("Накладные расходы на вызов:")
+    await bench_throughput(args.calls)
+    print("\nТочность лимита при конкурентных вызовах:")
+    await bench_accuracy(args.workers, args.per_second, args.duration)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
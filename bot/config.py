@@ -22,6 +22,13 @@ class Config:
     
     # Redis for caching and timers
     REDIS_URL = os.getenv("REDIS_URL", "redis://red-d66dgfi48b3s73a4kdo0:6379")
+    FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", 24 * 3600))  # брошенные состояния FSM, seconds
+    
+    # Постоянное хранилище завершенных матчей (диск Render смонтирован в /app/data)
+    MATCH_STORE_PATH = os.getenv("MATCH_STORE_PATH", "/app/data/matches.sqlite3")
+    MATCH_STORE_MAX_BYTES = int(os.getenv("MATCH_STORE_MAX_MB", 512)) * 1024 * 1024
+    # Время последней проверки подписок — окна напоминаний не теряются при перезапуске
+    SUBSCRIPTION_CHECK_STATE_PATH = os.getenv("SUBSCRIPTION_CHECK_STATE_PATH", "/app/data/subscription_check")
     
     # Limits
     FREE_MATCHES_PER_DAY = 2
@@ -32,11 +39,26 @@ class Config:
     # Update intervals
     STATS_UPDATE_INTERVAL = 180  # seconds
     SUBSCRIPTION_CHECK_INTERVAL = 3600  # seconds
+    ADMIN_STATS_INTERVAL = 60  # seconds
+    USER_CONTEXT_TTL = int(os.getenv("USER_CONTEXT_TTL", 30))  # кэш контекста пользователя, seconds
     
     # Webhook settings (for Render)
     WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "")
     WEBHOOK_PATH = f"/webhook/{BOT_TOKEN}"
     WEBHOOK_URL = f"{WEBHOOK_HOST}{WEBHOOK_PATH}"
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", 16))
+    WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", 2000))
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", 40))
+    
+    # 'polling' (разработка) или 'webhook' (продакшен)
+    BOT_MODE = os.getenv("BOT_MODE", "polling")
+    
+    # Многопроцессный режим: число процессов-обработчиков (1 — все в одном процессе)
+    SHARD_WORKERS = int(os.getenv("BOT_WORKERS", 1))
+    SHARD_CONCURRENCY = int(os.getenv("SHARD_CONCURRENCY", 8))  # апдейтов параллельно в процессе
+    SHARD_MAX_BACKLOG = int(os.getenv("SHARD_MAX_BACKLOG", 10000))  # апдейтов в очереди шарда
+    SHARD_DRAIN_TIMEOUT = int(os.getenv("SHARD_DRAIN_TIMEOUT", 20))  # seconds
     
     # Webapp settings
     WEBAPP_HOST = "0.0.0.0"
@@ -72,6 +94,15 @@ class Config:
         '12_months': 365
     }
     
+    # Сроки хранения подробной истории по уровню подписки (дни): после них
+    # обновления матча схлопываются в итоговый снимок, а PlayerStats —
+    # до одного снимка в день
+    RETENTION_DAYS = {
+        'free': {'match_updates': 3, 'player_stats': 30},
+        'premium': {'match_updates': 30, 'player_stats': 180}
+    }
+    RETENTION_INTERVAL = int(os.getenv("RETENTION_INTERVAL", 6 * 3600))  # seconds
+
     # Game-specific update intervals (seconds)
     UPDATE_INTERVALS = {
     'csgo': 60,      # Steam API ограничения
@@ -1,4 +1,8 @@
+import asyncio
 import logging
+import os
+from alembic import command
+from alembic.config import Config
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
@@ -20,6 +24,17 @@ class Database:
             await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created successfully")
 
+    async def run_migrations(self):
+        """Применить миграции alembic (индексы и изменения существующих таблиц)"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        alembic_config = Config(os.path.join(root, 'alembic.ini'))
+        alembic_config.set_main_option('script_location', os.path.join(root, 'migrations'))
+        alembic_config.attributes['database_url'] = self.engine.url.render_as_string(hide_password=False)
+        alembic_config.attributes['configure_logger'] = False
+        # env.py запускает собственный event loop, поэтому — в отдельном потоке
+        await asyncio.to_thread(command.upgrade, alembic_config, 'head')
+        logger.info("Database migrations applied")
+
     async def drop_tables(self):
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
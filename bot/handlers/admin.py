@@ -2,9 +2,9 @@ from aiogram import types, Dispatcher
 from aiogram.dispatcher.filters import Command
 from bot.config import config
 from bot.database import async_session
-from sqlalchemy import select, update, delete
-from bot.models.user import User
+from sqlalchemy import update, delete
 from bot.models.subscription import Subscription
+from bot.services.admin_stats import get_admin_stats
 from datetime import datetime, timedelta
 
 async def admin_panel(message: types.Message):
@@ -24,30 +24,37 @@ async def admin_panel(message: types.Message):
 
 async def admin_statistics(callback: types.CallbackQuery):
     """Show bot statistics"""
-    async with async_session() as session:
-        # Total users
-        result = await session.execute(select(User))
-        total_users = len(result.scalars().all())
-        
-        # Active subscriptions
-        result = await session.execute(
-            select(Subscription).where(Subscription.is_active == True)
-        )
-        active_subs = len(result.scalars().all())
-        
-        # Today's matches
-        result = await session.execute(
-            select(Match).where(Match.start_time >= datetime.utcnow().date())
-        )
-        today_matches = len(result.scalars().all())
+    stats = await get_admin_stats().get()
+    
+    trackers = "\n".join(
+        f"   • {game.upper()}: {count}" for game, count in sorted(stats['trackers_by_game'].items())
+    ) or "   —"
+    revenue = "\n".join(
+        f"   • {currency}: {item['amount']:g} ({item['payments']} платежей, ≈ ${item['usd']:.2f})"
+        for currency, item in sorted(stats['revenue_by_currency'].items(), key=lambda kv: str(kv[0]))
+    ) or "   —"
+    quota = "\n".join(
+        f"   • {api}: {usage:.0%}" for api, usage in sorted(stats['api_quota'].items())
+    )
+    refreshed_at = datetime.fromisoformat(stats['refreshed_at'])
     
     stats_text = f"""
 📊 <b>Статистика бота:</b>
 
-👥 Всего пользователей: {total_users}
-💎 Активных подписок: {active_subs}
-🎮 Матчей сегодня: {today_matches}
-📅 Дата: {datetime.now().strftime('%d.%m.%Y %H:%M')}
+👥 Всего пользователей: {stats['users_total']} (+{stats['users_today']} сегодня)
+💎 Активных подписок: {stats['subscriptions_active']}
+🎮 Матчей сегодня: {stats['matches_today']}
+
+📡 Активные трекеры:
+{trackers}
+
+💰 Выручка (всего ≈ ${stats['revenue_usd']:.2f}):
+{revenue}
+
+⏱ Загрузка квот API:
+{quota}
+
+📅 Обновлено: {refreshed_at.strftime('%d.%m.%Y %H:%M')} UTC
     """
     
     await callback.message.edit_text(stats_text, parse_mode='HTML')
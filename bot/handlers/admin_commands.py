@@ -6,8 +6,14 @@ from bot.config import config
 from bot.database import async_session
 from sqlalchemy import select, update, delete
 from datetime import datetime, timedelta
+from bot.models.user import User
+from bot.models.subscription import Subscription
+from bot.services.user_search import search_users
+from bot.services.user_context import invalidate_user_context
 import re
 
+USER_SEARCH_PAGE_SIZE = 10
+
 class AdminStates(StatesGroup):
     managing_user = State()
     setting_subscription = State()
@@ -52,38 +58,35 @@ async def admin_process_user_search(message: types.Message, state: FSMContext):
     """Обработка поиска пользователя"""
     search_query = message.text.strip()
     
-    async with async_session() as session:
-        # Пробуем найти по Telegram ID
-        if search_query.isdigit():
-            result = await session.execute(
-                select(User).where(User.telegram_id == int(search_query))
-            )
+    if search_query.isdigit() or search_query.startswith('@'):
+        async with async_session() as session:
+            # Пробуем найти по Telegram ID
+            if search_query.isdigit():
+                result = await session.execute(
+                    select(User).where(User.telegram_id == int(search_query))
+                )
+            # Ищем по username
+            else:
+                result = await session.execute(
+                    select(User).where(User.username == search_query[1:])
+                )
             user = result.scalar_one_or_none()
-        # Ищем по username
-        elif search_query.startswith('@'):
-            result = await session.execute(
-                select(User).where(User.username == search_query[1:])
+    else:
+        # Ищем по части username (триграммный индекс, постранично)
+        users, has_next = await search_users(search_query, limit=USER_SEARCH_PAGE_SIZE)
+        
+        if len(users) == 1 and not has_next:
+            user = users[0]
+        elif users:
+            await state.update_data(search_query=search_query, search_cursors=[0, users[-1].id])
+            await message.answer(
+                format_user_search_page(users),
+                reply_markup=get_user_search_keyboard(1, has_next)
             )
-            user = result.scalar_one_or_none()
+            return
         else:
-            # Ищем по части username
-            result = await session.execute(
-                select(User).where(User.username.contains(search_query))
-            )
-            users = result.scalars().all()
-            
-            if len(users) == 1:
-                user = users[0]
-            elif len(users) > 1:
-                text = "Найдено несколько пользователей:\n\n"
-                for u in users[:10]:  # Ограничим 10 пользователями
-                    text += f"👤 {u.username} (ID: {u.telegram_id})\n"
-                
-                await message.answer(text)
-                return
-            else:
-                await message.answer("Пользователь не найден")
-                return
+            await message.answer("Пользователь не найден")
+            return
     
     if not user:
         await message.answer("Пользователь не найден")
@@ -124,6 +127,60 @@ async def admin_process_user_search(message: types.Message, state: FSMContext):
     await message.answer(text, parse_mode='HTML', reply_markup=keyboard)
     await state.finish()
 
+def format_user_search_page(users) -> str:
+    text = "Найдено несколько пользователей:\n\n"
+    for u in users:
+        text += f"👤 {u.username} (ID: {u.telegram_id})\n"
+    return text
+
+def get_user_search_keyboard(page: int, has_next: bool) -> types.InlineKeyboardMarkup:
+    """Навигация по страницам результатов поиска"""
+    keyboard = types.InlineKeyboardMarkup(row_width=3)
+    
+    navigation_buttons = []
+    if page > 1:
+        navigation_buttons.append(
+            types.InlineKeyboardButton("◀️ Назад", callback_data=f'admin_search_page:{page-1}')
+        )
+    navigation_buttons.append(
+        types.InlineKeyboardButton(f"📄 {page}", callback_data='current_page')
+    )
+    if has_next:
+        navigation_buttons.append(
+            types.InlineKeyboardButton("Вперед ▶️", callback_data=f'admin_search_page:{page+1}')
+        )
+    keyboard.add(*navigation_buttons)
+    return keyboard
+
+async def admin_user_search_page(callback: types.CallbackQuery, state: FSMContext):
+    """Страница результатов поиска пользователей"""
+    if callback.from_user.id not in config.ADMIN_IDS:
+        return
+    
+    page = int(callback.data.split(':')[1])
+    data = await state.get_data()
+    cursors = data.get('search_cursors', [])
+    if 'search_query' not in data or not 1 <= page <= len(cursors):
+        await callback.answer("Поиск устарел, введите запрос заново")
+        return
+    
+    users, has_next = await search_users(
+        data['search_query'], after_id=cursors[page - 1], limit=USER_SEARCH_PAGE_SIZE
+    )
+    if not users:
+        await callback.answer("Пользователь не найден")
+        return
+    
+    # Курсор следующей страницы — id последнего пользователя этой
+    cursors[page:] = [users[-1].id]
+    await state.update_data(search_cursors=cursors)
+    
+    await callback.message.edit_text(
+        format_user_search_page(users),
+        reply_markup=get_user_search_keyboard(page, has_next)
+    )
+    await callback.answer()
+
 async def admin_manage_subscription(callback: types.CallbackQuery):
     """Управление подпиской пользователя"""
     user_id = int(callback.data.split('_')[2])
@@ -221,6 +278,7 @@ async def admin_set_subscription(callback: types.CallbackQuery):
             
             await session.commit()
             await callback.answer(f"✅ Подписка на {months} месяцев установлена")
+    invalidate_user_context(user.telegram_id)
     
     # Возвращаемся к информации о пользователе
     await admin_process_user_search(callback.message, None)
@@ -230,5 +288,6 @@ def register_admin_handlers(dp: Dispatcher):
     dp.register_callback_query_handler(admin_users_menu, lambda c: c.data == 'admin_users')
     dp.register_callback_query_handler(admin_find_user, lambda c: c.data == 'admin_find_user')
     dp.register_message_handler(admin_process_user_search, state=AdminStates.managing_user)
+    dp.register_callback_query_handler(admin_user_search_page, lambda c: c.data.startswith('admin_search_page:'), state=AdminStates.managing_user)
     dp.register_callback_query_handler(admin_manage_subscription, lambda c: c.data.startswith('admin_sub_') and len(c.data.split('_')) == 3)
     dp.register_callback_query_handler(admin_set_subscription, lambda c: c.data.startswith('admin_sub_') and len(c.data.split('_')) == 4)
\ No newline at end of file
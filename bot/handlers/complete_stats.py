@@ -1,36 +1,29 @@
 from aiogram import types, Dispatcher
 from aiogram.dispatcher import FSMContext
+from bot.config import config
 from bot.utils.extended_formatters import ExtendedGameFormatter
+from bot.utils.localization import format_text
+from bot.services.daily_limits import consume_match
 from bot.services.extended_stats_collector import ExtendedStatsCollector
-from bot.database import async_session
-from sqlalchemy import select
+from bot.services.user_context import UserContext
+from datetime import datetime
 import asyncio
 
-async def send_complete_stats(callback: types.CallbackQuery, state: FSMContext):
+async def send_complete_stats(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Отправить полную статистику игры"""
     
     game = callback.data.replace('complete_stats_', '')
-    user_id = callback.from_user.id
-    lang = callback.from_user.language_code or 'en'
-    
-    async with async_session() as session:
-        # Получаем привязанный аккаунт
-        result = await session.execute(
-            select(GameAccount).where(
-                and_(
-                    GameAccount.user_id == user_id,
-                    GameAccount.game == game
-                )
-            )
-        )
-        account = result.scalar_one_or_none()
-        
-        if not account:
-            await callback.answer("Сначала привяжите аккаунт!")
-            return
-    
-    # Получаем полную статистику
-    collector = ExtendedStatsCollector()
+    lang = user_context.language
+    
+    # Привязанный аккаунт
+    account = user_context.account(game)
+    
+    if not account:
+        await callback.answer("Сначала привяжите аккаунт!")
+        return
+    
+    # Получаем полную статистику общим коллектором (кэш и пул соединений)
+    collector = callback.bot.get('stats_collector') or ExtendedStatsCollector()
     complete_stats = await collector.get_complete_live_stats(
         game, account.account_id, account.region
     )
@@ -84,45 +77,44 @@ async def send_complete_stats(callback: types.CallbackQuery, state: FSMContext):
     # Отправляем отчет
     await callback.message.answer(report, parse_mode='HTML')
     
-    # Закрываем коллектор
-    await collector.close()
-    
     await callback.answer()
 
-async def start_live_tracking(callback: types.CallbackQuery, state: FSMContext):
+async def start_live_tracking(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Начать live-отслеживание матча"""
     
     game = callback.data.replace('live_track_', '')
     user_id = callback.from_user.id
     
-    async with async_session() as session:
-        # Получаем привязанный аккаунт
-        result = await session.execute(
-            select(GameAccount).where(
-                and_(
-                    GameAccount.user_id == user_id,
-                    GameAccount.game == game
-                )
-            )
+    # Привязанный аккаунт
+    account = user_context.account(game)
+    
+    if not account:
+        await callback.answer("Сначала привяжите аккаунт!")
+        return
+    
+    live_updater = callback.bot.get('live_updater')
+    if not live_updater:
+        await callback.answer("❌ Ошибка системы отслеживания")
+        return
+    
+    # Матч засчитывается в дневной лимит атомарно; с подпиской — без проверки лимита
+    used = await consume_match(user_context.id, game, unlimited=user_context.has_subscription)
+    if used is None:
+        await callback.answer(
+            format_text('errors.daily_limit_reached', user_context.language,
+                        limit=config.FREE_MATCHES_PER_DAY),
+            show_alert=True
         )
-        account = result.scalar_one_or_none()
-        
-        if not account:
-            await callback.answer("Сначала привяжите аккаунт!")
-            return
-        
-        # Получаем текущий матч (в реальности нужно определять через API)
-        current_match_id = f"{game}_{account.account_id}_{int(datetime.now().timestamp())}"
-        
-        # Начинаем отслеживание
-        live_updater = callback.bot.get('live_updater')
-        if live_updater:
-            await live_updater.start_tracking(
-                user_id, game, current_match_id, account.account_id, account.region
-            )
-            await callback.answer("✅ Live-отслеживание начато!")
-        else:
-            await callback.answer("❌ Ошибка системы отслеживания")
+        return
+    
+    # Получаем текущий матч (в реальности нужно определять через API)
+    current_match_id = f"{game}_{account.account_id}_{int(datetime.now().timestamp())}"
+    
+    # Начинаем отслеживание
+    await live_updater.start_tracking(
+        user_id, game, current_match_id, account.account_id, account.region
+    )
+    await callback.answer("✅ Live-отслеживание начато!")
 
 def register_complete_stats_handlers(dp: Dispatcher):
     dp.register_callback_query_handler(send_complete_stats, lambda c: c.data.startswith('complete_stats_'))
@@ -1,11 +1,14 @@
 from aiogram import types, Dispatcher
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from bot.keyboards.games_menu import get_csgo_menu
-from bot.utils.localization import get_text
+from bot.utils.localization import format_text, get_text
 from bot.services.api_client import SteamAPIClient
+from bot.services.user_context import UserContext, get_user_context, invalidate_user_context
 from bot.database import async_session
-from sqlalchemy import select, and_
+from bot.models.game_account import GameAccount
+from bot.models.game_stats import GameSettings
 from datetime import datetime
 import asyncio
 
@@ -13,10 +16,10 @@ class CSGOStates(StatesGroup):
     waiting_for_steam_id = State()
     waiting_for_confirm = State()
 
-async def csgo_menu(callback: types.CallbackQuery, state: FSMContext):
+async def csgo_menu(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     await state.finish()
     
-    lang = callback.from_user.language_code or 'en'
+    lang = user_context.language
     guide_text = get_text('guides.csgo', lang)
     
     await callback.message.edit_text(
@@ -25,17 +28,17 @@ async def csgo_menu(callback: types.CallbackQuery, state: FSMContext):
         parse_mode='HTML'
     )
 
-async def bind_steam_account(callback: types.CallbackQuery, state: FSMContext):
-    lang = callback.from_user.language_code or 'en'
+async def bind_steam_account(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
+    lang = user_context.language
     await CSGOStates.waiting_for_steam_id.set()
     
     guide = "To find your Steam ID:\n1. Open Steam client\n2. Click on your profile name\n3. Click 'View profile'\n4. The URL will contain your Steam ID\n\nExample: https://steamcommunity.com/profiles/76561198012345678/\nSteam ID: 76561198012345678\n\nPlease enter your Steam ID:"
     
     await callback.message.edit_text(guide)
 
-async def process_steam_id(message: types.Message, state: FSMContext):
+async def process_steam_id(message: types.Message, state: FSMContext, user_context: UserContext):
     steam_id = message.text.strip()
-    lang = message.from_user.language_code or 'en'
+    lang = user_context.language
     
     # Validate Steam ID
     if not steam_id.isdigit() or len(steam_id) != 17:
@@ -43,26 +46,12 @@ async def process_steam_id(message: types.Message, state: FSMContext):
         return
     
     # Check cooldown for account change
-    async with async_session() as session:
-        result = await session.execute(
-            select(GameAccount).where(
-                and_(
-                    GameAccount.user_id == message.from_user.id,
-                    GameAccount.game == 'csgo'
-                )
-            )
+    existing_account = user_context.account('csgo')
+    if existing_account and not existing_account.can_be_changed:
+        await message.answer(
+            format_text('errors.account_change_cooldown', lang, hours=existing_account.hours_until_change)
         )
-        existing_account = result.scalar_one_or_none()
-        
-        if existing_account:
-            # Check if 48 hours have passed
-            time_diff = datetime.utcnow() - existing_account.last_changed
-            if time_diff.total_seconds() < 48 * 3600:
-                hours_left = 48 - (time_diff.total_seconds() / 3600)
-                await message.answer(
-                    get_text('errors.account_change_cooldown', lang).format(hours=round(hours_left, 1))
-                )
-                return
+        return
     
     # Verify Steam account
     api_client = SteamAPIClient()
@@ -75,7 +64,7 @@ async def process_steam_id(message: types.Message, state: FSMContext):
     await state.update_data(steam_id=steam_id)
     await CSGOStates.waiting_for_confirm.set()
     
-    confirm_text = get_text('confirm_account_binding', lang).format(
+    confirm_text = format_text('confirm_account_binding', lang,
         game='CS:GO',
         id=steam_id
     )
@@ -94,29 +83,24 @@ async def process_steam_id(message: types.Message, state: FSMContext):
     
     await message.answer(confirm_text, reply_markup=keyboard)
 
-async def confirm_binding(callback: types.CallbackQuery, state: FSMContext):
-    lang = callback.from_user.language_code or 'en'
+async def confirm_binding(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
+    lang = user_context.language
     data = await state.get_data()
     steam_id = data.get('steam_id')
     
+    if user_context.user is None:
+        await callback.answer(get_text('errors.start_first', lang))
+        return
+    
     async with async_session() as session:
         # Remove old account if exists
-        result = await session.execute(
-            select(GameAccount).where(
-                and_(
-                    GameAccount.user_id == callback.from_user.id,
-                    GameAccount.game == 'csgo'
-                )
-            )
-        )
-        old_account = result.scalar_one_or_none()
-        
+        old_account = user_context.account('csgo')
         if old_account:
-            await session.delete(old_account)
+            await session.delete(await session.get(GameAccount, old_account.id))
         
         # Create new account
         new_account = GameAccount(
-            user_id=callback.from_user.id,
+            user_id=user_context.id,
             game='csgo',
             account_id=steam_id,
             nickname=f"Steam_{steam_id[-8:]}",
@@ -124,6 +108,7 @@ async def confirm_binding(callback: types.CallbackQuery, state: FSMContext):
             is_verified=True
         )
         session.add(new_account)
+        await session.flush()
         
         # Create default settings
         settings = GameSettings(
@@ -135,42 +120,34 @@ async def confirm_binding(callback: types.CallbackQuery, state: FSMContext):
         session.add(settings)
         
         await session.commit()
+    invalidate_user_context(callback.from_user.id)
     
     await state.finish()
     
     # Get recent matches
     await get_recent_matches(callback.from_user.id, lang, callback.message)
     
-    success_text = get_text('account_bound_success', lang).format(game='CS:GO')
+    success_text = format_text('account_bound_success', lang, game='CS:GO')
     await callback.message.edit_text(success_text)
 
 async def get_recent_matches(user_id: int, lang: str, message: types.Message):
-    async with async_session() as session:
-        result = await session.execute(
-            select(GameAccount).where(
-                and_(
-                    GameAccount.user_id == user_id,
-                    GameAccount.game == 'csgo'
-                )
-            )
-        )
-        account = result.scalar_one_or_none()
-        
-        if not account:
-            return
-        
-        # Fetch matches from Steam API
-        api_client = SteamAPIClient()
-        matches = await api_client.get_csgo_matches(account.account_id, limit=3)
-        
-        if matches:
-            # Process and display matches
-            for match in matches:
-                stats_text = format_match_stats(match, lang)
-                await message.answer(stats_text, parse_mode='HTML')
-        else:
-            no_matches_text = get_text('no_recent_matches', lang)
-            await message.answer(no_matches_text)
+    account = (await get_user_context(user_id)).account('csgo')
+    
+    if not account:
+        return
+    
+    # Fetch matches from Steam API
+    api_client = SteamAPIClient()
+    matches = await api_client.get_csgo_matches(account.account_id, limit=3)
+    
+    if matches:
+        # Process and display matches
+        for match in matches:
+            stats_text = format_match_stats(match, lang)
+            await message.answer(stats_text, parse_mode='HTML')
+    else:
+        no_matches_text = get_text('no_recent_matches', lang)
+        await message.answer(no_matches_text)
 
 def format_match_stats(match_data: dict, lang: str) -> str:
     """Format match statistics into a table"""
@@ -3,20 +3,20 @@ from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from bot.keyboards.games_menu import get_game_detailed_menu
-from bot.utils.localization import get_text
+from bot.utils.localization import format_text, get_text
 from bot.services.api_client import SteamAPIClient
+from bot.services.user_context import UserContext, invalidate_user_context
 from bot.database import async_session
-from sqlalchemy import select, and_
 from datetime import datetime
 
 class DotaStates(StatesGroup):
     waiting_for_steam_id = State()
     waiting_for_confirm = State()
 
-async def dota_menu(callback: types.CallbackQuery, state: FSMContext):
+async def dota_menu(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Меню Dota 2"""
     await state.finish()
-    lang = callback.from_user.language_code or 'en'
+    lang = user_context.language
     
     guide_text = get_text('guides.dota', lang)
     await callback.message.edit_text(
@@ -25,18 +25,18 @@ async def dota_menu(callback: types.CallbackQuery, state: FSMContext):
         parse_mode='HTML'
     )
 
-async def bind_dota_account(callback: types.CallbackQuery, state: FSMContext):
+async def bind_dota_account(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Привязка Steam аккаунта для Dota 2"""
-    lang = callback.from_user.language_code or 'en'
+    lang = user_context.language
     await DotaStates.waiting_for_steam_id.set()
     
     guide = get_text('guides.dota_bind', lang)
     await callback.message.edit_text(guide)
 
-async def process_steam_id(message: types.Message, state: FSMContext):
+async def process_steam_id(message: types.Message, state: FSMContext, user_context: UserContext):
     """Обработка введённого Steam ID"""
     steam_id = message.text.strip()
-    lang = message.from_user.language_code or 'en'
+    lang = user_context.language
     
     # Валидация Steam ID
     if not steam_id.isdigit() or len(steam_id) != 17:
@@ -44,26 +44,13 @@ async def process_steam_id(message: types.Message, state: FSMContext):
         return
     
     # Проверка cooldown смены аккаунта
-    async with async_session() as session:
-        from bot.models.game_account import GameAccount
-        from bot.models.game_stats import GameSettings
-        
-        result = await session.execute(
-            select(GameAccount).where(
-                and_(
-                    GameAccount.user_id == message.from_user.id,
-                    GameAccount.game == 'dota2'
-                )
-            )
+    existing = user_context.account('dota2')
+    if existing and not existing.can_be_changed:
+        hours = existing.hours_until_change
+        await message.answer(
+            format_text('errors.account_change_cooldown', lang, hours=hours)
         )
-        existing = result.scalar_one_or_none()
-        
-        if existing and not existing.can_be_changed:
-            hours = existing.hours_until_change
-            await message.answer(
-                get_text('errors.account_change_cooldown', lang).format(hours=hours)
-            )
-            return
+        return
     
     # Проверка аккаунта через Steam API
     api_client = SteamAPIClient()
@@ -82,44 +69,34 @@ async def process_steam_id(message: types.Message, state: FSMContext):
         InlineKeyboardButton(get_text('no', lang), callback_data='cancel_dota_bind')
     )
     
-    confirm_text = get_text('confirm_account_binding', lang).format(
+    confirm_text = format_text('confirm_account_binding', lang,
         game='Dota 2',
         id=steam_id
     )
     await message.answer(confirm_text, reply_markup=keyboard)
 
-async def confirm_binding(callback: types.CallbackQuery, state: FSMContext):
+async def confirm_binding(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Подтверждение привязки аккаунта"""
-    lang = callback.from_user.language_code or 'en'
+    lang = user_context.language
     data = await state.get_data()
     steam_id = data.get('steam_id')
     
+    if user_context.user is None:
+        await callback.answer(get_text('errors.start_first', lang))
+        return
+    
     async with async_session() as session:
         from bot.models.game_account import GameAccount
         from bot.models.game_stats import GameSettings
-        from bot.models.user import User
         
         # Удаляем старый аккаунт, если есть
-        result = await session.execute(
-            select(GameAccount).where(
-                and_(
-                    GameAccount.user_id == callback.from_user.id,
-                    GameAccount.game == 'dota2'
-                )
-            )
-        )
-        old = result.scalar_one_or_none()
+        old = user_context.account('dota2')
         if old:
-            await session.delete(old)
+            await session.delete(await session.get(GameAccount, old.id))
         
         # Создаём новый
-        user_result = await session.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
-        )
-        user = user_result.scalar_one()
-        
         new_account = GameAccount(
-            user_id=user.id,
+            user_id=user_context.id,
             game='dota2',
             account_id=steam_id,
             nickname=f"Steam_{steam_id[-8:]}",
@@ -140,10 +117,11 @@ async def confirm_binding(callback: types.CallbackQuery, state: FSMContext):
         )
         session.add(settings)
         await session.commit()
+    invalidate_user_context(callback.from_user.id)
     
     await state.finish()
     await callback.message.edit_text(
-        get_text('account_bound_success', lang).format(game='Dota 2')
+        format_text('account_bound_success', lang, game='Dota 2')
     )
 
 def register_dota_handlers(dp: Dispatcher):
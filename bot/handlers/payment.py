@@ -5,8 +5,9 @@ from aiogram.types import LabeledPrice, PreCheckoutQuery, ContentType
 from bot.keyboards.main_menu import get_payment_method_menu, get_subscription_menu, get_stars_payment_keyboard
 from bot.utils.localization import get_text
 from bot.services.payment_service import PaymentService
+from bot.services.user_context import UserContext, invalidate_user_context
 from bot.database import async_session
-from sqlalchemy import select, and_
+from sqlalchemy import select
 from datetime import datetime, timedelta
 import asyncio
 
@@ -15,9 +16,9 @@ class PaymentStates(StatesGroup):
     waiting_crypto_payment = State()
     processing_stars_payment = State()
 
-async def handle_payment_callback(callback: types.CallbackQuery, state: FSMContext):
+async def handle_payment_callback(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Обработка выбора плана подписки"""
-    lang = callback.from_user.language_code or 'en'
+    lang = user_context.language
     plan_data = callback.data.replace('sub_', '')
     
     # Определяем план
@@ -56,33 +57,23 @@ async def handle_payment_callback(callback: types.CallbackQuery, state: FSMConte
     await state.update_data(plan_type=plan_data, plan=plan)
     
     # Проверяем, нет ли уже активной подписки
-    async with async_session() as session:
-        result = await session.execute(
-            select(Subscription).where(
-                and_(
-                    Subscription.user_id == callback.from_user.id,
-                    Subscription.is_active == True,
-                    Subscription.end_date > datetime.now()
-                )
-            )
-        )
-        existing_sub = result.scalar_one_or_none()
+    existing_sub = user_context.subscription if user_context.has_subscription else None
+    
+    if existing_sub:
+        # Предлагаем продлить существующую подписку
+        new_end_date = existing_sub.end_date + timedelta(days=plan['days'])
+        await state.update_data(extend_existing=True, existing_end_date=existing_sub.end_date)
         
-        if existing_sub:
-            # Предлагаем продлить существующую подписку
-            new_end_date = existing_sub.end_date + timedelta(days=plan['days'])
-            await state.update_data(extend_existing=True, existing_end_date=existing_sub.end_date)
-            
-            text = f"У вас уже есть активная подписка до {existing_sub.end_date.strftime('%d.%m.%Y')}\n"
-            text += f"Добавить {plan['name']}?\n"
-            text += f"💰 Стоимость: ${plan['price_usd']} или {plan['price_stars']} ⭐\n"
-            text += f"📅 Новая дата окончания: {new_end_date.strftime('%d.%m.%Y')}\n\n"
-            text += "Выберите способ оплаты:"
-        else:
-            text = f"Вы выбрали: {plan['name']}\n"
-            text += f"💰 Стоимость: ${plan['price_usd']} или {plan['price_stars']} ⭐\n"
-            text += f"📅 Срок действия: {plan['days']} дней\n\n"
-            text += "Выберите способ оплаты:"
+        text = f"У вас уже есть активная подписка до {existing_sub.end_date.strftime('%d.%m.%Y')}\n"
+        text += f"Добавить {plan['name']}?\n"
+        text += f"💰 Стоимость: ${plan['price_usd']} или {plan['price_stars']} ⭐\n"
+        text += f"📅 Новая дата окончания: {new_end_date.strftime('%d.%m.%Y')}\n\n"
+        text += "Выберите способ оплаты:"
+    else:
+        text = f"Вы выбрали: {plan['name']}\n"
+        text += f"💰 Стоимость: ${plan['price_usd']} или {plan['price_stars']} ⭐\n"
+        text += f"📅 Срок действия: {plan['days']} дней\n\n"
+        text += "Выберите способ оплаты:"
     
     await PaymentStates.choosing_payment_method.set()
     await callback.message.edit_text(
@@ -90,9 +81,9 @@ async def handle_payment_callback(callback: types.CallbackQuery, state: FSMConte
         reply_markup=get_payment_method_menu(lang, plan_data)
     )
 
-async def handle_payment_method(callback: types.CallbackQuery, state: FSMContext):
+async def handle_payment_method(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Обработка выбора способа оплаты"""
-    lang = callback.from_user.language_code or 'en'
+    lang = user_context.language
     data_parts = callback.data.split(':')
     method = data_parts[0].replace('pay_', '')
     plan_type = data_parts[1] if len(data_parts) > 1 else None
@@ -233,13 +224,23 @@ async def check_crypto_payment(callback: types.CallbackQuery, state: FSMContext)
     await state.finish()
 
 async def activate_subscription(user_id: int, plan_type: str, payment_method: str, transaction_id: str):
-    """Активация подписки"""
+    """Активация подписки; user_id — Telegram ID пользователя"""
     async with async_session() as session:
-        from bot.database import User, Subscription, Payment
+        from bot.models.user import User
+        from bot.models.subscription import Subscription
+        from bot.models.payment import Payment
+        
+        user = (await session.execute(
+            select(User).where(User.telegram_id == user_id)
+        )).scalar_one_or_none()
+        if user is None:
+            user = User(telegram_id=user_id)
+            session.add(user)
+            await session.flush()
         
         # Проверяем существующую подписку
         result = await session.execute(
-            select(Subscription).where(Subscription.user_id == user_id)
+            select(Subscription).where(Subscription.user_id == user.id)
         )
         subscription = result.scalar_one_or_none()
         
@@ -264,7 +265,7 @@ async def activate_subscription(user_id: int, plan_type: str, payment_method: st
         else:
             # Создаем новую подписку
             subscription = Subscription(
-                user_id=user_id,
+                user_id=user.id,
                 is_active=True,
                 plan_type=plan_type,
                 start_date=start_date,
@@ -276,7 +277,7 @@ async def activate_subscription(user_id: int, plan_type: str, payment_method: st
         
         # Создаем запись о платеже
         payment = Payment(
-            user_id=user_id,
+            user_id=user.id,
             amount=float(transaction_id.split('_')[-1]) if '_' in transaction_id else 0,
             currency='USD' if payment_method == 'crypto' else 'XTR',
             plan_type=plan_type,
@@ -289,6 +290,7 @@ async def activate_subscription(user_id: int, plan_type: str, payment_method: st
         session.add(payment)
         
         await session.commit()
+    invalidate_user_context(user_id)
 
 # Обработчики для Telegram Stars платежей
 async def pre_checkout_query_handler(pre_checkout_query: PreCheckoutQuery):
@@ -299,7 +301,7 @@ async def pre_checkout_query_handler(pre_checkout_query: PreCheckoutQuery):
         ok=True
     )
 
-async def successful_payment_handler(message: types.Message, state: FSMContext):
+async def successful_payment_handler(message: types.Message, state: FSMContext, user_context: UserContext):
     """Обработка успешной оплаты Telegram Stars"""
     payment_info = message.successful_payment
     
@@ -326,13 +328,7 @@ async def successful_payment_handler(message: types.Message, state: FSMContext):
             transaction_id=transaction_id
         )
         
-        # Получаем язык пользователя
-        async with async_session() as session:
-            result = await session.execute(
-                select(User).where(User.telegram_id == user_id)
-            )
-            user = result.scalar_one_or_none()
-            lang = user.language if user else 'en'
+        lang = user_context.language
         
         # Отправляем подтверждение
         text = get_text('success.payment_received', lang)
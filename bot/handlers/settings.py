@@ -17,15 +17,16 @@ from bot.keyboards.settings_menu import (
 )
 from bot.utils.localization import get_text
 from bot.database import async_session
-from sqlalchemy import select, and_
-from bot.models.game_account import GameAccount
+from bot.services.user_context import UserContext, get_user_context, invalidate_user_context
+from sqlalchemy import not_, update
 from bot.models.game_stats import GameSettings
+from bot.models.user import User
 
-async def settings_command(message: types.Message, state: FSMContext):
+async def settings_command(message: types.Message, state: FSMContext, user_context: UserContext):
     """Команда /settings"""
     await state.finish()
     
-    lang = message.from_user.language_code or 'en'
+    lang = user_context.language
     
     await message.answer(
         "⚙️ <b>Настройки бота</b>\n\nВыберите раздел для настройки:",
@@ -33,14 +34,14 @@ async def settings_command(message: types.Message, state: FSMContext):
         parse_mode='HTML'
     )
 
-async def settings_callback(callback: types.CallbackQuery, state: FSMContext):
+async def settings_callback(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Обработка нажатия кнопки настроек"""
     await callback.answer()
-    await settings_command(callback.message, state)
+    await settings_command(callback.message, state, user_context)
 
-async def settings_language(callback: types.CallbackQuery, state: FSMContext):
+async def settings_language(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Настройки языка"""
-    lang = callback.from_user.language_code or 'en'
+    lang = user_context.language
     
     await callback.message.edit_text(
         "🌍 <b>Выберите язык интерфейса:</b>",
@@ -48,28 +49,24 @@ async def settings_language(callback: types.CallbackQuery, state: FSMContext):
         parse_mode='HTML'
     )
 
-async def set_language(callback: types.CallbackQuery, state: FSMContext):
+async def set_language(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Установка языка"""
     lang_code = callback.data.replace('set_language_', '')
     
-    async with async_session() as session:
-        from bot.models.user import User
-        
-        result = await session.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if user:
-            user.language = lang_code
+    if user_context.user is not None:
+        async with async_session() as session:
+            await session.execute(
+                update(User).where(User.id == user_context.id).values(language=lang_code)
+            )
             await session.commit()
+        invalidate_user_context(callback.from_user.id)
     
     await callback.answer(f"✅ Язык изменен на {lang_code}")
-    await settings_language(callback, state)
+    await settings_language(callback, state, await get_user_context(callback.from_user.id))
 
-async def settings_games(callback: types.CallbackQuery, state: FSMContext):
+async def settings_games(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Настройки игр"""
-    lang = callback.from_user.language_code or 'en'
+    lang = user_context.language
     
     await callback.message.edit_text(
         "🎮 <b>Настройки игр:</b>\n\nВыберите игру для настройки:",
@@ -77,38 +74,30 @@ async def settings_games(callback: types.CallbackQuery, state: FSMContext):
         parse_mode='HTML'
     )
 
-async def game_settings_specific(callback: types.CallbackQuery, state: FSMContext):
+async def game_settings_specific(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext,
+                                 game: str = None):
     """Настройки конкретной игры"""
-    game = callback.data.replace('game_settings_', '')
-    lang = callback.from_user.language_code or 'en'
-    
-    async with async_session() as session:
-        # Получаем настройки игры
-        result = await session.execute(
-            select(GameSettings).join(GameAccount).where(
-                and_(
-                    GameAccount.user_id == callback.from_user.id,
-                    GameAccount.game == game
-                )
-            )
-        )
-        settings = result.scalar_one_or_none()
-        
-        if not settings:
-            # Создаем дефолтные настройки
-            settings_data = {
-                'auto_update': True,
-                'compare_depth': 3,
-                'detailed_stats': True,
-                'notifications': True
-            }
-        else:
-            settings_data = {
-                'auto_update': settings.auto_update,
-                'compare_depth': settings.compare_depth,
-                'detailed_stats': settings.detailed_stats,
-                'notifications': settings.notifications
-            }
+    game = game or callback.data.replace('game_settings_', '')
+    lang = user_context.language
+    
+    # Получаем настройки игры
+    settings = user_context.settings(game)
+    
+    if not settings:
+        # Создаем дефолтные настройки
+        settings_data = {
+            'auto_update': True,
+            'compare_depth': 3,
+            'detailed_stats': True,
+            'notifications': True
+        }
+    else:
+        settings_data = {
+            'auto_update': settings.auto_update,
+            'compare_depth': settings.compare_depth,
+            'detailed_stats': settings.detailed_stats,
+            'notifications': settings.notifications
+        }
     
     game_names = {
         'csgo': 'CS:GO',
@@ -127,48 +116,35 @@ async def game_settings_specific(callback: types.CallbackQuery, state: FSMContex
         parse_mode='HTML'
     )
 
-async def toggle_auto_update(callback: types.CallbackQuery, state: FSMContext):
+async def toggle_auto_update(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Включить/выключить автообновление для игры"""
     data = callback.data.replace('toggle_auto_update_', '')
     game = data
     
-    async with async_session() as session:
-        result = await session.execute(
-            select(GameSettings).join(GameAccount).where(
-                and_(
-                    GameAccount.user_id == callback.from_user.id,
-                    GameAccount.game == game
-                )
-            )
-        )
-        settings = result.scalar_one_or_none()
-        
-        if settings:
-            settings.auto_update = not settings.auto_update
+    settings = user_context.settings(game)
+    if settings:
+        async with async_session() as session:
+            auto_update = (await session.execute(
+                update(GameSettings)
+                .where(GameSettings.id == settings.id)
+                .values(auto_update=not_(GameSettings.auto_update))
+                .returning(GameSettings.auto_update)
+            )).scalar_one()
             await session.commit()
-            await callback.answer(f"✅ Автообновление {'включено' if settings.auto_update else 'выключено'}")
-        else:
-            await callback.answer("❌ Настройки игры не найдены")
+        invalidate_user_context(callback.from_user.id)
+        await callback.answer(f"✅ Автообновление {'включено' if auto_update else 'выключено'}")
+    else:
+        await callback.answer("❌ Настройки игры не найдены")
     
-    await game_settings_specific(callback, state)
+    await game_settings_specific(callback, state, await get_user_context(callback.from_user.id), game)
 
-async def set_compare_depth(callback: types.CallbackQuery, state: FSMContext):
+async def set_compare_depth(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Установить глубину сравнения"""
     game = callback.data.replace('set_compare_depth_', '')
-    lang = callback.from_user.language_code or 'en'
-    
-    async with async_session() as session:
-        result = await session.execute(
-            select(GameSettings).join(GameAccount).where(
-                and_(
-                    GameAccount.user_id == callback.from_user.id,
-                    GameAccount.game == game
-                )
-            )
-        )
-        settings = result.scalar_one_or_none()
-        
-        current_depth = settings.compare_depth if settings else 3
+    lang = user_context.language
+    
+    settings = user_context.settings(game)
+    current_depth = settings.compare_depth if settings else 3
     
     await callback.message.edit_text(
         "📊 <b>Выберите глубину сравнения:</b>\n\n"
@@ -177,31 +153,25 @@ async def set_compare_depth(callback: types.CallbackQuery, state: FSMContext):
         parse_mode='HTML'
     )
 
-async def set_depth_value(callback: types.CallbackQuery, state: FSMContext):
+async def set_depth_value(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Установить значение глубины"""
     data = callback.data.replace('set_depth_', '')
     game, depth_str = data.split('_')
     depth = int(depth_str)
     
-    async with async_session() as session:
-        result = await session.execute(
-            select(GameSettings).join(GameAccount).where(
-                and_(
-                    GameAccount.user_id == callback.from_user.id,
-                    GameAccount.game == game
-                )
+    settings = user_context.settings(game)
+    if settings:
+        async with async_session() as session:
+            await session.execute(
+                update(GameSettings).where(GameSettings.id == settings.id).values(compare_depth=depth)
             )
-        )
-        settings = result.scalar_one_or_none()
-        
-        if settings:
-            settings.compare_depth = depth
             await session.commit()
-            await callback.answer(f"✅ Глубина сравнения установлена: {depth} игр")
-        else:
-            await callback.answer("❌ Настройки игры не найдены")
+        invalidate_user_context(callback.from_user.id)
+        await callback.answer(f"✅ Глубина сравнения установлена: {depth} игр")
+    else:
+        await callback.answer("❌ Настройки игры не найдены")
     
-    await game_settings_specific(callback, state)
+    await game_settings_specific(callback, state, await get_user_context(callback.from_user.id), game)
 
 def register_settings_handlers(dp: Dispatcher):
     """Регистрация обработчиков настроек"""
@@ -4,21 +4,16 @@ from aiogram.dispatcher.filters import CommandStart
 from bot.keyboards.main_menu import get_main_menu
 from bot.utils.localization import get_text
 from bot.database import async_session
-from sqlalchemy import select
 from bot.models.user import User
+from bot.services.user_context import UserContext, invalidate_user_context
 
-async def cmd_start(message: types.Message, state: FSMContext):
+async def cmd_start(message: types.Message, state: FSMContext, user_context: UserContext):
     await state.finish()
     
-    async with async_session() as session:
-        # Check if user exists
-        result = await session.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            # Create new user
+    user = user_context.user
+    if not user:
+        # Create new user
+        async with async_session() as session:
             user = User(
                 telegram_id=message.from_user.id,
                 username=message.from_user.username,
@@ -26,18 +21,19 @@ async def cmd_start(message: types.Message, state: FSMContext):
             )
             session.add(user)
             await session.commit()
-        
-        # Get localized welcome text
-        welcome_text = get_text('welcome_message', user.language)
-        example_text = get_text('example_statistics', user.language)
-        
-        full_text = f"{welcome_text}\n\n{example_text}"
-        
-        await message.answer(
-            full_text,
-            reply_markup=get_main_menu(user.language),
-            parse_mode='HTML'
-        )
+        invalidate_user_context(message.from_user.id)
+    
+    # Get localized welcome text
+    welcome_text = get_text('welcome_message', user.language)
+    example_text = get_text('example_statistics', user.language)
+    
+    full_text = f"{welcome_text}\n\n{example_text}"
+    
+    await message.answer(
+        full_text,
+        reply_markup=get_main_menu(user.language),
+        parse_mode='HTML'
+    )
 
 async def cmd_help(message: types.Message):
     lang = message.from_user.language_code or 'en'
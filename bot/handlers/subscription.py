@@ -2,34 +2,22 @@ from aiogram import types, Dispatcher
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters import Command
 from bot.keyboards.main_menu import get_subscription_menu
-from bot.utils.localization import get_text
-from bot.database import async_session
-from sqlalchemy import select, and_
+from bot.utils.localization import format_text, get_text
+from bot.services.user_context import UserContext
 from datetime import datetime
 
-async def subscription_menu(message: types.Message, state: FSMContext):
+async def subscription_menu(message: types.Message, state: FSMContext, user_context: UserContext):
     """Меню подписки"""
     await state.finish()
     
-    lang = message.from_user.language_code or 'en'
+    lang = user_context.language
     
-    async with async_session() as session:
-        from bot.database import Subscription
-        
-        # Получаем информацию о подписке пользователя
-        result = await session.execute(
-            select(Subscription).where(
-                and_(
-                    Subscription.user_id == message.from_user.id,
-                    Subscription.is_active == True
-                )
-            )
-        )
-        subscription = result.scalar_one_or_none()
+    # Подписка пользователя из контекста
+    subscription = user_context.subscription
     
-    if subscription and subscription.end_date > datetime.now():
+    if user_context.has_subscription:
         # Пользователь имеет активную подписку
-        text = get_text('subscription.active', lang).format(
+        text = format_text('subscription.active', lang,
             date=subscription.end_date.strftime('%d.%m.%Y')
         )
         
@@ -67,29 +55,16 @@ async def subscription_menu(message: types.Message, state: FSMContext):
         parse_mode='HTML'
     )
 
-async def subscription_command(message: types.Message, state: FSMContext):
+async def subscription_command(message: types.Message, state: FSMContext, user_context: UserContext):
     """Команда /subscription"""
-    await subscription_menu(message, state)
+    await subscription_menu(message, state, user_context)
 
-async def back_to_subscription(callback: types.CallbackQuery, state: FSMContext):
+async def back_to_subscription(callback: types.CallbackQuery, state: FSMContext, user_context: UserContext):
     """Возврат в меню подписки"""
     await state.finish()
-    lang = callback.from_user.language_code or 'en'
-    
-    async with async_session() as session:
-        from bot.database import Subscription
-        
-        result = await session.execute(
-            select(Subscription).where(
-                and_(
-                    Subscription.user_id == callback.from_user.id,
-                    Subscription.is_active == True
-                )
-            )
-        )
-        subscription = result.scalar_one_or_none()
+    lang = user_context.language
     
-    has_active_sub = bool(subscription and subscription.end_date > datetime.now())
+    has_active_sub = user_context.has_subscription
     
     await callback.message.edit_text(
         get_text('subscription.choose_plan', lang),
@@ -1,15 +1,25 @@
 import asyncio
 import logging
+import signal
 from aiogram import Bot, Dispatcher, types
-from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from aiogram.contrib.middlewares.logging import LoggingMiddleware
 
 from bot.config import config
 from bot.database import Database
 from bot.handlers import register_all_handlers
 from bot.utils.timers import start_timers
+from bot.webhook import WebhookServer
+from bot.sharding import ShardSupervisor, ShardWorker
+from bot.utils.cache import close_stats_cache
+from bot.utils.fsm_storage import create_fsm_storage
+from bot.utils.match_store import close_match_store
+from bot.utils.redis_url import get_redis_url
 from bot.services.notification_service import NotificationService
+from bot.services.user_context import UserContextMiddleware
 from bot.services.live_updater import LiveMatchUpdater
+from bot.services.extended_stats_collector import ExtendedStatsCollector
+from bot.services.http_session import open_http_sessions, close_http_sessions
+from bot.services.wot_batcher import close_wot_batcher
 from database.init_db import init_database
 from database.ensure_admin import ensure_infinite_subscription
 
@@ -20,11 +30,13 @@ async def on_startup(dp: Dispatcher):
     """Действия при запуске бота"""
     logger.info("Бот запускается...")
     
+    # Пул HTTP-соединений к игровым API
+    await open_http_sessions()
+    
     # Инициализируем базу данных и создаем бесконечную подписку для @terentiev_v
     await init_database()
     
     # Обеспечиваем бесконечную подписку для @terentiev_v
-    from database.ensure_admin import ensure_infinite_subscription
     await ensure_infinite_subscription()
     
     # Инициализируем платежную систему
@@ -42,18 +54,17 @@ async def on_startup(dp: Dispatcher):
     
     logger.info("Бот успешно запущен!")
 
-async def main():
+def create_dispatcher() -> Dispatcher:
+    """Бот, диспетчер, хендлеры и сервисы — одинаково для всех режимов"""
     # Initialize bot and dispatcher
     bot = Bot(token=config.BOT_TOKEN)
-    storage = MemoryStorage()
+    # В Redis состояния переживают перезапуск и видны всем процессам-шардам
+    storage = create_fsm_storage()
     dp = Dispatcher(bot, storage=storage)
     
-    # Initialize database
-    db = Database(config.DATABASE_URL)
-    await db.create_tables()
-    
     # Register middlewares
     dp.middleware.setup(LoggingMiddleware())
+    dp.middleware.setup(UserContextMiddleware())
     
     # Register all handlers
     register_all_handlers(dp)
@@ -65,27 +76,74 @@ async def main():
     # Store services in dispatcher for access in handlers
     dp['live_updater'] = live_updater
     dp['stats_collector'] = ExtendedStatsCollector()
+    # Хендлеры получают сервисы через callback.bot
+    bot['live_updater'] = live_updater
+    bot['stats_collector'] = dp['stats_collector']
+    return dp
+
+async def shutdown(dp: Dispatcher):
+    """Остановить сервисы и закрыть соединения"""
+    await dp['live_updater'].cleanup()
+    await close_stats_cache()
+    await close_match_store()
+    await close_wot_batcher()
+    await close_http_sessions()
+    await dp.storage.close()
+    await dp.storage.wait_closed()
+    await dp.bot.session.close()
+
+def run_shard_worker(shard: int, shards: int):
+    """Точка входа процесса-обработчика шарда (многопроцессный режим)"""
+    logging.basicConfig(level=logging.INFO)
+    # Ctrl+C получает вся группа процессов; останавливает обработчиков супервизор
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    async def worker():
+        dp = create_dispatcher()
+        try:
+            await ShardWorker(dp, shard, shards).run()
+        finally:
+            await shutdown(dp)
+    
+    asyncio.run(worker())
+
+async def main():
+    dp = create_dispatcher()
+    bot = dp.bot
+    
+    # Initialize database
+    db = Database(config.DATABASE_URL)
+    await db.create_tables()
+    await db.run_migrations()
     
     # Set startup handler
     dp.register_startup_handler(on_startup)
     
-    # Start background tasks
+    # Start background tasks (в многопроцессном режиме — только во входном процессе)
     asyncio.create_task(start_timers(bot, db))
     
     print("🤖 Бот запускается...")
     print(f"🎮 Поддерживаемые игры: {list(config.GAME_METRICS.keys())}")
-    print(f"⏱️ Интервалы обновления: {live_updater.update_intervals}")
+    print(f"⏱️ Интервалы обновления: {dp['live_updater'].update_intervals}")
     print("✅ Все системы готовы!")
     
-    # Start polling (for development)
+    # SIGTERM (перезапуск контейнера) — штатная остановка с дообработкой апдейтов
+    main_task = asyncio.current_task()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+    
     try:
-        await dp.start_polling()
+        if config.SHARD_WORKERS > 1 and get_redis_url():
+            await ShardSupervisor(dp, config.SHARD_WORKERS, run_shard_worker).run()
+        elif config.BOT_MODE == 'webhook':
+            await WebhookServer(dp).run()
+        else:
+            # Start polling (for development)
+            await dp.start_polling()
+    except asyncio.CancelledError:
+        logger.info("Остановка бота...")
     finally:
         # Cleanup
-        await live_updater.cleanup()
-        await dp.storage.close()
-        await dp.storage.wait_closed()
-        await bot.session.close()
+        await shutdown(dp)
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 from bot.database import Base
 
 class DailyStats(Base):
+    """Дневные счетчики пользователя — одна строка на пользователя.
+
+    Сброс ленивый: счетчики относятся к дню из `date`, и если этот день
+    прошел, они считаются нулевыми и обнуляются при первом обращении
+    (bot.services.daily_limits). Глобального сброса в полночь нет.
+    Матчи засчитываются только через daily_limits.consume_match.
+    """
     __tablename__ = 'daily_stats'
     
     id = Column(Integer, primary_key=True)
@@ -17,38 +24,29 @@ class DailyStats(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Атомарный upsert счетчика (ON CONFLICT (user_id))
+        Index('ix_daily_stats_user_id', 'user_id', unique=True),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="daily_stats")
     
     @property
     def is_today(self):
         """Статистика за сегодня?"""
-        return self.date.date() == datetime.utcnow().date()
-    
-    def increment_matches(self, game: str = None):
-        """Увеличить счетчик матчей"""
-        self.matches_used += 1
-        self.matches_tracked += 1
-        
-        if game:
-            games = self.games_played or {}
-            games[game] = games.get(game, 0) + 1
-            self.games_played = games
-        
-        self.last_match_time = datetime.utcnow()
-        self.updated_at = datetime.utcnow()
+        return self.date is not None and self.date.date() == datetime.utcnow().date()
     
-    def can_play_more(self, free_limit: int = 2, subscription_active: bool = False) -> bool:
-        """Может ли пользователь играть больше матчей"""
-        if subscription_active:
-            return True
-        return self.matches_used < free_limit
+    @property
+    def used_today(self) -> int:
+        """Матчей за сегодня с учетом ленивого сброса"""
+        return (self.matches_used or 0) if self.is_today else 0
     
     def matches_left(self, free_limit: int = 2, subscription_active: bool = False) -> int:
         """Сколько матчей осталось"""
         if subscription_active:
             return float('inf')
-        return max(0, free_limit - self.matches_used)
+        return max(0, free_limit - self.used_today)
     
     def reset_daily(self):
         """Сбросить дневную статистику"""
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from bot.database import Base
@@ -19,9 +19,15 @@ class GameAccount(Base):
     verification_code = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Аккаунт пользователя в игре — запрос каждого игрового хендлера
+        Index('ix_game_accounts_user_game', 'user_id', 'game'),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="game_accounts")
     settings = relationship("GameSettings", back_populates="game_account", uselist=False)
+    stats = relationship("PlayerStats", back_populates="game_account")
     matches = relationship("Match", back_populates="game_account")
     
     @property
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey, Float, Index, true
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from bot.database import Base
@@ -79,6 +79,17 @@ class Match(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Отслеживаемые незавершенные матчи (таймер live-обновлений)
+        Index(
+            'ix_matches_tracked_open', 'user_id',
+            postgresql_where=(is_tracked == True) & (is_completed == False),
+            sqlite_where=(is_tracked == True) & (is_completed == False)
+        ),
+        # Статистика админки по дате начала
+        Index('ix_matches_start_time', 'start_time'),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="match_history")
     game_account = relationship("GameAccount", back_populates="matches")
@@ -132,11 +143,16 @@ class MatchUpdate(Base):
     update_time = Column(DateTime, default=datetime.utcnow)
     game_time = Column(Integer)  # Время в матче (секунды)
     round = Column(Integer)  # Раунд (CS:GO/Valorant)
-    player_stats = Column(JSON)  # Текущая статистика игрока
+    player_stats = Column(JSON)  # Снимок статистики или дельта к предыдущему
+    is_keyframe = Column(Boolean, default=True, server_default=true())  # Полный снимок?
     team_stats = Column(JSON)  # Статистика команд
     events = Column(JSON)  # События в матче
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index('ix_match_updates_match_time', 'match_id', 'update_time'),
+    )
+    
     # Relationships
     match = relationship("Match", back_populates="updates")
     
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, JSON, case, func
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from bot.database import Base
@@ -74,7 +75,7 @@ class Payment(Base):
             return int(self.amount)
         return None
     
-    @property
+    @hybrid_property
     def usd_amount(self):
         """Сумма в USD"""
         if self.currency == 'USD':
@@ -87,5 +88,15 @@ class Payment(Base):
             return self.payment_details.get('usd_value', 0) if self.payment_details else 0
         return 0
     
+    @usd_amount.expression
+    def usd_amount(cls):
+        """Та же конвертация в SQL — для SUM/GROUP BY в запросах"""
+        return case(
+            (cls.currency == 'USD', cls.amount),
+            (cls.currency == 'XTR', cls.amount * 0.01),
+            (cls.currency == 'CRYPTO', func.coalesce(cls.payment_details['usd_value'].as_float(), 0)),
+            else_=0
+        )
+    
     def __repr__(self):
         return f"<Payment(id={self.id}, user_id={self.user_id}, amount={self.amount} {self.currency}, status={self.status})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from bot.database import Base
@@ -17,6 +17,14 @@ class Subscription(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Активные подписки по дате окончания (проверка истечения)
+        Index(
+            'ix_subscriptions_active_end_date', 'end_date',
+            postgresql_where=(is_active == True), sqlite_where=(is_active == True)
+        ),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="subscription")
     
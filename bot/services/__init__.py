@@ -2,18 +2,32 @@
 Services package initialization
 """
 
+from .admin_stats import AdminStatsService, get_admin_stats
+from .api_gateway import ApiGateway, Priority, RequestShed, get_api_gateway
 from .api_client import SteamAPIClient, WoTAPIClient, RiotAPIClient, PUBGAPIClient
 from .stats_processor import StatsProcessor
 from .payment_service import PaymentService
 from .notification_service import NotificationService
 from .ai_analyzer import AIAnalyzer
+from .daily_limits import can_play_more, consume_match, matches_used_today
 from .extended_stats_collector import ExtendedStatsCollector
 from .live_updater import LiveMatchUpdater
+from .match_update_writer import MatchUpdateWriter
+from .match_history import get_match_snapshot, get_match_timeline
+from .poll_scheduler import PollScheduler
 from .payment_initializer import init_payment_system
 from .rate_limiter import RateLimiter
+from .retention import RetentionJob
 from .stats_collector import GameStatsCollector
+from .user_context import UserContext, UserContextMiddleware, get_user_context, invalidate_user_context
 
 __all__ = [
+    'AdminStatsService',
+    'get_admin_stats',
+    'ApiGateway',
+    'Priority',
+    'RequestShed',
+    'get_api_gateway',
     'SteamAPIClient',
     'WoTAPIClient',
     'RiotAPIClient',
@@ -22,9 +36,21 @@ __all__ = [
     'PaymentService',
     'NotificationService',
     'AIAnalyzer',
+    'can_play_more',
+    'consume_match',
+    'matches_used_today',
     'ExtendedStatsCollector',
     'LiveMatchUpdater',
+    'MatchUpdateWriter',
+    'get_match_snapshot',
+    'get_match_timeline',
+    'PollScheduler',
     'init_payment_system',
     'RateLimiter',
-    'GameStatsCollector'
+    'RetentionJob',
+    'GameStatsCollector',
+    'UserContext',
+    'UserContextMiddleware',
+    'get_user_context',
+    'invalidate_user_context'
 ]
\ No newline at end of file
@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+import logging
+
+from sqlalchemy import and_, func, select
+
+from bot.config import config
+from bot.database import async_session
+from bot.models.match import Match
+from bot.models.payment import Payment
+from bot.models.subscription import Subscription
+from bot.models.user import User
+from bot.utils.cache import get_stats_cache
+from .api_gateway import get_api_gateway
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'admin:snapshot'
+
+
+class AdminStatsService:
+    """Статистика для админ-панели.
+
+    Все показатели считаются агрегатными запросами (COUNT/SUM/GROUP BY) —
+    в память попадают только итоговые числа. Готовый снимок хранится в
+    общем кэше статистики и обновляется в фоне раз в `interval` секунд,
+    поэтому кнопка статистики читает один ключ независимо от числа
+    пользователей.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or config.ADMIN_STATS_INTERVAL
+
+    async def collect(self) -> Dict[str, Any]:
+        """Посчитать снимок статистики"""
+        now = datetime.utcnow()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        async with async_session() as session:
+            users_total, users_today = (await session.execute(
+                select(func.count(User.id), func.count(User.id).filter(User.created_at >= today))
+            )).one()
+
+            subscriptions = dict((await session.execute(
+                select(Subscription.plan_type, func.count(Subscription.id))
+                .where(Subscription.is_active == True)
+                .group_by(Subscription.plan_type)
+            )).all())
+
+            matches_today = (await session.execute(
+                select(func.count(Match.id)).where(Match.start_time >= today)
+            )).scalar()
+
+            trackers = dict((await session.execute(
+                select(Match.game, func.count(Match.id))
+                .where(and_(Match.is_tracked == True, Match.is_completed == False))
+                .group_by(Match.game)
+            )).all())
+
+            revenue = {
+                currency: {'payments': count, 'amount': amount or 0, 'usd': usd or 0}
+                for currency, count, amount, usd in (await session.execute(
+                    select(
+                        Payment.currency,
+                        func.count(Payment.id),
+                        func.sum(Payment.amount),
+                        func.sum(Payment.usd_amount)
+                    )
+                    .where(Payment.status == 'completed')
+                    .group_by(Payment.currency)
+                )).all()
+            }
+
+        gateway = get_api_gateway()
+        return {
+            'users_total': users_total,
+            'users_today': users_today,
+            'subscriptions_active': sum(subscriptions.values()),
+            'subscriptions_by_plan': {plan or 'unknown': count for plan, count in subscriptions.items()},
+            'matches_today': matches_today,
+            'trackers_by_game': trackers,
+            'revenue_by_currency': revenue,
+            'revenue_usd': sum(item['usd'] for item in revenue.values()),
+            'api_quota': await gateway.rate_limiter.usage(),
+            'api_requests': gateway.stats,
+            'refreshed_at': now.isoformat()
+        }
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Пересчитать снимок и положить в кэш"""
+        snapshot = await self.collect()
+        # Запас по TTL, чтобы пропущенное обновление не оставило кнопку без данных
+        await get_stats_cache().set(SNAPSHOT_KEY, snapshot, ttl=self.interval * 3)
+        return snapshot
+
+    async def get(self) -> Dict[str, Any]:
+        """Последний снимок; считается сразу, только если фоновое обновление еще не прошло"""
+        snapshot = await get_stats_cache().get(SNAPSHOT_KEY)
+        if snapshot is None:
+            snapshot = await self.refresh()
+        return snapshot
+
+
+_admin_stats: Optional[AdminStatsService] = None
+
+
+def get_admin_stats() -> AdminStatsService:
+    global _admin_stats
+    if _admin_stats is None:
+        _admin_stats = AdminStatsService()
+    return _admin_stats
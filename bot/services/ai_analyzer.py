@@ -6,8 +6,8 @@ except ImportError:
     OPENAI_AVAILABLE = False
 import json
 from typing import List, Dict, Optional
-from datetime import datetime
 from bot.config import config
+from bot.utils.cache import TTLCache
 from bot.database import async_session
 from sqlalchemy import select
 
@@ -15,7 +15,7 @@ class AIAnalyzer:
     def __init__(self):
         self.api_key = config.OPENAI_API_KEY
         self.openai_client = openai.AsyncOpenAI(api_key=self.api_key) if self.api_key else None
-        self.analysis_cache = {}  # Кэш для анализа
+        self.analysis_cache = TTLCache(max_entries=1000, default_ttl=3600)  # Кэш для анализа, 1 час
     
     async def analyze_player_performance(
         self, 
@@ -56,10 +56,7 @@ class AIAnalyzer:
             
             # Кэшируем анализ
             cache_key = f"ai_analysis:{game}:{hash(str(player_stats))}"
-            self.analysis_cache[cache_key] = {
-                'analysis': analysis,
-                'timestamp': datetime.now().timestamp()
-            }
+            self.analysis_cache.set(cache_key, analysis)
             
             return analysis
             
@@ -227,7 +224,4 @@ class AIAnalyzer:
     
     async def get_cached_analysis(self, cache_key: str) -> Optional[str]:
         """Получить кэшированный анализ"""
-        cached = self.analysis_cache.get(cache_key)
-        if cached and (datetime.now().timestamp() - cached['timestamp']) < 3600:  # 1 час
-            return cached['analysis']
-        return None
+        return self.analysis_cache.get(cache_key)
@@ -1,11 +1,14 @@
-import aiohttp
 import asyncio
 from datetime import datetime
 from bot.config import config
+from .http_session import get_http_session
+from .api_gateway import get_api_gateway
+from .wot_batcher import get_wot_batcher
 import json
 
 class SteamAPIClient:
     def __init__(self):
+        self.gateway = get_api_gateway()
         self.base_url = "https://api.steampowered.com"
         self.api_key = config.STEAM_API_KEY
     
@@ -16,11 +19,11 @@ class SteamAPIClient:
             'steamids': steam_id
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return bool(data.get('response', {}).get('players', []))
+        session = get_http_session()
+        async with self.gateway.get(session, url, 'steam', params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+                return bool(data.get('response', {}).get('players', []))
         return False
     
     async def get_csgo_matches(self, steam_id: str, limit: int = 3) -> list:
@@ -50,6 +53,8 @@ class SteamAPIClient:
 
 class WoTAPIClient:
     def __init__(self):
+        self.gateway = get_api_gateway()
+        self.batcher = get_wot_batcher()
         self.regions = {
             'eu': 'https://api.worldoftanks.eu/wot/',
             'ru': 'https://api.worldoftanks.ru/wot/',
@@ -66,32 +71,21 @@ class WoTAPIClient:
             'fields': 'nickname,account_id'
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('status') == 'ok':
-                        return data.get('data', {}).get(str(account_id), {})
+        session = get_http_session()
+        async with self.gateway.get(session, url, 'wargaming', params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+                if data.get('status') == 'ok':
+                    return data.get('data', {}).get(str(account_id), {})
         return {}
     
     async def get_player_stats(self, account_id: str, region: str = 'eu') -> dict:
-        url = f"{self.regions.get(region)}account/info/"
-        params = {
-            'application_id': self.app_id,
-            'account_id': account_id,
-            'fields': 'statistics.all,global_rating'
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('status') == 'ok':
-                        return data.get('data', {}).get(str(account_id), {})
-        return {}
+        # Одновременные запросы склеиваются в один вызов account/info/ на регион
+        return await self.batcher.get_account_info(account_id, region, 'statistics.all,global_rating')
 
 class RiotAPIClient:
     def __init__(self):
+        self.gateway = get_api_gateway()
         self.api_key = config.RIOT_API_KEY
         self.base_urls = {
             'valorant': 'https://{}.api.riotgames.com',
@@ -103,15 +97,16 @@ class RiotAPIClient:
             url = f"https://api.henrikdev.xyz/valorant/v1/account/{username}/{tag}"
             headers = {'Authorization': self.api_key}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
+            session = get_http_session()
+            async with self.gateway.get(session, url, 'henrikdev', headers=headers) as response:
+                if response.status == 200:
+                    return await response.json()
         
         return {}
 
 class PUBGAPIClient:
     def __init__(self):
+        self.gateway = get_api_gateway()
         self.api_key = config.PUBG_API_KEY
         self.base_url = "https://api.pubg.com"
     
@@ -123,8 +118,8 @@ class PUBGAPIClient:
             'Accept': 'application/vnd.api+json'
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
+        session = get_http_session()
+        async with self.gateway.get(session, url, 'pubg', params=params, headers=headers) as response:
+            if response.status == 200:
+                return await response.json()
         return {}
\ No newline at end of file
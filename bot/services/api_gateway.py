@@ -0,0 +1,118 @@
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+import aiohttp
+
+from .rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Классы приоритета исходящих запросов (меньше — важнее)"""
+    INTERACTIVE = 0  # Пользователь ждет ответа
+    LIVE = 1         # Опрос live-матча
+    BACKGROUND = 2   # Фоновое обновление
+
+
+# Приоритет по умолчанию для запросов текущей задачи; фоновые задачи
+# выставляют его один раз, не протаскивая параметр через интеграции
+request_priority: contextvars.ContextVar = contextvars.ContextVar(
+    'request_priority', default=Priority.INTERACTIVE
+)
+
+
+class RequestShed(Exception):
+    """Запрос отброшен: бюджет API исчерпан для его класса приоритета"""
+
+    def __init__(self, api: str, priority: Priority):
+        super().__init__(f"{api} budget exhausted for {priority.name} request")
+        self.api = api
+        self.priority = priority
+
+
+class ApiGateway:
+    """Единая точка исходящих HTTP-запросов к игровым API.
+
+    Перед каждым запросом берет слот в RateLimiter. Интерактивные запросы
+    ждут свой слот; live-опросы и фоновые задачи не ждут и обязаны оставить
+    часть окна всплеска свободной, иначе отбрасываются с RequestShed.
+    Так насыщение квоты опросами не увеличивает задержку ответов пользователю.
+    """
+
+    # priority -> (максимальное ожидание слота, доля окна, оставляемая свободной)
+    policies: Dict[Priority, Tuple[Optional[float], float]] = {
+        Priority.INTERACTIVE: (None, 0.0),
+        Priority.LIVE: (0, 0.3),
+        Priority.BACKGROUND: (0, 0.6),
+    }
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.stats = {priority.name: {'sent': 0, 'shed': 0} for priority in Priority}
+
+    @asynccontextmanager
+    async def request(self, session: aiohttp.ClientSession, method: str, url: str, api: str,
+                      priority: Optional[Priority] = None, **kwargs):
+        """Выполнить запрос через лимитер; используется как `async with`"""
+        if priority is None:
+            priority = request_priority.get()
+        max_wait, headroom = self.policies[priority]
+
+        if not await self.rate_limiter.acquire(api, max_wait=max_wait, headroom=headroom):
+            self.stats[priority.name]['shed'] += 1
+            raise RequestShed(api, priority)
+
+        self.stats[priority.name]['sent'] += 1
+        async with session.request(method, url, **kwargs) as response:
+            yield response
+
+    def get(self, session: aiohttp.ClientSession, url: str, api: str,
+            priority: Optional[Priority] = None, **kwargs):
+        return self.request(session, 'GET', url, api, priority=priority, **kwargs)
+
+    async def fan_out(self, api: str, fetch: Callable[[Any], Awaitable[Any]], items: Iterable,
+                      limit: Optional[int] = None) -> List:
+        """Параллельно вызвать `fetch` для каждого элемента.
+
+        Одновременно выполняется не больше `limit` вызовов (по умолчанию —
+        размер всплеска лимита API). Результаты возвращаются в порядке
+        `items`; упавшие вызовы и пустые ответы пропускаются.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        semaphore = asyncio.Semaphore(limit or self.rate_limiter.burst(api) or len(items))
+
+        async def bounded(item):
+            async with semaphore:
+                return await fetch(item)
+
+        results = await asyncio.gather(*(bounded(item) for item in items), return_exceptions=True)
+
+        collected = []
+        for item, result in zip(items, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                logger.warning(f"{api} fan-out: request for {item} failed: {result}")
+            elif result:
+                collected.append(result)
+        return collected
+
+
+_gateway: Optional[ApiGateway] = None
+
+
+def get_api_gateway() -> ApiGateway:
+    """Общий шлюз процесса; бюджет лимитов делится между репликами через Redis"""
+    global _gateway
+    if _gateway is None:
+        from bot.utils.redis_url import get_redis_url
+        _gateway = ApiGateway(RateLimiter(redis_url=get_redis_url()))
+    return _gateway
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import JSON, case, cast, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from bot.config import config
+from bot.database import async_session
+from bot.models.daily_stats import DailyStats
+
+
+def _day_start(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _increment_game(dialect: str, game: str):
+    """games_played[game] += 1 в SQL"""
+    column = DailyStats.games_played
+    count = func.coalesce(column[game].as_integer(), 0) + 1
+    if dialect == 'sqlite':
+        path = '$."' + game.replace('"', '') + '"'
+        return func.json_set(func.coalesce(column, '{}'), path, count)
+    merged = func.coalesce(cast(column, JSONB), literal_column("'{}'::jsonb")).op('||')(
+        func.jsonb_build_object(literal(game), count)
+    )
+    return cast(merged, JSON)
+
+
+async def consume_match(user_id: int, game: Optional[str] = None, limit: Optional[int] = None,
+                        unlimited: bool = False) -> Optional[int]:
+    """Засчитать матч в дневной лимит пользователя одним запросом.
+
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING: проверка лимита,
+    ленивый сброс счетчиков за прошедший день и увеличение выполняются
+    атомарно в базе, без гонок между параллельными запросами. Возвращает
+    число матчей за сегодня после засчета или None, если лимит исчерпан
+    (счетчики при этом не меняются). `unlimited` — для активной подписки:
+    матч учитывается без проверки лимита.
+    """
+    limit = config.FREE_MATCHES_PER_DAY if limit is None else limit
+    if not unlimited and limit <= 0:
+        return None
+
+    now = datetime.utcnow()
+    today = _day_start(now)
+
+    async with async_session() as session:
+        dialect = session.bind.dialect.name
+        insert = sqlite_insert if dialect == 'sqlite' else pg_insert
+        stmt = insert(DailyStats).values(
+            user_id=user_id,
+            date=now,
+            matches_used=1,
+            matches_tracked=1,
+            games_played={game: 1} if game else {},
+            last_match_time=now,
+            last_reset=now,
+            created_at=now,
+            updated_at=now
+        )
+
+        is_today = DailyStats.date >= today
+        stale = or_(DailyStats.date.is_(None), DailyStats.date < today)
+        used = func.coalesce(DailyStats.matches_used, 0)
+        games = _increment_game(dialect, game) if game else DailyStats.games_played
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyStats.user_id],
+            set_={
+                'matches_used': case((is_today, used + 1), else_=1),
+                'matches_tracked': case((is_today, func.coalesce(DailyStats.matches_tracked, 0) + 1), else_=1),
+                'games_played': case((is_today, games), else_=stmt.excluded.games_played),
+                'date': case((is_today, DailyStats.date), else_=now),
+                'last_reset': case((is_today, DailyStats.last_reset), else_=now),
+                'last_match_time': now,
+                'updated_at': now
+            },
+            where=None if unlimited else or_(stale, used < limit)
+        ).returning(DailyStats.matches_used)
+
+        matches_used = (await session.execute(stmt)).scalar_one_or_none()
+        await session.commit()
+    return matches_used
+
+
+async def matches_used_today(user_id: int) -> int:
+    """Матчей за сегодня; счетчик за прошедший день считается нулевым"""
+    async with async_session() as session:
+        used = (await session.execute(
+            select(DailyStats.matches_used).where(
+                DailyStats.user_id == user_id,
+                DailyStats.date >= _day_start(datetime.utcnow())
+            )
+        )).scalar_one_or_none()
+    return used or 0
+
+
+async def can_play_more(user_id: int, limit: Optional[int] = None,
+                        subscription_active: bool = False) -> bool:
+    """Остались ли у пользователя бесплатные матчи на сегодня"""
+    if subscription_active:
+        return True
+    limit = config.FREE_MATCHES_PER_DAY if limit is None else limit
+    return await matches_used_today(user_id) < limit
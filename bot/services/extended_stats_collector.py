@@ -1,8 +1,11 @@
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
 from bot.config import config
+from bot.utils.cache import get_stats_cache
+from bot.utils.match_store import get_match_store
+from .api_gateway import Priority, get_api_gateway
+from .http_session import get_http_session
+from integrations.pubg_integration import PUBGIntegration
 import json
 import logging
 
@@ -12,9 +15,17 @@ class ExtendedStatsCollector:
     """Расширенный сборщик статистики для всех игр"""
     
     def __init__(self):
-        self.session = aiohttp.ClientSession()
-        self.cache = {}
-        self.last_update = {}
+        self.gateway = get_api_gateway()
+        # Общий для реплик кэш (локальный LRU + Redis); TTL записи = интервал обновления игры
+        self.cache = get_stats_cache()
+        self.match_store = get_match_store()
+        # Матчи и телеметрия PUBG — через интеграцию, с общим хранилищем завершенных матчей
+        self.pubg = PUBGIntegration()
+        
+        # Запросы live-данных в пути: cache_key -> Task (single-flight)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Сколько раз реально ходили в API и сколько вызовов присоединились к чужому запросу
+        self.fetch_stats = {'fetches': 0, 'coalesced': 0, 'cache_hits': 0}
         
         # Конфигурация обновлений для каждой игры (секунды)
         self.update_intervals = {
@@ -78,8 +89,11 @@ class ExtendedStatsCollector:
             return {}
         
         try:
-            stats = await collector(account_id, region)
-            return stats
+            return await self.cache.get_or_fetch(
+                f"complete:{game}:{account_id}:{region}",
+                lambda: collector(account_id, region),
+                ttl=self.update_intervals.get(game, 60)
+            )
         except Exception as e:
             logger.error(f"Error collecting stats for {game}: {e}")
             return {}
@@ -766,6 +780,18 @@ class ExtendedStatsCollector:
             'building_time': 45.2
         }
         
+        # Реальное позиционирование в последнем матче по телеметрии
+        try:
+            matches = await self.pubg.get_match_history(account_id, region or 'steam', count=1)
+            if matches:
+                last_match = await self.pubg.get_match_telemetry(
+                    matches[0]['match_id'], account_id, region or 'steam'
+                )
+                if last_match:
+                    stats['positioning_stats']['last_match'] = last_match
+        except Exception as e:
+            logger.error(f"Error fetching PUBG telemetry for {account_id}: {e}")
+        
         # Статистика по луту
         stats['loot_stats'] = {
             'avg_loot_value': 185000,
@@ -798,24 +824,42 @@ class ExtendedStatsCollector:
     async def get_live_match_updates(self, game: str, match_id: str, region: str = None) -> Dict:
         """Получить live-обновления матча с минимальной задержкой"""
         
-        # Определяем интервал обновления для игры
-        interval = self.update_intervals.get(game, 60)
-        
         # Проверяем, не обновляли ли мы недавно
-        cache_key = f"{game}_{match_id}"
-        if cache_key in self.last_update:
-            time_diff = datetime.now() - self.last_update[cache_key]
-            if time_diff.total_seconds() < interval:
-                # Возвращаем кэшированные данные
-                return self.cache.get(cache_key, {})
-        
+        cache_key = f"live:{game}_{match_id}"
+        cached = self.cache.get_local(cache_key)
+        if cached is not None:
+            # Возвращаем кэшированные данные
+            self.fetch_stats['cache_hits'] += 1
+            return cached
+        
+        # Если такой же запрос уже в пути — ждем его, а не шлем второй
+        task = self._inflight.get(cache_key)
+        if task:
+            self.fetch_stats['coalesced'] += 1
+        else:
+            task = asyncio.ensure_future(self._fetch_live_and_cache(cache_key, game, match_id, region))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        
+        # shield: отмена одного ожидающего не отменяет общий запрос
+        return await asyncio.shield(task)
+    
+    async def _fetch_live_and_cache(self, cache_key: str, game: str, match_id: str, region: str = None) -> Dict:
+        """Один реальный запрос live-данных с записью в кэш"""
         try:
+            # Данные могла уже получить другая реплика
+            match_data = await self.cache.get(cache_key)
+            if match_data is not None:
+                self.fetch_stats['cache_hits'] += 1
+                return match_data
+            
+            self.fetch_stats['fetches'] += 1
+            
             # Получаем актуальные данные
             match_data = await self._fetch_live_match(game, match_id, region)
             
-            # Обновляем кэш
-            self.cache[cache_key] = match_data
-            self.last_update[cache_key] = datetime.now()
+            # Обновляем кэш на интервал обновления игры
+            await self.cache.set(cache_key, match_data, ttl=self.update_intervals.get(game, 60))
             
             return match_data
             
@@ -855,15 +899,35 @@ class ExtendedStatsCollector:
     
     async def _fetch_dota_live(self, match_id: str) -> Dict:
         """Live данные Dota 2 через OpenDota"""
+        # Детали матча уже в хранилище — матч завершен, live-данных у него нет
+        if await self.match_store.get(f"dota_match:{match_id}") is not None:
+            return {}
+        
         try:
             url = f"https://api.opendota.com/api/live/{match_id}"
-            async with self.session.get(url) as response:
+            async with self.gateway.get(get_http_session(), url, 'opendota', priority=Priority.LIVE) as response:
                 if response.status == 200:
                     return await response.json()
         except:
             pass
         return {}
     
+    async def get_dota_match_details(self, match_id: str) -> Dict:
+        """Детали матча Dota 2; завершенный матч хранится навсегда"""
+        return await self.match_store.get_or_fetch(
+            f"dota_match:{match_id}",
+            lambda: self._fetch_dota_match(match_id),
+            is_final=lambda match: match.get('radiant_win') is not None
+        )
+    
+    async def _fetch_dota_match(self, match_id: str) -> Dict:
+        """Детали матча Dota 2 через OpenDota"""
+        url = f"https://api.opendota.com/api/matches/{match_id}"
+        async with self.gateway.get(get_http_session(), url, 'opendota') as response:
+            if response.status == 200:
+                return await response.json()
+        return {}
+    
     async def _fetch_valorant_live(self, match_id: str, region: str) -> Dict:
         """Live данные Valorant"""
         # Riot API не предоставляет live-данные матча
@@ -874,7 +938,7 @@ class ExtendedStatsCollector:
         try:
             url = f"https://{region}.api.riotgames.com/lol/spectator/v4/active-games/by-summoner/{match_id}"
             headers = {'X-Riot-Token': config.RIOT_API_KEY}
-            async with self.session.get(url, headers=headers) as response:
+            async with self.gateway.get(get_http_session(), url, 'riot', priority=Priority.LIVE, headers=headers) as response:
                 if response.status == 200:
                     return await response.json()
         except:
@@ -890,7 +954,7 @@ class ExtendedStatsCollector:
                 'account_id': match_id,
                 'fields': 'last_battle_time, statistics'
             }
-            async with self.session.get(url, params=params) as response:
+            async with self.gateway.get(get_http_session(), url, 'wargaming', priority=Priority.LIVE, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
                     if data.get('status') == 'ok':
@@ -906,4 +970,5 @@ class ExtendedStatsCollector:
     
     async def close(self):
         """Закрыть сессию"""
-        await self.session.close()
\ No newline at end of file
+        # HTTP-сессия общая для процесса и закрывается при остановке бота
+        pass
\ No newline at end of file
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Dict
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Настройки пулов соединений: обычные API-запросы и тяжелые загрузки
+SESSION_PROFILES = {
+    'default': {
+        'limit': 100,            # Всего соединений в пуле
+        'limit_per_host': 20,    # Не больше на один API-хост
+        'keepalive_timeout': 30,
+        'timeout': aiohttp.ClientTimeout(total=15, connect=5, sock_read=10),
+    },
+    'download': {
+        'limit': 10,
+        'limit_per_host': 4,
+        'keepalive_timeout': 15,
+        'timeout': aiohttp.ClientTimeout(total=300, connect=10, sock_read=60),
+    },
+}
+
+_sessions: Dict[str, aiohttp.ClientSession] = {}
+
+
+def get_http_session(profile: str = 'default') -> aiohttp.ClientSession:
+    """Общая для процесса сессия aiohttp с настроенным пулом соединений.
+
+    Соединения (TCP + TLS) переиспользуются между запросами, DNS кэшируется.
+    Заголовки авторизации передаются в каждом запросе, а не в сессии.
+    """
+    session = _sessions.get(profile)
+    if session is None or session.closed:
+        settings = SESSION_PROFILES[profile]
+        connector = aiohttp.TCPConnector(
+            limit=settings['limit'],
+            limit_per_host=settings['limit_per_host'],
+            keepalive_timeout=settings['keepalive_timeout'],
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+            enable_cleanup_closed=True
+        )
+        session = aiohttp.ClientSession(connector=connector, timeout=settings['timeout'])
+        _sessions[profile] = session
+    return session
+
+
+async def open_http_sessions():
+    """Создать сессии при старте бота, чтобы первый запрос не платил за инициализацию"""
+    for profile in SESSION_PROFILES:
+        get_http_session(profile)
+    logger.info("HTTP sessions ready")
+
+
+async def close_http_sessions():
+    """Закрыть все сессии при остановке бота"""
+    sessions = list(_sessions.values())
+    _sessions.clear()
+    for session in sessions:
+        if not session.closed:
+            await session.close()
+    # Даем соединениям с TLS корректно закрыться
+    await asyncio.sleep(0.25)
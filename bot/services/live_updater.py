@@ -1,11 +1,11 @@
 import asyncio
-from datetime import datetime, timedelta
+import functools
 from typing import Dict, List
 import logging
-from bot.database import async_session
-from sqlalchemy import select, and_
-from bot.models.match import Match, MatchUpdate
 from .extended_stats_collector import ExtendedStatsCollector
+from .match_update_writer import MatchUpdateWriter
+from .poll_scheduler import PollScheduler
+from .rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +15,15 @@ class LiveMatchUpdater:
     def __init__(self, bot):
         self.bot = bot
         self.stats_collector = ExtendedStatsCollector()
-        self.active_tasks = {}
+        self.rate_limiter = RateLimiter()
+        # Все опросы живут в одном планировщике вместо задачи на каждый матч
+        self.scheduler = PollScheduler(batch_size=50)
+        # Обновления матчей пишутся в базу пачками, а не транзакцией на каждое
+        self.update_writer = MatchUpdateWriter()
+        # Один опрос на (игра, матч, регион); подписчики — {user_id: account_id}
+        self.watchers: Dict[str, Dict[int, str]] = {}
+        # (user_id, игра, матч) -> ключ общего опроса
+        self.user_polls: Dict[str, str] = {}
         self.update_intervals = {
             'csgo': 60,      # Каждую минуту
             'dota2': 30,     # Каждые 30 секунд
@@ -29,76 +37,79 @@ class LiveMatchUpdater:
         """Начать отслеживание матча"""
         task_key = f"{user_id}_{game}_{match_id}"
         
-        if task_key in self.active_tasks:
+        if task_key in self.user_polls:
             # Уже отслеживается
             return
         
-        # Создаем задачу обновления
-        task = asyncio.create_task(
-            self._track_match(user_id, game, match_id, account_id, region)
+        poll_key = f"{game}_{match_id}_{region}"
+        self.user_polls[task_key] = poll_key
+        
+        watchers = self.watchers.get(poll_key)
+        if watchers is not None:
+            # Матч уже опрашивается для другого игрока — просто подписываемся
+            watchers[user_id] = account_id
+            return
+        
+        self.watchers[poll_key] = {user_id: account_id}
+        
+        # Ставим опрос в расписание; первый опрос — сразу
+        self.scheduler.schedule(
+            poll_key,
+            provider=self.rate_limiter.get_api_for_game(game),
+            interval=self.update_intervals.get(game, 60),
+            callback=functools.partial(self._poll_match, poll_key, game, match_id, region)
         )
-        self.active_tasks[task_key] = task
     
     async def stop_tracking(self, user_id: int, game: str, match_id: str):
         """Остановить отслеживание матча"""
         task_key = f"{user_id}_{game}_{match_id}"
-        task = self.active_tasks.get(task_key)
+        poll_key = self.user_polls.pop(task_key, None)
+        if not poll_key:
+            return
         
-        if task:
-            task.cancel()
-            del self.active_tasks[task_key]
+        self.update_writer.forget(user_id, game, match_id)
+        
+        watchers = self.watchers.get(poll_key, {})
+        watchers.pop(user_id, None)
+        
+        if not watchers:
+            # Ушел последний подписчик — снимаем опрос
+            self.watchers.pop(poll_key, None)
+            self.scheduler.cancel(poll_key)
     
-    async def _track_match(self, user_id: int, game: str, match_id: str, account_id: str, region: str = None):
-        """Отслеживание матча с обновлениями"""
-        interval = self.update_intervals.get(game, 60)
+    async def _poll_match(self, poll_key: str, game: str, match_id: str, region: str = None):
+        """Один опрос матча с рассылкой всем подписчикам"""
+        try:
+            # Получаем live-обновления один раз на всех
+            live_data = await self.stats_collector.get_live_match_updates(game, match_id, region)
+        except Exception as e:
+            logger.error(f"Error tracking match {match_id}: {e}")
+            return
         
-        while True:
-            try:
-                # Получаем live-обновления
-                live_data = await self.stats_collector.get_live_match_updates(game, match_id, region)
-                
-                if live_data:
-                    # Сохраняем обновление в базу
-                    await self._save_match_update(user_id, game, match_id, live_data)
-                    
-                    # Отправляем обновление пользователю
-                    await self._send_update_to_user(user_id, game, live_data)
-                
-                # Ждем перед следующим обновлением
-                await asyncio.sleep(interval)
-                
-            except asyncio.CancelledError:
-                # Задача отменена
-                break
-            except Exception as e:
-                logger.error(f"Error tracking match {match_id}: {e}")
-                await asyncio.sleep(interval)
+        if not live_data:
+            return
+        
+        # Копия: подписчики могут уйти, пока идет рассылка
+        user_ids = list(self.watchers.get(poll_key, {}))
+        await asyncio.gather(
+            *(self._deliver_update(user_id, game, match_id, live_data) for user_id in user_ids)
+        )
     
-    async def _save_match_update(self, user_id: int, game: str, match_id: str, data: Dict):
-        """Сохранить обновление матча в базу"""
-        async with async_session() as session:
-            # Находим матч
-            result = await session.execute(
-                select(Match).where(
-                    and_(
-                        Match.user_id == user_id,
-                        Match.game == game,
-                        Match.match_id == match_id,
-                        Match.is_completed == False
-                    )
-                )
-            )
-            match = result.scalar_one_or_none()
+    async def _deliver_update(self, user_id: int, game: str, match_id: str, data: Dict):
+        """Сохранить и отправить обновление одному подписчику"""
+        try:
+            # Сохраняем обновление в базу
+            await self._save_match_update(user_id, game, match_id, data)
+            
+            # Отправляем обновление пользователю
+            await self._send_update_to_user(user_id, game, data)
             
-            if match:
-                # Создаем запись об обновлении
-                update = MatchUpdate(
-                    match_id=match.id,
-                    update_time=datetime.now(),
-                    stats=data
-                )
-                session.add(update)
-                await session.commit()
+        except Exception as e:
+            logger.error(f"Error tracking match {match_id} for user {user_id}: {e}")
+    
+    async def _save_match_update(self, user_id: int, game: str, match_id: str, data: Dict):
+        """Сохранить обновление матча в базу (через буфер пакетной записи)"""
+        self.update_writer.add(user_id, game, match_id, data)
     
     async def _send_update_to_user(self, user_id: int, game: str, data: Dict):
         """Отправить обновление пользователю"""
@@ -235,13 +246,13 @@ class LiveMatchUpdater:
     
     async def cleanup(self):
         """Очистка ресурсов"""
-        # Отменяем все задачи
-        for task in self.active_tasks.values():
-            task.cancel()
+        # Останавливаем планировщик опросов
+        await self.scheduler.stop()
+        self.watchers.clear()
+        self.user_polls.clear()
         
-        # Ожидаем завершения задач
-        if self.active_tasks:
-            await asyncio.gather(*self.active_tasks.values(), return_exceptions=True)
+        # Дописываем накопленные обновления матчей
+        await self.update_writer.close()
         
         # Закрываем коллектор
         await self.stats_collector.close()
@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, select
+
+from bot.database import async_session
+from bot.models.match import MatchUpdate
+from bot.utils import json_delta
+
+
+def replay(updates) -> List[Tuple[datetime, Dict]]:
+    """Восстановить снимки из строк MatchUpdate, упорядоченных по id.
+
+    Строки до первого ключевого кадра пропускаются: без базы дельту не к
+    чему применить.
+    """
+    snapshots = []
+    current: Optional[Dict] = None
+    for update_time, stats, is_keyframe in updates:
+        if is_keyframe or is_keyframe is None:
+            current = stats or {}
+        elif current is None:
+            continue
+        else:
+            current = json_delta.apply(current, stats or {})
+        snapshots.append((update_time, current))
+    return snapshots
+
+
+async def get_match_snapshot(match_pk: int, at: Optional[datetime] = None) -> Optional[Dict]:
+    """Снимок live-статистики матча на момент `at` (по умолчанию — последний).
+
+    Читается ближайший ключевой кадр не позже `at` и дельты после него —
+    не больше keyframe_interval строк независимо от длины истории.
+    """
+    conditions = [MatchUpdate.match_id == match_pk, MatchUpdate.is_keyframe == True]
+    if at is not None:
+        conditions.append(MatchUpdate.update_time <= at)
+
+    async with async_session() as session:
+        keyframe = (await session.execute(
+            select(MatchUpdate.id).where(and_(*conditions))
+            .order_by(MatchUpdate.id.desc()).limit(1)
+        )).scalar_one_or_none()
+        if keyframe is None:
+            return None
+
+        conditions = [MatchUpdate.match_id == match_pk, MatchUpdate.id >= keyframe]
+        if at is not None:
+            conditions.append(MatchUpdate.update_time <= at)
+        updates = (await session.execute(
+            select(MatchUpdate.update_time, MatchUpdate.player_stats, MatchUpdate.is_keyframe)
+            .where(and_(*conditions)).order_by(MatchUpdate.id)
+        )).all()
+
+    snapshots = replay(updates)
+    return snapshots[-1][1] if snapshots else None
+
+
+async def get_match_timeline(match_pk: int) -> List[Tuple[datetime, Dict]]:
+    """Все снимки матча по порядку: [(время, снимок), ...]"""
+    async with async_session() as session:
+        updates = (await session.execute(
+            select(MatchUpdate.update_time, MatchUpdate.player_stats, MatchUpdate.is_keyframe)
+            .where(MatchUpdate.match_id == match_pk).order_by(MatchUpdate.id)
+        )).all()
+    return replay(updates)
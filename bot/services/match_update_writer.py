@@ -0,0 +1,186 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+
+from sqlalchemy import and_, insert, select
+
+from bot.database import async_session
+from bot.models.match import Match, MatchUpdate
+from bot.utils import json_delta
+
+logger = logging.getLogger(__name__)
+
+# (user_id, игра, match_id из API)
+MatchKey = Tuple[int, str, str]
+
+
+class MatchUpdateWriter:
+    """Отложенная пакетная запись MatchUpdate.
+
+    Обновления от всех отслеживаний копятся в буфере и пишутся одной
+    транзакцией пакетным INSERT раз в `flush_interval` секунд или как только
+    набралось `max_rows` строк. Первичный ключ Match для
+    (пользователь, игра, матч) ищется один раз и кэшируется.
+
+    Соседние снимки матча почти совпадают, поэтому полный снимок (ключевой
+    кадр) пишется раз в `keyframe_interval` обновлений, а между ними —
+    только дельта к предыдущему (bot.utils.json_delta). Восстановление —
+    bot.services.match_history.
+
+    Если запись не удалась, строки возвращаются в буфер, но буфер не растет
+    больше `max_pending` — самые старые обновления отбрасываются.
+    """
+
+    def __init__(self, flush_interval: float = 0.5, max_rows: int = 500,
+                 max_pending: int = 50000, miss_ttl: float = 60, keyframe_interval: int = 30):
+        self.flush_interval = flush_interval
+        self.keyframe_interval = keyframe_interval
+        self.max_rows = max_rows
+        self.max_pending = max_pending
+        self.miss_ttl = miss_ttl
+        self._pending: List[Tuple[MatchKey, datetime, Dict]] = []
+        # Найденные Match.id и ключи, для которых незавершенного матча нет
+        self._match_ids: Dict[MatchKey, int] = {}
+        self._missing: Dict[MatchKey, float] = {}
+        # Match.id -> (последний записанный снимок, дельт после ключевого кадра)
+        self._chains: Dict[int, Tuple[Dict, int]] = {}
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'rows': 0, 'keyframes': 0, 'flushes': 0, 'skipped': 0, 'dropped': 0}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, user_id: int, game: str, match_id: str, data: Dict,
+            update_time: Optional[datetime] = None):
+        """Поставить обновление в очередь на запись"""
+        if len(self._pending) >= self.max_pending:
+            self._pending.pop(0)
+            self.stats['dropped'] += 1
+
+        self._pending.append(((user_id, game, str(match_id)), update_time or datetime.now(), data))
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        if len(self._pending) >= self.max_rows:
+            self._wakeup.set()
+
+    def forget(self, user_id: int, game: str, match_id: str):
+        """Сбросить закэшированный Match.id (матч больше не отслеживается)"""
+        key = (user_id, game, str(match_id))
+        pk = self._match_ids.pop(key, None)
+        self._missing.pop(key, None)
+        self._chains.pop(pk, None)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _resolve(self, session, keys: Set[MatchKey]):
+        """Найти Match.id для ключей, которых еще нет в кэше, одним запросом"""
+        now = time.monotonic()
+        unknown = {
+            key for key in keys
+            if key not in self._match_ids and self._missing.get(key, 0) <= now
+        }
+        if not unknown:
+            return
+
+        result = await session.execute(
+            select(Match.id, Match.user_id, Match.game, Match.match_id).where(
+                and_(
+                    Match.match_id.in_({match_id for _, _, match_id in unknown}),
+                    Match.is_completed == False
+                )
+            )
+        )
+        for pk, user_id, game, match_id in result:
+            key = (user_id, game, match_id)
+            if key in unknown:
+                self._match_ids[key] = pk
+                self._missing.pop(key, None)
+
+        for key in unknown - self._match_ids.keys():
+            self._missing[key] = now + self.miss_ttl
+
+    def _encode(self, pk: int, data: Dict) -> Tuple[Dict, bool]:
+        """Ключевой кадр или дельта к предыдущему снимку этого матча"""
+        chain = self._chains.get(pk)
+        if chain is not None and isinstance(data, dict) and chain[1] + 1 < self.keyframe_interval:
+            previous, deltas = chain
+            self._chains[pk] = (data, deltas + 1)
+            return json_delta.diff(previous, data), False
+
+        self._chains[pk] = (data, 0)
+        self.stats['keyframes'] += 1
+        return data, True
+
+    async def flush(self):
+        """Записать все накопленные обновления одной транзакцией"""
+        async with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+
+            try:
+                async with async_session() as session:
+                    await self._resolve(session, {key for key, _, _ in pending})
+
+                    rows: List[Dict[str, Any]] = []
+                    for key, update_time, data in pending:
+                        pk = self._match_ids.get(key)
+                        if pk is None:
+                            continue
+                        stats, is_keyframe = self._encode(pk, data)
+                        rows.append({
+                            'match_id': pk,
+                            'update_time': update_time,
+                            'player_stats': stats,
+                            'is_keyframe': is_keyframe
+                        })
+
+                    if rows:
+                        # Один пакетный INSERT (executemany) на все строки сразу
+                        await session.execute(insert(MatchUpdate), rows)
+                        await session.commit()
+
+                self.stats['rows'] += len(rows)
+                self.stats['skipped'] += len(pending) - len(rows)
+                self.stats['flushes'] += 1
+
+            except asyncio.CancelledError:
+                # Остановка посреди записи: строки допишет close()
+                self._reset_chains(pending)
+                self._pending[:0] = pending
+                raise
+            except Exception as e:
+                logger.error(f"Error writing {len(pending)} match updates: {e}")
+                self._reset_chains(pending)
+                # Возвращаем строки в начало буфера, не превышая лимит
+                room = max(self.max_pending - len(self._pending), 0)
+                self.stats['dropped'] += max(len(pending) - room, 0)
+                self._pending[:0] = pending[len(pending) - room:] if room else []
+
+    def _reset_chains(self, pending: List[Tuple[MatchKey, datetime, Dict]]):
+        """Запись не прошла — следующий снимок этих матчей пишется ключевым кадром"""
+        for key, _, _ in pending:
+            self._chains.pop(self._match_ids.get(key), None)
+
+    async def close(self):
+        """Остановить фоновую запись и дописать остаток буфера"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -1,8 +1,15 @@
+import asyncio
 from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from datetime import datetime, timedelta
-from bot.utils.localization import get_text
+from typing import AsyncIterable, Tuple
+import logging
+from bot.utils.localization import format_text, get_text
 from bot.database import async_session
 from sqlalchemy import select, and_
+from bot.services.api_gateway import get_api_gateway
+
+logger = logging.getLogger(__name__)
 
 class NotificationService:
     def __init__(self, bot: Bot):
@@ -11,7 +18,7 @@ class NotificationService:
     
     async def send_match_start_notification(self, user_id: int, language: str, game: str):
         """Отправить уведомление о начале матча"""
-        text = get_text('notifications.match_started', language).format(game=game.upper())
+        text = format_text('notifications.match_started', language, game=game.upper())
         await self.bot.send_message(user_id, text)
         
         # Увеличиваем счетчик сообщений
@@ -45,7 +52,7 @@ class NotificationService:
     
     async def send_subscription_reminder(self, user_id: int, language: str, days_left: int):
         """Напоминание об истечении подписки"""
-        text = get_text('notifications.subscription_expiring', language).format(days=days_left)
+        text = format_text('notifications.subscription_expiring', language, days=days_left)
         
         keyboard = InlineKeyboardMarkup()
         if days_left <= 1:
@@ -56,6 +63,45 @@ class NotificationService:
         
         await self.bot.send_message(user_id, text, reply_markup=keyboard)
     
+    async def send_subscription_reminders(self, reminders: AsyncIterable[Tuple[int, str, int]],
+                                          concurrency: int = 20) -> int:
+        """Разослать напоминания (telegram_id, язык, дней осталось) из потока.
+
+        Отправки идут параллельно, но не больше `concurrency` одновременно и
+        в темпе лимита 'telegram' (общий для реплик через Redis). Поток
+        читается по мере отправки, поэтому в памяти только окно из
+        `concurrency` получателей. Возвращает число отправленных сообщений.
+        """
+        limiter = get_api_gateway().rate_limiter
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = set()
+        sent = 0
+        
+        async def send(telegram_id: int, language: str, days_left: int):
+            nonlocal sent
+            try:
+                await limiter.acquire('telegram')
+                await self.send_subscription_reminder(telegram_id, language, days_left)
+                sent += 1
+            except Exception as e:
+                logger.warning(f"Subscription reminder to {telegram_id} failed: {e}")
+            finally:
+                semaphore.release()
+        
+        try:
+            async for telegram_id, language, days_left in reminders:
+                await semaphore.acquire()
+                task = asyncio.ensure_future(send(telegram_id, language, days_left))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        return sent
+    
     async def send_match_report(self, user_id: int, language: str, match_data: dict):
         """Отправить отчет о матче"""
         # Форматируем статистику в таблицу
@@ -0,0 +1,183 @@
+import asyncio
+import heapq
+import itertools
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _PollEntry:
+    """Запись об одном периодическом опросе"""
+
+    __slots__ = ('key', 'provider', 'interval', 'callback', 'due', 'cancelled', 'queued')
+
+    def __init__(self, key: str, provider: str, interval: float, callback: Callable[[], Awaitable]):
+        self.key = key
+        self.provider = provider
+        self.interval = interval
+        self.callback = callback
+        self.due = 0.0
+        self.cancelled = False
+        self.queued = False  # Запись лежит в очереди провайдера или выполняется
+
+
+class PollScheduler:
+    """Единый планировщик периодических опросов на куче по времени следующего запуска.
+
+    Вместо отдельной задачи asyncio на каждый отслеживаемый матч все опросы
+    хранятся в одной куче. Одна задача-таймер просыпается к ближайшему сроку,
+    раскладывает созревшие опросы по очередям провайдеров, а на каждого
+    провайдера работает один воркер, выполняющий опросы пачками не больше
+    `batch_size`. Отмена — O(1): запись помечается и выбрасывается из кучи лениво.
+    """
+
+    def __init__(self, batch_size: int = 50, batch_sizes: Optional[Dict[str, int]] = None):
+        self.batch_size = batch_size
+        self.batch_sizes = batch_sizes or {}
+        self._heap = []
+        self._entries: Dict[str, _PollEntry] = {}
+        self._queues = defaultdict(deque)
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._worker_events: Dict[str, asyncio.Event] = {}
+        self._counter = itertools.count()
+        self._stale = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._timer_task: Optional[asyncio.Task] = None
+        self.stats = {'fired': 0, 'errors': 0, 'cancelled': 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def schedule(self, key: str, provider: str, interval: float,
+                 callback: Callable[[], Awaitable], delay: float = 0) -> bool:
+        """Поставить периодический опрос. Возвращает False, если ключ уже занят"""
+        if key in self._entries:
+            return False
+
+        self._ensure_started()
+
+        entry = _PollEntry(key, provider, interval, callback)
+        self._entries[key] = entry
+        self._push(entry, asyncio.get_running_loop().time() + delay)
+        return True
+
+    def cancel(self, key: str) -> bool:
+        """Снять опрос с расписания за O(1)"""
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return False
+
+        entry.cancelled = True
+        self.stats['cancelled'] += 1
+        if not entry.queued:
+            # Запись осталась в куче — удалим ее при извлечении или уплотнении
+            self._stale += 1
+            self._maybe_compact()
+        return True
+
+    def _push(self, entry: _PollEntry, due: float):
+        entry.due = due
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (due, next(self._counter), entry))
+        if earliest is None or due < earliest:
+            self._wakeup.set()
+
+    def _maybe_compact(self):
+        """Пересобрать кучу, если в ней больше половины отмененных записей"""
+        if self._stale > 1024 and self._stale * 2 > len(self._heap):
+            self._heap = [item for item in self._heap if not item[2].cancelled]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _ensure_started(self):
+        if self._timer_task is None or self._timer_task.done():
+            self._wakeup = asyncio.Event()
+            self._timer_task = asyncio.create_task(self._run_timer())
+
+    async def _run_timer(self):
+        """Таймер: ждет ближайший срок и раздает созревшие опросы воркерам"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            self._wakeup.clear()
+            now = loop.time()
+
+            while self._heap and self._heap[0][0] <= now:
+                _, _, entry = heapq.heappop(self._heap)
+                if entry.cancelled:
+                    self._stale -= 1
+                    continue
+                entry.queued = True
+                self._queues[entry.provider].append(entry)
+                self._wake_worker(entry.provider)
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _wake_worker(self, provider: str):
+        event = self._worker_events.get(provider)
+        if event is None:
+            event = self._worker_events[provider] = asyncio.Event()
+            self._workers[provider] = asyncio.create_task(self._run_worker(provider))
+        event.set()
+
+    async def _run_worker(self, provider: str):
+        """Воркер провайдера: выполняет опросы пачками ограниченного размера"""
+        loop = asyncio.get_running_loop()
+        queue = self._queues[provider]
+        event = self._worker_events[provider]
+        batch_size = self.batch_sizes.get(provider, self.batch_size)
+
+        while True:
+            if not queue:
+                event.clear()
+                await event.wait()
+                continue
+
+            batch = [queue.popleft() for _ in range(min(batch_size, len(queue)))]
+            batch = [entry for entry in batch if not entry.cancelled]
+            if not batch:
+                continue
+
+            results = await asyncio.gather(
+                *(entry.callback() for entry in batch),
+                return_exceptions=True
+            )
+
+            now = loop.time()
+            for entry, result in zip(batch, results):
+                self.stats['fired'] += 1
+                if isinstance(result, Exception):
+                    self.stats['errors'] += 1
+                    logger.error(f"Error polling {entry.key}: {result}")
+
+                entry.queued = False
+                if not entry.cancelled:
+                    self._push(entry, now + entry.interval)
+
+    async def stop(self):
+        """Остановить таймер и воркеры, сбросить расписание"""
+        tasks = list(self._workers.values())
+        if self._timer_task:
+            tasks.append(self._timer_task)
+
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._heap.clear()
+        self._entries.clear()
+        self._queues.clear()
+        self._workers.clear()
+        self._worker_events.clear()
+        self._timer_task = None
+        self._stale = 0
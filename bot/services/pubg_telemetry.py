@@ -0,0 +1,244 @@
+import codecs
+import json
+import math
+import zlib
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+import logging
+
+import aiohttp
+
+from .http_session import get_http_session
+
+logger = logging.getLogger(__name__)
+
+# События телеметрии, нужные для статистики игрока
+PLAYER_EVENTS = frozenset({
+    'LogMatchStart',
+    'LogParachuteLanding',
+    'LogPlayerPosition',
+    'LogPlayerKillV2',
+    'LogPlayerTakeDamage',
+})
+
+_WHITESPACE = ' \t\r\n'
+
+
+class TelemetryStreamParser:
+    """Потоковый разбор телеметрии PUBG (JSON-массив событий).
+
+    Принимает байты кусками, при необходимости распаковывает gzip на лету
+    и отдает события по одному, как только объект события прочитан целиком.
+    В памяти держится только текущий кусок и недочитанный хвост, а не весь
+    документ, поэтому файл на десятки мегабайт разбирается в постоянной памяти.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._inflate = None
+        self._sniffed = False
+        self._head = b''
+        self._buffer = ''
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: bytes) -> Iterator[Dict]:
+        """Добавить кусок данных и получить все события, прочитанные целиком"""
+        if not self._sniffed:
+            # Файлы телеметрии отдаются gzip-архивом; заголовок 1f 8b
+            chunk = self._head + chunk
+            if len(chunk) < 2:
+                self._head = chunk
+                return iter(())
+            self._sniffed = True
+            if chunk[:2] == b'\x1f\x8b':
+                self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._inflate is not None:
+            chunk = self._inflate.decompress(chunk)
+        self._buffer += self._text.decode(chunk)
+        return self._drain()
+
+    def close(self) -> Iterator[Dict]:
+        """Разобрать остаток после последнего куска"""
+        if not self._sniffed:
+            self._buffer += self._text.decode(self._head)
+        if self._inflate is not None:
+            self._buffer += self._text.decode(self._inflate.flush())
+        self._buffer += self._text.decode(b'', final=True)
+        yield from self._drain()
+        if self._buffer.strip(_WHITESPACE) and not self._finished:
+            logger.warning(f"Telemetry stream truncated, {len(self._buffer)} chars left unparsed")
+
+    def _drain(self) -> Iterator[Dict]:
+        buffer = self._buffer
+        pos = 0
+        length = len(buffer)
+
+        while not self._finished:
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= length:
+                break
+
+            char = buffer[pos]
+            if not self._started:
+                if char != '[':
+                    raise ValueError("Telemetry is not a JSON array")
+                self._started = True
+                pos += 1
+                continue
+            if char == ',':
+                pos += 1
+                continue
+            if char == ']':
+                self._finished = True
+                pos += 1
+                break
+
+            try:
+                event, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Объект еще не пришел целиком — ждем следующий кусок
+                break
+            pos = end
+            yield event
+
+        self._buffer = buffer[pos:]
+
+
+async def iter_telemetry_events(url: str, event_types: Optional[Iterable[str]] = PLAYER_EVENTS,
+                                session: Optional[aiohttp.ClientSession] = None,
+                                chunk_size: int = 64 * 1024) -> AsyncIterator[Dict]:
+    """Скачивать телеметрию по кускам и отдавать события нужных типов.
+
+    Телеметрия лежит на CDN, а не в API, поэтому в лимит запросов PUBG
+    не входит и качается через пул для тяжелых загрузок.
+    """
+    wanted = frozenset(event_types) if event_types is not None else None
+    session = session or get_http_session('download')
+    parser = TelemetryStreamParser()
+
+    async with session.get(url, headers={'Accept': 'application/vnd.api+json'}) as response:
+        if response.status != 200:
+            logger.warning(f"Telemetry download failed with status {response.status}: {url}")
+            return
+        async for chunk in response.content.iter_chunked(chunk_size):
+            for event in parser.feed(chunk):
+                if wanted is None or event.get('_T') in wanted:
+                    yield event
+
+    for event in parser.close():
+        if wanted is None or event.get('_T') in wanted:
+            yield event
+
+
+class PlayerTelemetry:
+    """Сводка телеметрии по одному игроку, собираемая по ходу потока.
+
+    Хранит только агрегаты и прореженный трек позиций, а не сами события.
+    Координаты телеметрии в сантиметрах, в сводке — в метрах.
+    """
+
+    TRACK_POINTS = 50
+
+    def __init__(self, account_id: str):
+        self.account_id = account_id
+        self.map_name = ''
+        self.landing: Optional[Dict] = None
+        self.kills = 0
+        self.longest_kill = 0.0
+        self.damage_dealt = 0.0
+        self.damage_taken = 0.0
+        self.distance_moved = 0.0
+        self.time_survived = 0.0
+        self.events = 0
+        self._last_position: Optional[Dict] = None
+        self._positions = 0
+        self._track: List[Dict] = []
+        self._stride = 1
+
+    def _is_player(self, character: Optional[Dict]) -> bool:
+        return bool(character) and character.get('accountId') == self.account_id
+
+    def add(self, event: Dict):
+        self.events += 1
+        kind = event.get('_T')
+
+        if kind == 'LogMatchStart':
+            self.map_name = event.get('mapName', '')
+
+        elif kind == 'LogParachuteLanding':
+            if self._is_player(event.get('character')):
+                self.landing = _meters(event['character'].get('location'))
+
+        elif kind == 'LogPlayerPosition':
+            character = event.get('character')
+            if not self._is_player(character):
+                return
+            position = _meters(character.get('location'))
+            if self._last_position is not None:
+                self.distance_moved += math.hypot(
+                    position['x'] - self._last_position['x'],
+                    position['y'] - self._last_position['y']
+                )
+            self._last_position = position
+            self.time_survived = max(self.time_survived, event.get('elapsedTime', 0))
+            if self._positions % self._stride == 0:
+                self._track.append(position)
+                if len(self._track) > 2 * self.TRACK_POINTS:
+                    # Прореживаем трек вдвое, чтобы он не рос с длиной матча
+                    self._track = self._track[::2]
+                    self._stride *= 2
+            self._positions += 1
+
+        elif kind == 'LogPlayerKillV2':
+            if self._is_player(event.get('killer')):
+                self.kills += 1
+                distance = (event.get('killerDamageInfo') or {}).get('distance', 0) / 100
+                self.longest_kill = max(self.longest_kill, distance)
+
+        elif kind == 'LogPlayerTakeDamage':
+            damage = event.get('damage', 0)
+            if self._is_player(event.get('attacker')):
+                self.damage_dealt += damage
+            if self._is_player(event.get('victim')):
+                self.damage_taken += damage
+
+    def summary(self) -> Dict:
+        return {
+            'map_name': self.map_name,
+            'landing': self.landing,
+            'final_position': self._last_position,
+            'kills': self.kills,
+            'longest_kill': round(self.longest_kill, 1),
+            'damage_dealt': round(self.damage_dealt, 1),
+            'damage_taken': round(self.damage_taken, 1),
+            'distance_moved': round(self.distance_moved, 1),
+            'time_survived': self.time_survived,
+            'position_samples': self._positions,
+            'track': self._track
+        }
+
+
+def _meters(location: Optional[Dict]) -> Dict:
+    location = location or {}
+    return {
+        'x': round(location.get('x', 0) / 100, 1),
+        'y': round(location.get('y', 0) / 100, 1)
+    }
+
+
+async def get_player_telemetry(url: str, account_id: str,
+                               session: Optional[aiohttp.ClientSession] = None) -> Dict:
+    """Сводка телеметрии матча по игроку `account_id` (account.xxx).
+
+    Пустой словарь, если не разобрано ни одного события (загрузка не
+    удалась) — такой результат не должен попасть в хранилище матчей.
+    """
+    player = PlayerTelemetry(account_id)
+    async for event in iter_telemetry_events(url, session=session):
+        player.add(event)
+    if not player.events:
+        return {}
+    return player.summary()
@@ -1,61 +1,216 @@
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
 import asyncio
-from datetime import datetime, timedelta
-from collections import defaultdict
+import time
+from typing import Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# GCRA по нескольким окнам сразу. Время берется из Redis, поэтому все реплики
+# живут по одним часам. ARGV[1] — максимальное ожидание в мс (-1 — без ограничения),
+# далее пары (интервал между запросами, допуск всплеска) в мс для каждого ключа.
+# Возвращает задержку в мс до разрешенного слота или -1, если ждать дольше max_wait.
+GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local max_wait = tonumber(ARGV[1])
+local tats = {}
+local slot = now
+for i = 1, #KEYS do
+    local tau = tonumber(ARGV[2 * i + 1])
+    local tat = tonumber(redis.call('GET', KEYS[i]) or now)
+    if tat < now then tat = now end
+    tats[i] = tat
+    if tat - tau > slot then slot = tat - tau end
+end
+local wait = slot - now
+if max_wait >= 0 and wait > max_wait then
+    return -1
+end
+for i = 1, #KEYS do
+    local emission = tonumber(ARGV[2 * i])
+    local tat = tats[i]
+    if slot > tat then tat = slot end
+    tat = tat + emission
+    redis.call('SET', KEYS[i], tat, 'PX', math.max(tat - now, 1))
+end
+return wait
+"""
+
+
+class _Window:
+    """Одно окно лимита: `count` запросов за `period` секунд (GCRA)"""
+
+    __slots__ = ('count', 'period', 'emission', 'tolerance', 'tat')
+
+    def __init__(self, count: int, period: float):
+        self.count = count
+        self.period = period
+        # Интервал между запросами и допустимый всплеск
+        self.emission = period / count
+        self.tolerance = period - self.emission
+        # Теоретическое время прихода следующего запроса
+        self.tat = 0.0
+
+
 class RateLimiter:
-    """Ограничитель запросов к API"""
-    
-    def __init__(self):
-        self.requests = defaultdict(list)
-        self.limits = {
-            'steam': {'per_minute': 100, 'per_second': 2},
-            'opendota': {'per_minute': 60, 'per_second': 1},
-            'riot': {'per_minute': 50, 'per_second': 0.5},  # 100/2мин
-            'wargaming': {'per_minute': 600, 'per_second': 10},
-            'pubg': {'per_minute': 10, 'per_second': 0.2}
+    """Ограничитель запросов к API.
+
+    Каждое окно лимита — GCRA: состояние из одного числа, проверка за O(1).
+    Слот выдается сразу при вызове (резервирование), поэтому ожидающие
+    обслуживаются строго в порядке очереди и без гонок между корутинами.
+    Если передан Redis, бюджет общий для всех реплик (Lua-скрипт).
+
+    `headroom` — доля окна всплеска, которую запрос обязан оставить свободной:
+    так низкоприоритетные запросы не выбирают бюджет, нужный интерактивным.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, redis_client=None,
+                 limits: Optional[Dict[str, List[Tuple[int, float]]]] = None,
+                 retry_after: float = 30):
+        # Окна лимитов: (запросов, за секунд)
+        self.limits: Dict[str, List[Tuple[int, float]]] = limits or {
+            'steam': [(2, 1), (100, 60)],
+            'opendota': [(1, 1), (60, 60)],
+            'riot': [(20, 1), (100, 120)],
+            'wargaming': [(10, 1), (600, 60)],
+            'pubg': [(10, 60)],
+            # Bot API: ~30 сообщений в секунду на бота
+            'telegram': [(30, 1)]
+        }
+        self._windows: Dict[str, List[_Window]] = {
+            api: [_Window(count, period) for count, period in windows]
+            for api, windows in self.limits.items()
+        }
+
+        self.redis = redis_client
+        if self.redis is None and redis_url and REDIS_AVAILABLE:
+            self.redis = aioredis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+        self._script = self.redis.register_script(GCRA_LUA) if self.redis is not None else None
+        self.retry_after = retry_after
+        self._redis_down_until = 0.0
+
+    def reserve(self, api: str, max_wait: Optional[float] = None, headroom: float = 0.0) -> Optional[float]:
+        """Зарезервировать слот в локальном бюджете.
+
+        Возвращает задержку в секундах до слота или None, если ждать пришлось
+        бы дольше `max_wait` (в этом случае бюджет не расходуется).
+        """
+        windows = self._windows.get(api)
+        if not windows:
+            return 0.0
+
+        now = time.monotonic()
+        slot = now
+        for window in windows:
+            allowed_at = max(window.tat, now) - window.tolerance * (1 - headroom)
+            if allowed_at > slot:
+                slot = allowed_at
+
+        wait = slot - now
+        if max_wait is not None and wait > max_wait:
+            return None
+
+        for window in windows:
+            window.tat = max(window.tat, slot) + window.emission
+        return wait
+
+    async def _reserve_shared(self, api: str, max_wait: Optional[float], headroom: float) -> Optional[float]:
+        """Зарезервировать слот в общем бюджете Redis"""
+        keys = [f"ratelimit:{api}:{count}/{period}" for count, period in self.limits[api]]
+        args = [int(max_wait * 1000) if max_wait is not None else -1]
+        for window in self._windows[api]:
+            tolerance = window.tolerance * (1 - headroom)
+            args += [int(window.emission * 1000), int(tolerance * 1000)]
+
+        wait_ms = await self._script(keys=keys, args=args)
+        if wait_ms < 0:
+            return None
+        return wait_ms / 1000
+
+    async def acquire(self, api: str, max_wait: Optional[float] = None, headroom: float = 0.0) -> bool:
+        """Дождаться разрешения на запрос.
+
+        Возвращает False без ожидания, если слот дальше `max_wait` секунд.
+        """
+        if api not in self._windows:
+            return True
+
+        wait = None
+        if self._script is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                wait = await self._reserve_shared(api, max_wait, headroom)
+                if wait is None:
+                    return False
+            except Exception as e:
+                logger.warning(f"Shared rate limit unavailable for {api}, using local budget: {e}")
+                self._redis_down_until = time.monotonic() + self.retry_after
+                wait = None
+
+        if wait is None:
+            wait = self.reserve(api, max_wait, headroom)
+            if wait is None:
+                return False
+
+        if wait > 0:
+            if wait >= 1:
+                logger.info(f"Rate limit for {api}, waiting {wait:.1f} sec")
+            await asyncio.sleep(wait)
+        return True
+
+    def burst(self, api: str) -> Optional[int]:
+        """Сколько запросов к API можно отправить разом, не упираясь в лимит"""
+        windows = self.limits.get(api)
+        if not windows:
+            return None
+        return min(count for count, _ in windows)
+
+    async def usage(self) -> Dict[str, float]:
+        """Доля бюджета каждого API, занятая сейчас (по самому загруженному окну).
+
+        В GCRA занятая часть окна — это насколько TAT ушел вперед от текущего
+        времени. При общем бюджете значения читаются из Redis.
+        """
+        tats: Dict[str, List[float]] = {
+            api: [window.tat for window in windows] for api, windows in self._windows.items()
+        }
+        now = time.monotonic()
+
+        if self._script is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.time()
+                    for api, windows in self.limits.items():
+                        for count, period in windows:
+                            pipe.get(f"ratelimit:{api}:{count}/{period}")
+                    (seconds, microseconds), *values = await pipe.execute()
+                now = seconds + microseconds / 1e6
+                values = iter(values)
+                tats = {
+                    api: [int(value) / 1000 if value is not None else 0.0
+                          for value in (next(values) for _ in windows)]
+                    for api, windows in self.limits.items()
+                }
+            except Exception as e:
+                logger.warning(f"Shared rate limit usage unavailable, using local budget: {e}")
+
+        return {
+            api: max(
+                min(max(tat - now, 0.0) / window.period, 1.0)
+                for tat, window in zip(tats[api], self._windows[api])
+            )
+            for api in self._windows
         }
-    
+
     async def wait_if_needed(self, api: str):
         """Подождать если превышен лимит"""
-        
-        if api not in self.limits:
-            return
-        
-        now = datetime.now()
-        limit = self.limits[api]
-        
-        # Очищаем старые запросы
-        self.requests[api] = [
-            req_time for req_time in self.requests[api]
-            if now - req_time < timedelta(minutes=1)
-        ]
-        
-        # Проверяем лимит в минуту
-        if len(self.requests[api]) >= limit['per_minute']:
-            # Находим самый старый запрос
-            oldest = min(self.requests[api])
-            wait_time = 60 - (now - oldest).total_seconds()
-            if wait_time > 0:
-                logger.info(f"Rate limit for {api}, waiting {wait_time:.1f} sec")
-                await asyncio.sleep(wait_time)
-        
-        # Проверяем лимит в секунду
-        recent_requests = [
-            req_time for req_time in self.requests[api]
-            if now - req_time < timedelta(seconds=1)
-        ]
-        
-        if len(recent_requests) >= limit['per_second']:
-            wait_time = 1 - (now - min(recent_requests)).total_seconds()
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-        
-        # Добавляем текущий запрос
-        self.requests[api].append(now)
-    
+        await self.acquire(api)
+
     def get_api_for_game(self, game: str) -> str:
         """Получить тип API для игры"""
         mapping = {
@@ -66,4 +221,4 @@ class RateLimiter:
             'wot': 'wargaming',
             'pubg': 'pubg'
         }
-        return mapping.get(game, 'default')
\ No newline at end of file
+        return mapping.get(game, 'default')
@@ -0,0 +1,165 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+
+from bot.config import config
+from bot.database import async_session
+from bot.models.game_account import GameAccount
+from bot.models.game_stats import PlayerStats
+from bot.models.match import Match, MatchUpdate
+from bot.models.subscription import Subscription
+from .match_history import replay
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionJob:
+    """Сжатие истории: match_updates и player_stats.
+
+    - Обновления завершенного матча старше окна хранения схлопываются в
+      одну строку — итоговый снимок (ключевой кадр), читаемый тем же
+      get_match_snapshot.
+    - Старые снимки PlayerStats прореживаются до одного (последнего) на
+      аккаунт, игру, тип статистики и день.
+
+    Окна хранения задаются в config.RETENTION_DAYS по уровню подписки.
+    Удаление идет пачками по `batch_size` в отдельных транзакциях с паузой
+    между ними, чтобы не держать долгие блокировки.
+    """
+
+    def __init__(self, batch_size: int = 500, matches_per_batch: int = 50, pause: float = 0.1,
+                 retention_days: Optional[Dict[str, Dict[str, int]]] = None,
+                 accounts_per_batch: int = 100):
+        self.batch_size = batch_size
+        self.matches_per_batch = matches_per_batch
+        self.accounts_per_batch = accounts_per_batch
+        self.pause = pause
+        self.retention_days = retention_days or config.RETENTION_DAYS
+
+    @staticmethod
+    def _tier_condition(tier: str):
+        """Условие на подписку пользователя для уровня хранения"""
+        if tier == 'premium':
+            return Subscription.is_active == True
+        return or_(Subscription.id.is_(None), Subscription.is_active == False)
+
+    def _cutoff(self, tier: str, table: str) -> datetime:
+        return datetime.utcnow() - timedelta(days=self.retention_days[tier][table])
+
+    async def compact_match_updates(self) -> int:
+        """Схлопнуть обновления старых завершенных матчей; возвращает число удаленных строк"""
+        removed = 0
+        for tier in self.retention_days:
+            cutoff = self._cutoff(tier, 'match_updates')
+            while True:
+                async with async_session() as session:
+                    result = await session.execute(
+                        select(MatchUpdate.match_id)
+                        .join(Match, Match.id == MatchUpdate.match_id)
+                        .outerjoin(Subscription, Subscription.user_id == Match.user_id)
+                        .where(and_(
+                            Match.is_completed == True,
+                            func.coalesce(Match.end_time, Match.updated_at) < cutoff,
+                            self._tier_condition(tier)
+                        ))
+                        .group_by(MatchUpdate.match_id)
+                        .having(func.count(MatchUpdate.id) > 1)
+                        .limit(self.matches_per_batch)
+                    )
+                    match_ids = result.scalars().all()
+                    if not match_ids:
+                        break
+
+                    for match_pk in match_ids:
+                        removed += await self._compact_match(session, match_pk)
+                    await session.commit()
+
+                await asyncio.sleep(self.pause)
+        return removed
+
+    async def _compact_match(self, session, match_pk: int) -> int:
+        """Заменить все обновления матча одним итоговым снимком"""
+        updates = (await session.execute(
+            select(MatchUpdate.id, MatchUpdate.update_time, MatchUpdate.player_stats, MatchUpdate.is_keyframe)
+            .where(MatchUpdate.match_id == match_pk)
+            .order_by(MatchUpdate.id)
+        )).all()
+
+        snapshots = replay([(update_time, stats, is_keyframe) for _, update_time, stats, is_keyframe in updates])
+        ids = [update_id for update_id, _, _, _ in updates]
+
+        await session.execute(delete(MatchUpdate).where(MatchUpdate.id.in_(ids)))
+        if snapshots:
+            update_time, final = snapshots[-1]
+            await session.execute(insert(MatchUpdate).values(
+                match_id=match_pk,
+                update_time=update_time,
+                player_stats=final,
+                is_keyframe=True
+            ))
+            return len(ids) - 1
+        return len(ids)
+
+    async def rollup_player_stats(self) -> int:
+        """Оставить по одному снимку PlayerStats в день; возвращает число удаленных строк.
+
+        Аккаунты обходятся диапазонами по GameAccount.id: для каждого
+        диапазона оконная функция считается один раз, а найденные лишние
+        строки удаляются пачками по id.
+        """
+        removed = 0
+        for tier in self.retention_days:
+            cutoff = self._cutoff(tier, 'player_stats')
+            last_account_id = 0
+            while True:
+                async with async_session() as session:
+                    account_ids: List[int] = (await session.execute(
+                        select(GameAccount.id)
+                        .outerjoin(Subscription, Subscription.user_id == GameAccount.user_id)
+                        .where(and_(GameAccount.id > last_account_id, self._tier_condition(tier)))
+                        .order_by(GameAccount.id)
+                        .limit(self.accounts_per_batch)
+                    )).scalars().all()
+                    if not account_ids:
+                        break
+                    last_account_id = account_ids[-1]
+
+                    day = func.date(PlayerStats.stats_date)
+                    ranked = (
+                        select(
+                            PlayerStats.id,
+                            func.row_number().over(
+                                partition_by=(PlayerStats.game_account_id, PlayerStats.game,
+                                              PlayerStats.stats_type, day),
+                                order_by=(PlayerStats.stats_date.desc(), PlayerStats.id.desc())
+                            ).label('position')
+                        )
+                        .where(and_(PlayerStats.game_account_id.in_(account_ids),
+                                    PlayerStats.stats_date < cutoff))
+                        .subquery()
+                    )
+                    ids: List[int] = (await session.execute(
+                        select(ranked.c.id).where(ranked.c.position > 1).order_by(ranked.c.id)
+                    )).scalars().all()
+
+                for start in range(0, len(ids), self.batch_size):
+                    chunk = ids[start:start + self.batch_size]
+                    async with async_session() as session:
+                        await session.execute(delete(PlayerStats).where(PlayerStats.id.in_(chunk)))
+                        await session.commit()
+                    removed += len(chunk)
+                    await asyncio.sleep(self.pause)
+        return removed
+
+    async def run_once(self) -> Dict[str, int]:
+        started = datetime.utcnow()
+        result = {
+            'match_updates': await self.compact_match_updates(),
+            'player_stats': await self.rollup_player_stats()
+        }
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        logger.info(f"Retention: removed {result} in {elapsed:.1f} sec")
+        return result
@@ -1,19 +1,18 @@
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from bot.config import config
+from bot.utils.cache import TTLCache
+from .http_session import get_http_session
 import json
 
 class GameStatsCollector:
     def __init__(self):
-        self.session = None
-        self.cache = {}
+        # Собранная статистика; TTL записи = интервал обновления игры
+        self.cache = TTLCache(max_entries=5000, max_bytes=50 * 1024 * 1024)
     
     async def get_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        return get_http_session()
     
     async def collect_stats(self, game: str, account_id: str, region: str = None) -> Dict:
         """Собирает статистику для конкретной игры"""
@@ -31,7 +30,14 @@ class GameStatsCollector:
         if not collector:
             return {}
         
-        return await collector(account_id, region)
+        cache_key = f"{game}_{account_id}_{region}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        stats = await collector(account_id, region)
+        self.cache.set(cache_key, stats, ttl=config.UPDATE_INTERVALS.get(game, 60))
+        return stats
     
     async def _collect_csgo_stats(self, steam_id: str, region: str = None) -> Dict:
         """Собирает статистику CS:GO"""
@@ -378,5 +384,5 @@ class GameStatsCollector:
     
     async def close(self):
         """Закрывает сессию"""
-        if self.session:
-            await self.session.close()
\ No newline at end of file
+        # HTTP-сессия общая для процесса и закрывается при остановке бота
+        pass
\ No newline at end of file
@@ -0,0 +1,149 @@
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+from aiogram import types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager
+
+from bot.config import config
+from bot.database import async_session
+from bot.models.game_account import GameAccount
+from bot.models.user import User
+from bot.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class UserContext:
+    """Все, что хендлерам нужно знать о пользователе Telegram.
+
+    Пользователь, язык, подписка и привязанные аккаунты с настройками
+    загружаются одним запросом. Объекты моделей отсоединены от сессии и
+    используются только для чтения; изменения делаются в своей сессии,
+    после чего контекст сбрасывается через invalidate_user_context().
+    Для пользователя, еще не нажавшего /start, `user` равен None.
+    """
+
+    def __init__(self, telegram_id: int, user: Optional[User] = None,
+                 default_language: str = 'en'):
+        self.telegram_id = telegram_id
+        self.user = user
+        self.language = (user.language if user else None) or default_language
+        self.subscription = user.subscription if user else None
+        self.accounts: Dict[str, GameAccount] = {}
+        for account in (user.game_accounts if user else []):
+            if account.game not in self.accounts or account.is_primary:
+                self.accounts[account.game] = account
+
+    @property
+    def id(self) -> Optional[int]:
+        """users.id — внешний ключ для подписок, аккаунтов и платежей"""
+        return self.user.id if self.user else None
+
+    @property
+    def has_subscription(self) -> bool:
+        sub = self.subscription
+        return bool(sub and sub.is_active and sub.end_date and sub.end_date > datetime.utcnow())
+
+    def account(self, game: str) -> Optional[GameAccount]:
+        return self.accounts.get(game)
+
+    def settings(self, game: str):
+        account = self.accounts.get(game)
+        return account.settings if account else None
+
+
+async def load_user_context(telegram_id: int, default_language: str = 'en') -> UserContext:
+    """Собрать контекст из базы: пользователь, подписка, аккаунты и их настройки"""
+    async with async_session() as session:
+        result = await session.execute(
+            select(User)
+            .outerjoin(User.subscription)
+            .outerjoin(User.game_accounts)
+            .outerjoin(GameAccount.settings)
+            .options(
+                contains_eager(User.subscription),
+                contains_eager(User.game_accounts).contains_eager(GameAccount.settings)
+            )
+            .where(User.telegram_id == telegram_id)
+        )
+        user = result.unique().scalar_one_or_none()
+    return UserContext(telegram_id, user, default_language)
+
+
+class UserContextCache:
+    """Кэш контекстов пользователей процесса с коротким TTL.
+
+    Апдейты чата обрабатывает один процесс (см. bot.sharding), поэтому
+    изменения, сделанные хендлерами, сбрасываются здесь же явно. Изменения
+    из других процессов (админ-панель, таймеры) становятся видны не позже
+    чем через `ttl` секунд; окончание подписки проверяется по end_date и
+    от кэша не зависит.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 50000):
+        self.ttl = ttl
+        self._cache = TTLCache(max_entries=max_entries, default_ttl=ttl)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats
+
+    async def get(self, telegram_id: int, default_language: str = 'en') -> UserContext:
+        context = self._cache.get(telegram_id)
+        if context is None:
+            context = await load_user_context(telegram_id, default_language)
+            self._cache.set(telegram_id, context)
+        return context
+
+    def invalidate(self, telegram_id: int):
+        self._cache.pop(telegram_id)
+
+    def clear(self):
+        self._cache.clear()
+
+
+_user_contexts: Optional[UserContextCache] = None
+
+
+def get_user_contexts() -> UserContextCache:
+    global _user_contexts
+    if _user_contexts is None:
+        _user_contexts = UserContextCache(config.USER_CONTEXT_TTL)
+    return _user_contexts
+
+
+async def get_user_context(telegram_id: int, default_language: str = 'en') -> UserContext:
+    return await get_user_contexts().get(telegram_id, default_language)
+
+
+def invalidate_user_context(telegram_id: int):
+    """Сбросить контекст после изменения пользователя, подписки, аккаунтов или настроек"""
+    get_user_contexts().invalidate(telegram_id)
+
+
+class UserContextMiddleware(BaseMiddleware):
+    """Передает хендлерам сообщений и callback-запросов аргумент `user_context`.
+
+    Контекст загружается только для апдейтов, нашедших хендлер; на теплом
+    кэше обработка апдейта не обращается к базе за пользователем.
+    """
+
+    async def _inject(self, from_user: Optional[types.User], data: dict):
+        if from_user is None:
+            return
+        try:
+            data['user_context'] = await get_user_context(
+                from_user.id, from_user.language_code or 'en'
+            )
+        except Exception as e:
+            logger.error(f"Failed to load user context for {from_user.id}: {e}")
+            data['user_context'] = UserContext(from_user.id, None, from_user.language_code or 'en')
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        await self._inject(message.from_user, data)
+
+    async def on_process_callback_query(self, callback: types.CallbackQuery, data: dict):
+        await self._inject(callback.from_user, data)
@@ -0,0 +1,52 @@
+from typing import List, Tuple
+
+from sqlalchemy import column, select, table
+
+from bot.database import async_session
+from bot.models.user import User
+
+# Триграммный индекс не помогает запросам короче трех символов
+MIN_TRIGRAM_LENGTH = 3
+
+users_fts = table('users_fts', column('rowid'), column('users_fts'))
+
+
+def _escape_like(query: str) -> str:
+    return query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def username_condition(dialect: str, query: str):
+    """Условие поиска по части username для индекса миграции 0003"""
+    if dialect == 'sqlite' and len(query) >= MIN_TRIGRAM_LENGTH:
+        # FTS5 trigram: фраза в кавычках ищется как подстрока
+        phrase = '"' + query.replace('"', '""') + '"'
+        return User.id.in_(
+            select(users_fts.c.rowid).where(users_fts.c.users_fts.op('MATCH')(phrase))
+        )
+    # На Postgres ILIKE '%x%' обслуживается GIN-индексом pg_trgm
+    return User.username.ilike(f"%{_escape_like(query)}%", escape='\\')
+
+
+async def search_users(query: str, after_id: int = 0, limit: int = 10) -> Tuple[List[User], bool]:
+    """Страница пользователей, чей username содержит `query`.
+
+    Пагинация по ключу: страница начинается после `after_id` (id последнего
+    пользователя предыдущей страницы), поэтому стоимость не зависит от
+    номера страницы. Строки читаются потоком, пока не наберется `limit` + 1
+    (лишняя строка говорит о наличии следующей страницы).
+    """
+    async with async_session() as session:
+        dialect = session.bind.dialect.name
+        result = await session.stream_scalars(
+            select(User)
+            .where(User.id > after_id, username_condition(dialect, query))
+            .order_by(User.id)
+            .limit(limit + 1)
+        )
+        users = []
+        async for user in result:
+            users.append(user)
+        await result.close()
+
+    return users[:limit], len(users) > limit
+
@@ -0,0 +1,123 @@
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+from bot.config import config
+from .api_gateway import ApiGateway, get_api_gateway
+from .http_session import get_http_session
+
+logger = logging.getLogger(__name__)
+
+
+class WoTAccountBatcher:
+    """Склейка одновременных запросов account/info/ к Wargaming API.
+
+    Запросы, пришедшие в течение `window` секунд, с одним регионом и набором
+    полей собираются в один вызов со списком account_id через запятую (до 100
+    штук), ответ раскладывается обратно по ожидающим.
+    """
+
+    MAX_IDS = 100
+
+    regions = {
+        'eu': 'https://api.worldoftanks.eu/wot/',
+        'ru': 'https://api.worldoftanks.ru/wot/',
+        'na': 'https://api.worldoftanks.com/wot/',
+        'asia': 'https://api.worldoftanks.asia/wot/'
+    }
+
+    def __init__(self, window: float = 0.005, gateway: Optional[ApiGateway] = None):
+        self.window = window
+        self.gateway = gateway or get_api_gateway()
+        self.application_id = config.WOT_APPLICATION_ID
+        # (регион, поля) -> {account_id: [ожидающие Future]}
+        self._pending: Dict[Tuple[str, str], Dict[str, List[asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        # Запросы пачек в пути: ссылки держат задачи до завершения, close() их дожидается
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {'lookups': 0, 'requests': 0}
+
+    async def get_account_info(self, account_id: str, region: str, fields: str) -> Dict:
+        """Данные account/info/ для одного аккаунта ({} если не найден)"""
+        loop = asyncio.get_running_loop()
+        key = (region, fields)
+        account_id = str(account_id)
+
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, {})
+        pending.setdefault(account_id, []).append(future)
+        self.stats['lookups'] += 1
+
+        if len(pending) >= self.MAX_IDS:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Tuple[str, str]):
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._send(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key: Tuple[str, str], batch: Dict[str, List[asyncio.Future]]):
+        """Один запрос на всю пачку и раздача результатов"""
+        region, fields = key
+        url = f"{self.regions.get(region, self.regions['ru'])}account/info/"
+        params = {
+            'application_id': self.application_id,
+            'account_id': ','.join(batch),
+            'fields': fields
+        }
+        self.stats['requests'] += 1
+
+        results = {}
+        try:
+            async with self.gateway.get(get_http_session(), url, 'wargaming', params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data.get('status') == 'ok':
+                        results = data.get('data') or {}
+        except Exception as e:
+            logger.error(f"WoT batch request failed ({len(batch)} accounts): {e}")
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for account_id, futures in batch.items():
+            account_data = results.get(account_id) or {}
+            for future in futures:
+                if not future.done():
+                    future.set_result(account_data)
+
+    async def close(self):
+        """Отправить накопленные пачки и дождаться всех запросов в пути"""
+        for key in list(self._pending):
+            self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+_batcher: Optional[WoTAccountBatcher] = None
+
+
+def get_wot_batcher() -> WoTAccountBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = WoTAccountBatcher()
+    return _batcher
+
+
+async def close_wot_batcher():
+    global _batcher
+    if _batcher is not None:
+        await _batcher.close()
+        _batcher = None
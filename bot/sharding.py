@@ -0,0 +1,216 @@
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+import asyncio
+import json
+import multiprocessing
+import signal
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from aiogram import Dispatcher
+
+from bot.config import config
+from bot.utils.redis_url import get_redis_url
+from bot.webhook import UpdatePool, WebhookServer, shard_of
+
+logger = logging.getLogger(__name__)
+
+
+def queue_key(shard: int) -> str:
+    return f"bot:updates:{shard}"
+
+
+def processing_key(shard: int) -> str:
+    return f"bot:updates:{shard}:processing"
+
+
+class ShardRouter:
+    """Раскладывает апдейты по очередям шардов в Redis: hash(chat_id) % shards.
+
+    Все апдейты чата попадают в одну очередь и обрабатываются одним
+    процессом по порядку. Используется как sink для WebhookServer и для
+    приема через long polling.
+    """
+
+    def __init__(self, redis, shards: int, max_backlog: int, alive: Callable[[], bool] = lambda: True):
+        self.redis = redis
+        self.shards = shards
+        self.max_backlog = max_backlog
+        self.alive = alive
+        self.stats = {'received': 0, 'rejected': 0}
+
+    def start(self):
+        pass
+
+    async def submit(self, update: Dict[str, Any]) -> bool:
+        """Передать апдейт в очередь шарда; False — очередь переполнена"""
+        key = queue_key(shard_of(update, self.shards))
+        if await self.redis.llen(key) >= self.max_backlog:
+            self.stats['rejected'] += 1
+            return False
+        await self.redis.lpush(key, json.dumps(update, separators=(',', ':'), ensure_ascii=False))
+        self.stats['received'] += 1
+        return True
+
+    async def backlog(self) -> int:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for shard in range(self.shards):
+                pipe.llen(queue_key(shard))
+            return sum(await pipe.execute())
+
+    async def close(self, timeout: float = 0):
+        pass
+
+
+class ShardWorker:
+    """Процесс-обработчик одного шарда.
+
+    Апдейт переносится из очереди шарда в список обрабатываемых (BLMOVE) и
+    удаляется оттуда только после обработки. Протокол остановки (SIGTERM):
+    новые апдейты больше не забираются, уже взятые дорабатываются не дольше
+    config.SHARD_DRAIN_TIMEOUT секунд. Все, что не успело обработаться,
+    остается в списке обрабатываемых и при следующем запуске шарда
+    возвращается в голову очереди — апдейты не теряются (доставка
+    «хотя бы один раз»).
+    """
+
+    def __init__(self, dp: Dispatcher, shard: int, shards: int, redis=None):
+        self.dp = dp
+        self.shard = shard
+        self.redis = redis or aioredis.from_url(get_redis_url(), socket_timeout=10)
+        self.pool = UpdatePool(
+            dp, config.SHARD_CONCURRENCY, config.SHARD_CONCURRENCY * 4,
+            on_done=self._ack, stride=shards
+        )
+        self._stopping = asyncio.Event()
+
+    async def _ack(self, raw: bytes):
+        await self.redis.lrem(processing_key(self.shard), 1, raw)
+
+    async def _recover(self):
+        """Вернуть апдейты, не обработанные прошлым процессом шарда, в голову очереди"""
+        recovered = 0
+        while await self.redis.lmove(processing_key(self.shard), queue_key(self.shard), 'LEFT', 'RIGHT'):
+            recovered += 1
+        if recovered:
+            logger.warning(f"Shard {self.shard}: requeued {recovered} unfinished updates")
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, self.stop)
+
+        await self._recover()
+        self.pool.start()
+        logger.info(f"Shard {self.shard} started")
+
+        try:
+            while not self._stopping.is_set():
+                raw = await self.redis.blmove(
+                    queue_key(self.shard), processing_key(self.shard), 1, 'RIGHT', 'LEFT'
+                )
+                if raw is None:
+                    continue
+                try:
+                    update = json.loads(raw)
+                except ValueError:
+                    logger.error(f"Shard {self.shard}: dropping malformed update")
+                    await self._ack(raw)
+                    continue
+                await self.pool.put(update, raw)
+        finally:
+            await self.pool.close(timeout=config.SHARD_DRAIN_TIMEOUT)
+            await self.redis.close()
+            logger.info(f"Shard {self.shard} drained and stopped")
+
+
+async def poll_updates(bot, sink):
+    """Long polling, который только передает апдейты в sink"""
+    await bot.delete_webhook()
+    offset = None
+    while True:
+        updates = await bot.get_updates(offset=offset, timeout=20)
+        for update in updates:
+            while not await sink.submit(update.to_python()):
+                await asyncio.sleep(0.5)
+            offset = update.update_id + 1
+
+
+class ShardSupervisor:
+    """Входной процесс многопроцессного режима.
+
+    Запускает `shards` процессов-обработчиков (`target(shard, shards)`),
+    принимает апдейты (webhook или long polling) и раскладывает их по
+    шардам через Redis. Упавший обработчик перезапускается; при остановке
+    прием прекращается, обработчикам отправляется SIGTERM и супервизор ждет,
+    пока они доработают взятые апдейты.
+    """
+
+    def __init__(self, dp: Dispatcher, shards: int, target: Callable[[int, int], None]):
+        self.dp = dp
+        self.shards = shards
+        self.target = target
+        self._context = multiprocessing.get_context('spawn')
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * shards
+        self._stopping = False
+
+    def _spawn(self, shard: int):
+        process = self._context.Process(
+            target=self.target, args=(shard, self.shards), name=f"bot-shard-{shard}"
+        )
+        process.start()
+        self._processes[shard] = process
+
+    def alive(self) -> bool:
+        return all(process is not None and process.is_alive() for process in self._processes)
+
+    async def _monitor(self):
+        while not self._stopping:
+            await asyncio.sleep(1)
+            for shard, process in enumerate(self._processes):
+                if not self._stopping and process is not None and not process.is_alive():
+                    logger.error(f"Shard {shard} exited with code {process.exitcode}, restarting")
+                    self._spawn(shard)
+
+    async def _stop_workers(self):
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+
+        def join():
+            for process in self._processes:
+                if process is None:
+                    continue
+                process.join(config.SHARD_DRAIN_TIMEOUT + 5)
+                if process.is_alive():
+                    logger.error(f"{process.name} did not drain in time, killing")
+                    process.kill()
+                    process.join()
+
+        await asyncio.to_thread(join)
+
+    async def run(self):
+        redis = aioredis.from_url(get_redis_url(), socket_connect_timeout=1, socket_timeout=5)
+        router = ShardRouter(redis, self.shards, config.SHARD_MAX_BACKLOG, alive=self.alive)
+
+        for shard in range(self.shards):
+            self._spawn(shard)
+        monitor = asyncio.create_task(self._monitor())
+        logger.info(f"Sharded mode: {self.shards} worker processes")
+
+        try:
+            if config.BOT_MODE == 'webhook':
+                await WebhookServer(self.dp, sink=router).run()
+            else:
+                await poll_updates(self.dp.bot, router)
+        finally:
+            self._stopping = True
+            monitor.cancel()
+            await self._stop_workers()
+            await redis.close()
@@ -0,0 +1,244 @@
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+import functools
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Ограниченный LRU-кэш со сроком жизни записей.
+
+    Записи вытесняются по LRU при превышении `max_entries` или `max_bytes`
+    (размер оценивается по длине компактного JSON значения) и считаются
+    отсутствующими после истечения TTL. Статистика попаданий, промахов и
+    вытеснений доступна в `stats`.
+    """
+
+    def __init__(self, max_entries: int = 10000, default_ttl: float = 60,
+                 max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        # key -> (expires_at, value, size)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[0] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Получить значение и отметить его как недавно использованное"""
+        item = self._data.get(key)
+        if item is None:
+            self.stats['misses'] += 1
+            return default
+
+        if item[0] <= time.monotonic():
+            self._remove(key)
+            self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.stats['hits'] += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Записать значение; ttl в секундах, по умолчанию default_ttl"""
+        if key in self._data:
+            self._remove(key)
+
+        size = self._estimate_size(value) if self.max_bytes else 0
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value, size)
+        self.total_bytes += size
+        self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        self._remove(key)
+        return item[1]
+
+    def clear(self):
+        self._data.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._data.pop(key)
+        self.total_bytes -= size
+
+    def _evict(self):
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes and self.total_bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self.total_bytes -= size
+            self.stats['evictions'] += 1
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        try:
+            return len(json.dumps(value, separators=(',', ':'), default=str))
+        except (TypeError, ValueError):
+            return len(str(value))
+
+
+class TieredCache:
+    """Двухуровневый кэш: локальный TTLCache перед общим для всех реплик Redis.
+
+    Значения хранятся в Redis компактным JSON с TTL; при попадании в Redis
+    запись поднимается в локальный уровень на оставшийся срок. Если Redis
+    недоступен, кэш на `retry_after` секунд работает только локально.
+    Для тестов клиент можно передать явно (например, fakeredis).
+    """
+
+    def __init__(self, namespace: str, redis_url: Optional[str] = None, redis_client=None,
+                 max_entries: int = 10000, max_bytes: Optional[int] = None,
+                 default_ttl: float = 60, retry_after: float = 30):
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.local = TTLCache(max_entries=max_entries, default_ttl=default_ttl, max_bytes=max_bytes)
+        self.redis = redis_client
+        if self.redis is None and redis_url and REDIS_AVAILABLE:
+            self.redis = aioredis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+        self.retry_after = retry_after
+        self._redis_down_until = 0.0
+        self.stats = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'redis_errors': 0}
+
+    def _redis_key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _redis_ready(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, e: Exception):
+        self.stats['redis_errors'] += 1
+        self._redis_down_until = time.monotonic() + self.retry_after
+        logger.warning(f"Redis cache unavailable, using local tier only: {e}")
+
+    def get_local(self, key: Hashable) -> Any:
+        """Только локальный уровень, без обращения к сети"""
+        value = self.local.get(key)
+        if value is not None:
+            self.stats['local_hits'] += 1
+        return value
+
+    async def get(self, key: Hashable) -> Any:
+        value = self.get_local(key)
+        if value is not None:
+            return value
+
+        if self._redis_ready():
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.get(self._redis_key(key))
+                    pipe.pttl(self._redis_key(key))
+                    raw, pttl = await pipe.execute()
+            except Exception as e:
+                self._redis_failed(e)
+            else:
+                if raw is not None:
+                    value = json.loads(raw)
+                    ttl = pttl / 1000 if pttl and pttl > 0 else self.default_ttl
+                    self.local.set(key, value, ttl=ttl)
+                    self.stats['redis_hits'] += 1
+                    return value
+
+        self.stats['misses'] += 1
+        return None
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self.local.set(key, value, ttl=ttl)
+
+        if self._redis_ready():
+            try:
+                raw = json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+                await self.redis.set(self._redis_key(key), raw, px=max(int(ttl * 1000), 1))
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable], ttl: Optional[float] = None) -> Any:
+        """Вернуть значение из кэша или получить через fetch и сохранить.
+
+        Пустые ответы ({}, [], None) не кэшируются — обычно это ошибка API.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        value = await fetch()
+        if value:
+            await self.set(key, value, ttl=ttl)
+        return value
+
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.close()
+
+
+_stats_cache: Optional[TieredCache] = None
+
+
+def get_stats_cache() -> TieredCache:
+    """Общий кэш статистики процесса (локальный уровень + Redis, см. get_redis_url)"""
+    global _stats_cache
+    if _stats_cache is None:
+        from bot.utils.redis_url import get_redis_url
+        _stats_cache = TieredCache(
+            'stats',
+            redis_url=get_redis_url(),
+            max_entries=10000,
+            max_bytes=100 * 1024 * 1024
+        )
+    return _stats_cache
+
+
+async def close_stats_cache():
+    global _stats_cache
+    if _stats_cache is not None:
+        await _stats_cache.close()
+        _stats_cache = None
+
+
+def cached(namespace: str, game: Optional[str] = None, ttl: Optional[float] = None):
+    """Кэшировать результат async-метода в общем кэше статистики.
+
+    Ключ строится из namespace и аргументов вызова; TTL берется явно или из
+    config.UPDATE_INTERVALS для указанной игры.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            parts = [str(arg) for arg in args]
+            parts += [f"{name}={kwargs[name]}" for name in sorted(kwargs)]
+            key = f"{namespace}:{':'.join(parts)}"
+
+            if ttl is not None:
+                key_ttl = ttl
+            else:
+                from bot.config import config
+                key_ttl = config.UPDATE_INTERVALS.get(game, config.STATS_UPDATE_INTERVAL)
+
+            return await get_stats_cache().get_or_fetch(
+                key, lambda: func(self, *args, **kwargs), ttl=key_ttl
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,189 @@
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+import copy
+import json
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+import logging
+
+from aiogram import types
+from aiogram.contrib.fsm_storage.memory import MemoryStorage
+from aiogram.dispatcher.storage import BaseStorage
+
+from bot.utils.redis_url import get_redis_url
+
+logger = logging.getLogger(__name__)
+
+# Поля хэша разговора
+STATE, DATA, BUCKET = 's', 'd', 'b'
+
+Address = Union[str, int, None]
+
+
+def _dumps(value: Dict) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+class RedisFSMStorage(BaseStorage):
+    """Хранилище FSM aiogram в Redis.
+
+    Разговор (чат, пользователь) — один хэш `fsm:{chat}:{user}` с короткими
+    полями: состояние, данные и bucket в компактном JSON. Пустые значения
+    не хранятся (HDEL), поэтому после finish() ключ исчезает целиком, а
+    каждая запись продлевает TTL — брошенные на полпути разговоры удаляются
+    сами через `ttl` секунд.
+
+    get_state читает состояние и данные одним HMGET; в пределах того же
+    апдейта get_data и update_data берут данные из этого чтения, так что
+    проверка фильтра состояния и чтение данных хендлером — один запрос.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, redis_client=None,
+                 prefix: str = 'fsm', ttl: int = 24 * 3600, prefetch: bool = True,
+                 max_prefetched: int = 10000):
+        self.redis = redis_client
+        if self.redis is None:
+            self.redis = aioredis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=5)
+        self.prefix = prefix
+        self.ttl = ttl
+        self.prefetch = prefetch
+        self.max_prefetched = max_prefetched
+        # ключ -> (update_id, состояние, данные), прочитанные в этом апдейте
+        self._prefetched: 'OrderedDict[str, Tuple[int, Optional[str], Dict]]' = OrderedDict()
+
+    def _key(self, chat: Address, user: Address) -> str:
+        chat, user = self.check_address(chat=chat, user=user)
+        return f"{self.prefix}:{chat}:{user}"
+
+    @staticmethod
+    def _update_id() -> Optional[int]:
+        update = types.Update.get_current()
+        return update.update_id if update is not None else None
+
+    def _remember(self, key: str, state: Optional[str], data: Dict):
+        update_id = self._update_id()
+        if not self.prefetch or update_id is None:
+            return
+        self._prefetched[key] = (update_id, state, data)
+        self._prefetched.move_to_end(key)
+        while len(self._prefetched) > self.max_prefetched:
+            self._prefetched.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[Tuple[Optional[str], Dict]]:
+        entry = self._prefetched.get(key)
+        if entry is None or entry[0] != self._update_id():
+            return None
+        return entry[1], entry[2]
+
+    async def _load(self, key: str) -> Tuple[Optional[str], Dict]:
+        cached = self._recall(key)
+        if cached is not None:
+            return cached
+
+        state, raw = await self.redis.hmget(key, STATE, DATA)
+        state = state.decode() if state is not None else None
+        data = json.loads(raw) if raw else {}
+        self._remember(key, state, data)
+        return state, data
+
+    async def _write(self, key: str, field: str, value: Optional[str]):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if value is None:
+                # Пустой хэш Redis удаляет сам — от законченного разговора не остается ключа
+                pipe.hdel(key, field)
+            else:
+                pipe.hset(key, field, value)
+                pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def get_state(self, *, chat: Address = None, user: Address = None,
+                        default: Optional[str] = None) -> Optional[str]:
+        state, _ = await self._load(self._key(chat, user))
+        return state if state is not None else self.resolve_state(default)
+
+    async def get_data(self, *, chat: Address = None, user: Address = None,
+                       default: Optional[Dict] = None) -> Dict:
+        _, data = await self._load(self._key(chat, user))
+        if not data and default is not None:
+            return copy.deepcopy(default)
+        return copy.deepcopy(data)
+
+    async def set_state(self, *, chat: Address = None, user: Address = None,
+                        state: Optional[str] = None):
+        key = self._key(chat, user)
+        state = self.resolve_state(state)
+        await self._write(key, STATE, state)
+
+        cached = self._recall(key)
+        if cached is not None:
+            self._remember(key, state, cached[1])
+
+    async def set_data(self, *, chat: Address = None, user: Address = None,
+                       data: Optional[Dict] = None):
+        key = self._key(chat, user)
+        data = copy.deepcopy(data or {})
+        await self._write(key, DATA, _dumps(data) if data else None)
+
+        cached = self._recall(key)
+        if cached is not None:
+            self._remember(key, cached[0], data)
+
+    async def update_data(self, *, chat: Address = None, user: Address = None,
+                          data: Optional[Dict] = None, **kwargs):
+        key = self._key(chat, user)
+        _, current = await self._load(key)
+        current = dict(current)
+        current.update(data or {}, **kwargs)
+        await self.set_data(chat=chat, user=user, data=current)
+
+    async def reset_state(self, *, chat: Address = None, user: Address = None,
+                          with_data: Optional[bool] = True):
+        key = self._key(chat, user)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hdel(key, *((STATE, DATA) if with_data else (STATE,)))
+            await pipe.execute()
+
+        cached = self._recall(key)
+        if cached is not None:
+            self._remember(key, None, {} if with_data else cached[1])
+
+    def has_bucket(self):
+        return True
+
+    async def get_bucket(self, *, chat: Address = None, user: Address = None,
+                         default: Optional[Dict] = None) -> Dict:
+        raw = await self.redis.hget(self._key(chat, user), BUCKET)
+        if raw:
+            return json.loads(raw)
+        return copy.deepcopy(default) if default is not None else {}
+
+    async def set_bucket(self, *, chat: Address = None, user: Address = None,
+                         bucket: Optional[Dict] = None):
+        await self._write(self._key(chat, user), BUCKET, _dumps(bucket) if bucket else None)
+
+    async def update_bucket(self, *, chat: Address = None, user: Address = None,
+                            bucket: Optional[Dict] = None, **kwargs):
+        current = await self.get_bucket(chat=chat, user=user)
+        current.update(bucket or {}, **kwargs)
+        await self.set_bucket(chat=chat, user=user, bucket=current)
+
+    async def close(self):
+        self._prefetched.clear()
+        await self.redis.close()
+
+    async def wait_closed(self):
+        pass
+
+
+def create_fsm_storage(redis_url: Optional[str] = None, ttl: Optional[int] = None) -> BaseStorage:
+    """Redis-хранилище FSM, если Redis настроен (см. get_redis_url), иначе MemoryStorage"""
+    from bot.config import config
+    redis_url = get_redis_url() if redis_url is None else redis_url
+    if not (REDIS_AVAILABLE and redis_url):
+        logger.warning("Redis is not configured, FSM states are kept in memory")
+        return MemoryStorage()
+    return RedisFSMStorage(redis_url, ttl=ttl or config.FSM_STATE_TTL)
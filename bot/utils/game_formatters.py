@@ -1,55 +1,15 @@
+import json
 from typing import Dict, List
 from datetime import datetime
 
+from bot.utils.localization import get_section
+
 class GameFormatter:
     @staticmethod
     def format_csgo_match_report(match_data: Dict, language: str = 'en') -> str:
         """Форматирует отчет о матче CS:GO"""
         
-        translations = {
-            'ru': {
-                'match_report': 'ОТЧЕТ О МАТЧЕ',
-                'account': 'Аккаунт',
-                'result': 'Результат',
-                'date': 'Дата',
-                'time': 'Время',
-                'map': 'Карта',
-                'player': 'Игрок',
-                'kills': 'Убийства',
-                'assists': 'Помощи',
-                'deaths': 'Смерти',
-                'kd': 'K/D',
-                'adr': 'ADR',
-                'hs': 'HS%',
-                'mvp': 'MVP',
-                'rating': 'Рейтинг',
-                'avg_kda': 'Средний KDA',
-                'avg_adr': 'Средний ADR',
-                'avg_hs': 'Средний HS%'
-            },
-            'en': {
-                'match_report': 'MATCH REPORT',
-                'account': 'Account',
-                'result': 'Result',
-                'date': 'Date',
-                'time': 'Time',
-                'map': 'Map',
-                'player': 'Player',
-                'kills': 'Kills',
-                'assists': 'Assists',
-                'deaths': 'Deaths',
-                'kd': 'K/D',
-                'adr': 'ADR',
-                'hs': 'HS%',
-                'mvp': 'MVP',
-                'rating': 'Rating',
-                'avg_kda': 'Average KDA',
-                'avg_adr': 'Average ADR',
-                'avg_hs': 'Average HS%'
-            }
-        }
-        
-        t = translations.get(language, translations['en'])
+        t = get_section('reports.csgo', language)
         
         report = f"""
 🎯 <b>CS:GO | {t['match_report']}</b>
@@ -74,58 +34,7 @@ class GameFormatter:
     def format_dota_match_report(match_data: Dict, language: str = 'en') -> str:
         """Форматирует отчет о матче Dota 2"""
         
-        translations = {
-            'ru': {
-                'match_report': 'ОТЧЕТ О МАТЧЕ',
-                'account': 'Аккаунт',
-                'result': 'Результат',
-                'date': 'Дата',
-                'time': 'Время',
-                'hero': 'Герой',
-                'player': 'Игрок',
-                'kills': 'Убийства',
-                'deaths': 'Смерти',
-                'assists': 'Помощи',
-                'kda': 'KDA',
-                'gpm': 'GPM',
-                'xpm': 'XPM',
-                'last_hits': 'Посл. удары',
-                'denies': 'Денаи',
-                'hero_damage': 'Урон героям',
-                'tower_damage': 'Урон башням',
-                'net_worth': 'Стоимость',
-                'role': 'Роль',
-                'avg_kda': 'Средний KDA',
-                'avg_gpm': 'Средний GPM',
-                'avg_xpm': 'Средний XPM'
-            },
-            'en': {
-                'match_report': 'MATCH REPORT',
-                'account': 'Account',
-                'result': 'Result',
-                'date': 'Date',
-                'time': 'Time',
-                'hero': 'Hero',
-                'player': 'Player',
-                'kills': 'Kills',
-                'deaths': 'Deaths',
-                'assists': 'Assists',
-                'kda': 'KDA',
-                'gpm': 'GPM',
-                'xpm': 'XPM',
-                'last_hits': 'Last Hits',
-                'denies': 'Denies',
-                'hero_damage': 'Hero Damage',
-                'tower_damage': 'Tower Damage',
-                'net_worth': 'Net Worth',
-                'role': 'Role',
-                'avg_kda': 'Average KDA',
-                'avg_gpm': 'Average GPM',
-                'avg_xpm': 'Average XPM'
-            }
-        }
-        
-        t = translations.get(language, translations['en'])
+        t = get_section('reports.dota2', language)
         
         report = f"""
 ⚔️ <b>Dota 2 | {t['match_report']}</b>
@@ -155,54 +64,7 @@ class GameFormatter:
     def format_valorant_match_report(match_data: Dict, language: str = 'en') -> str:
         """Форматирует отчет о матче Valorant"""
         
-        translations = {
-            'ru': {
-                'match_report': 'ОТЧЕТ О МАТЧЕ',
-                'account': 'Аккаунт',
-                'result': 'Результат',
-                'date': 'Дата',
-                'time': 'Время',
-                'map': 'Карта',
-                'agent': 'Агент',
-                'player': 'Игрок',
-                'kills': 'Убийства',
-                'deaths': 'Смерти',
-                'assists': 'Помощи',
-                'acs': 'ACS',
-                'hs': 'HS%',
-                'first_bloods': 'Первая кровь',
-                'plants': 'Установки',
-                'defuses': 'Обезвреж.',
-                'economy': 'Экономика',
-                'avg_acs': 'Средний ACS',
-                'avg_kd': 'Средний K/D',
-                'avg_hs': 'Средний HS%'
-            },
-            'en': {
-                'match_report': 'MATCH REPORT',
-                'account': 'Account',
-                'result': 'Result',
-                'date': 'Date',
-                'time': 'Time',
-                'map': 'Map',
-                'agent': 'Agent',
-                'player': 'Player',
-                'kills': 'Kills',
-                'deaths': 'Deaths',
-                'assists': 'Assists',
-                'acs': 'ACS',
-                'hs': 'HS%',
-                'first_bloods': 'First Blood',
-                'plants': 'Plants',
-                'defuses': 'Defuses',
-                'economy': 'Economy',
-                'avg_acs': 'Average ACS',
-                'avg_kd': 'Average K/D',
-                'avg_hs': 'Average HS%'
-            }
-        }
-        
-        t = translations.get(language, translations['en'])
+        t = get_section('reports.valorant', language)
         
         report = f"""
 🔫 <b>Valorant | {t['match_report']}</b>
@@ -229,56 +91,7 @@ class GameFormatter:
     def format_lol_match_report(match_data: Dict, language: str = 'en') -> str:
         """Форматирует отчет о матче League of Legends"""
         
-        translations = {
-            'ru': {
-                'match_report': 'ОТЧЕТ О МАТЧЕ',
-                'account': 'Аккаунт',
-                'result': 'Результат',
-                'date': 'Дата',
-                'time': 'Время',
-                'champion': 'Чемпион',
-                'lane': 'Линия',
-                'player': 'Игрок',
-                'kills': 'Убийства',
-                'deaths': 'Смерти',
-                'assists': 'Помощи',
-                'kda': 'KDA',
-                'cs': 'CS',
-                'cs_per_min': 'CS/мин',
-                'gold': 'Золото',
-                'vision': 'Очки зрения',
-                'damage': 'Урон',
-                'kill_participation': 'Участие в убийствах',
-                'avg_kda': 'Средний KDA',
-                'avg_cs_per_min': 'Средний CS/мин',
-                'avg_vision': 'Средние очки зрения'
-            },
-            'en': {
-                'match_report': 'MATCH REPORT',
-                'account': 'Account',
-                'result': 'Result',
-                'date': 'Date',
-                'time': 'Time',
-                'champion': 'Champion',
-                'lane': 'Lane',
-                'player': 'Player',
-                'kills': 'Kills',
-                'deaths': 'Deaths',
-                'assists': 'Assists',
-                'kda': 'KDA',
-                'cs': 'CS',
-                'cs_per_min': 'CS/min',
-                'gold': 'Gold',
-                'vision': 'Vision Score',
-                'damage': 'Damage',
-                'kill_participation': 'Kill Participation',
-                'avg_kda': 'Average KDA',
-                'avg_cs_per_min': 'Average CS/min',
-                'avg_vision': 'Average Vision Score'
-            }
-        }
-        
-        t = translations.get(language, translations['en'])
+        t = get_section('reports.lol', language)
         
         report = f"""
 🏆 <b>League of Legends | {t['match_report']}</b>
@@ -307,56 +120,7 @@ class GameFormatter:
     def format_wot_match_report(match_data: Dict, language: str = 'en') -> str:
         """Форматирует отчет о бою World of Tanks"""
         
-        translations = {
-            'ru': {
-                'battle_report': 'ОТЧЕТ О БОЮ',
-                'account': 'Аккаунт',
-                'result': 'Результат',
-                'date': 'Дата',
-                'time': 'Время',
-                'tank': 'Танк',
-                'tier': 'Уровень',
-                'nation': 'Нация',
-                'damage': 'Урон',
-                'assisted_damage': 'Урон по разведке',
-                'blocked_damage': 'Заблокировано',
-                'kills': 'Уничтожено',
-                'spotted': 'Обнаружено',
-                'xp': 'Опыт',
-                'wn8': 'WN8',
-                'credits': 'Кредиты',
-                'map': 'Карта',
-                'survived': 'Выжил',
-                'avg_damage': 'Средний урон',
-                'avg_kills': 'Среднее уничтожено',
-                'avg_wn8': 'Средний WN8'
-            },
-            'en': {
-                'battle_report': 'BATTLE REPORT',
-                'account': 'Account',
-                'result': 'Result',
-                'date': 'Date',
-                'time': 'Time',
-                'tank': 'Tank',
-                'tier': 'Tier',
-                'nation': 'Nation',
-                'damage': 'Damage',
-                'assisted_damage': 'Assisted Damage',
-                'blocked_damage': 'Blocked Damage',
-                'kills': 'Kills',
-                'spotted': 'Spotted',
-                'xp': 'XP',
-                'wn8': 'WN8',
-                'credits': 'Credits',
-                'map': 'Map',
-                'survived': 'Survived',
-                'avg_damage': 'Average Damage',
-                'avg_kills': 'Average Kills',
-                'avg_wn8': 'Average WN8'
-            }
-        }
-        
-        t = translations.get(language, translations['en'])
+        t = get_section('reports.wot', language)
         
         survived = match_data.get('survived', False)
         survived_text = f"{'✅ ' if survived else '❌ '}{t['survived']}"
@@ -390,52 +154,7 @@ class GameFormatter:
     def format_pubg_match_report(match_data: Dict, language: str = 'en') -> str:
         """Форматирует отчет о матче PUBG"""
         
-        translations = {
-            'ru': {
-                'match_report': 'ОТЧЕТ О МАТЧЕ',
-                'account': 'Аккаунт',
-                'result': 'Результат',
-                'date': 'Дата',
-                'time': 'Время',
-                'map': 'Карта',
-                'mode': 'Режим',
-                'rank': 'Место',
-                'kills': 'Убийства',
-                'assists': 'Помощи',
-                'damage': 'Урон',
-                'headshot_kills': 'Хедшоты',
-                'longest_kill': 'Дальний килл',
-                'survival_time': 'Время выживания',
-                'walk_distance': 'Пройдено пешком',
-                'drive_distance': 'Пройдено на ТС',
-                'avg_kills': 'Средние убийства',
-                'avg_damage': 'Средний урон',
-                'avg_survival_time': 'Среднее время выживания'
-            },
-            'en': {
-                'match_report': 'MATCH REPORT',
-                'account': 'Account',
-                'result': 'Result',
-                'date': 'Date',
-                'time': 'Time',
-                'map': 'Map',
-                'mode': 'Mode',
-                'rank': 'Rank',
-                'kills': 'Kills',
-                'assists': 'Assists',
-                'damage': 'Damage',
-                'headshot_kills': 'Headshots',
-                'longest_kill': 'Longest Kill',
-                'survival_time': 'Survival Time',
-                'walk_distance': 'Walk Distance',
-                'drive_distance': 'Drive Distance',
-                'avg_kills': 'Average Kills',
-                'avg_damage': 'Average Damage',
-                'avg_survival_time': 'Average Survival Time'
-            }
-        }
-        
-        t = translations.get(language, translations['en'])
+        t = get_section('reports.pubg', language)
         
         rank = match_data.get('rank', 0)
         rank_text = f"#{rank}" if rank > 0 else "N/A"
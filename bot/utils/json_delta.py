@@ -0,0 +1,91 @@
+from typing import Any, Dict, List
+
+# Служебные ключи дельты; в данных live-обновлений ключи с '$' не встречаются
+DELETE = '$del'
+APPEND = '$append'
+ITEMS = '$items'
+
+
+def diff(old: Dict, new: Dict) -> Dict:
+    """Компактная дельта между двумя JSON-снимками (словарями).
+
+    Изменившиеся значения записываются целиком, вложенные словари — своей
+    дельтой, удаленные ключи перечисляются в '$del'. Список, к которому
+    только дописали элементы (события матча), кодируется как '$append',
+    список той же длины (игроки) — изменениями по индексам в '$items'.
+    Пустая дельта означает, что снимки равны.
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            delta[key] = value
+            continue
+
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            delta[key] = diff(previous, value)
+        elif isinstance(previous, list) and isinstance(value, list):
+            delta[key] = _diff_list(previous, value)
+        else:
+            delta[key] = value
+
+    removed = [key for key in old if key not in new]
+    if removed:
+        delta[DELETE] = removed
+    return delta
+
+
+def _diff_list(old: List, new: List) -> Any:
+    if len(new) > len(old) and new[:len(old)] == old:
+        return {APPEND: new[len(old):]}
+
+    if len(new) == len(old):
+        items = {}
+        nested = False
+        for index, (previous, value) in enumerate(zip(old, new)):
+            if previous == value:
+                continue
+            if isinstance(previous, dict) and isinstance(value, dict):
+                items[str(index)] = diff(previous, value)
+                nested = True
+            else:
+                items[str(index)] = value
+        # Если заменились все элементы целиком, проще записать список
+        if nested or len(items) < len(new):
+            return {ITEMS: items}
+
+    return new
+
+
+def apply(base: Dict, delta: Dict) -> Dict:
+    """Применить дельту к снимку и вернуть новый снимок.
+
+    base не меняется; неизмененные вложенные значения и значения из дельты
+    не копируются, а разделяются с результатом.
+    """
+    result = dict(base)
+    for key, value in delta.items():
+        if key == DELETE:
+            for removed in value:
+                result.pop(removed, None)
+            continue
+
+        current = result.get(key)
+        if isinstance(value, dict) and isinstance(current, list) and APPEND in value:
+            result[key] = current + value[APPEND]
+        elif isinstance(value, dict) and isinstance(current, list) and ITEMS in value:
+            items = list(current)
+            for index, item in value[ITEMS].items():
+                index = int(index)
+                if isinstance(item, dict) and isinstance(items[index], dict):
+                    items[index] = apply(items[index], item)
+                else:
+                    items[index] = item
+            result[key] = items
+        elif isinstance(value, dict) and isinstance(current, dict):
+            result[key] = apply(current, value)
+        else:
+            result[key] = value
+    return result
@@ -1,43 +1,163 @@
 import json
-import os
+import sys
 from pathlib import Path
+from string import Formatter
+from typing import Dict, Tuple
+
+DEFAULT_LANGUAGE = 'en'
+
+# Языки, компилируемые при старте; остальные — при первом обращении
+PRELOAD_LANGUAGES = ('en', 'ru')
+
+
+class Template:
+    """Строка каталога с заранее разобранными полями подстановки"""
+
+    __slots__ = ('text', 'fields')
+
+    def __init__(self, text: str):
+        self.text = text
+        try:
+            self.fields = tuple(
+                field for _, field, _, _ in Formatter().parse(text) if field is not None
+            )
+        except ValueError:
+            # Непарные фигурные скобки — строка выводится как есть
+            self.fields = ()
+
+    def render(self, values: Dict) -> str:
+        if not self.fields:
+            return self.text
+        try:
+            return self.text.format(**values)
+        except KeyError:
+            return self.text.format_map(_KeepMissing(values))
+
+
+class _KeepMissing(dict):
+    """Не переданное поле остается в тексте как {name} вместо KeyError"""
+
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+def _flatten(tree: Dict, prefix: str = '') -> Dict[str, str]:
+    flat = {}
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
 
 class Localization:
-    def __init__(self):
-        self.locales_path = Path(__file__).parent.parent / 'locales'
-        self.locales = {}
-        self.load_locales()
-    
+    """Скомпилированный каталог переводов.
+
+    JSON-файлы bot/locales разворачиваются в плоский словарь
+    (язык, 'ключ.через.точку') -> Template; ключи интернируются, шаблоны
+    разбираются один раз. Ключи, которых нет в языке, берутся из
+    английского. Языки из PRELOAD_LANGUAGES компилируются при старте,
+    остальные — при первом обращении. Таблицы подписей отчетов о матчах
+    (раздел reports) хранятся в том же каталоге, см. get_section().
+    """
+
+    def __init__(self, locales_path: Path = None, preload: Tuple[str, ...] = PRELOAD_LANGUAGES):
+        self.locales_path = locales_path or Path(__file__).parent.parent / 'locales'
+        self.available = {path.stem: path for path in self.locales_path.glob('*.json')}
+        self.catalog: Dict[Tuple[str, str], Template] = {}
+        self.loaded = set()
+        # Код языка из Telegram -> язык каталога ('pt-br' -> 'pt' или 'en')
+        self._languages: Dict[str, str] = {}
+        self._sections: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._load(DEFAULT_LANGUAGE)
+        for lang in preload:
+            self._load(lang)
+
     def load_locales(self):
-        """Load all locale files"""
-        for file_path in self.locales_path.glob('*.json'):
-            lang = file_path.stem
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self.locales[lang] = json.load(f)
-    
-    def get_text(self, key: str, lang: str = 'en') -> str:
+        """Скомпилировать все языки сразу"""
+        for lang in self.available:
+            self._load(lang)
+
+    def _load(self, lang: str) -> bool:
+        if lang in self.loaded:
+            return True
+        path = self.available.get(lang)
+        if path is None:
+            return False
+
+        with open(path, 'r', encoding='utf-8') as f:
+            flat = _flatten(json.load(f))
+        if lang != DEFAULT_LANGUAGE:
+            fallback = {key: template for (code, key), template in self.catalog.items()
+                        if code == DEFAULT_LANGUAGE and key not in flat}
+        else:
+            fallback = {}
+
+        lang = sys.intern(lang)
+        for key, text in flat.items():
+            self.catalog[(lang, sys.intern(key))] = Template(text)
+        for key, template in fallback.items():
+            self.catalog[(lang, key)] = template
+        self.loaded.add(lang)
+        return True
+
+    def _resolve(self, lang: str) -> str:
+        resolved = self._languages.get(lang)
+        if resolved is None:
+            resolved = DEFAULT_LANGUAGE
+            for code in (lang, (lang or '').split('-')[0].lower()):
+                if code and self._load(code):
+                    resolved = code
+                    break
+            self._languages[lang] = resolved
+        return resolved
+
+    def get_template(self, key: str, lang: str = DEFAULT_LANGUAGE) -> Template:
+        if lang not in self.loaded:
+            lang = self._resolve(lang)
+        return self.catalog.get((lang, key))
+
+    def get_text(self, key: str, lang: str = DEFAULT_LANGUAGE) -> str:
         """Get localized text by key"""
-        if lang not in self.locales:
-            lang = 'en'
-        
-        # Navigate through nested keys (key can be like 'menu.csgo')
-        keys = key.split('.')
-        value = self.locales[lang]
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return f"[{key}]"  # Key not found
-        
-        return value
-    
+        template = self.get_template(key, lang)
+        return template.text if template is not None else f"[{key}]"
+
+    def format_text(self, key: str, lang: str = DEFAULT_LANGUAGE, **values) -> str:
+        """Локализованный текст с подставленными значениями"""
+        template = self.get_template(key, lang)
+        return template.render(values) if template is not None else f"[{key}]"
+
+    def get_section(self, prefix: str, lang: str = DEFAULT_LANGUAGE) -> Dict[str, str]:
+        """Все строки раздела (например, 'reports.csgo') словарем {ключ: текст}.
+
+        Словарь собирается один раз на язык и раздел; изменять его нельзя.
+        """
+        if lang not in self.loaded:
+            lang = self._resolve(lang)
+        section = self._sections.get((lang, prefix))
+        if section is None:
+            start = prefix + '.'
+            section = {
+                key[len(start):]: template.text
+                for (code, key), template in self.catalog.items()
+                if code == lang and key.startswith(start)
+            }
+            self._sections[(lang, prefix)] = section
+        return section
+
     def get_all_languages(self) -> list:
         """Get list of available languages"""
-        return list(self.locales.keys())
+        return list(self.available.keys())
 
 # Singleton instance
 _localization = Localization()
 
 def get_text(key: str, lang: str = 'en') -> str:
-    return _localization.get_text(key, lang)
\ No newline at end of file
+    return _localization.get_text(key, lang)
+
+def format_text(key: str, lang: str = 'en', **values) -> str:
+    return _localization.format_text(key, lang, **values)
+
+def get_section(prefix: str, lang: str = 'en') -> Dict[str, str]:
+    return _localization.get_section(prefix, lang)
@@ -0,0 +1,184 @@
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import time
+import zlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MatchStore:
+    """Постоянное хранилище деталей завершенных матчей.
+
+    Завершенный матч больше не меняется, поэтому его данные хранятся без
+    срока жизни: ключ — идентификатор матча, значение — сжатый zlib
+    компактный JSON в SQLite-файле на постоянном диске. При превышении
+    `max_bytes` вытесняются давно не читанные матчи (LRU по времени доступа).
+
+    Все обращения к SQLite идут через один фоновый поток и не блокируют
+    event loop. Если файл недоступен (например, нет диска локально),
+    хранилище отключается и запросы просто идут в сеть.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evictions': 0}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='match-store')
+        self._db: Optional[sqlite3.Connection] = None
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and not self._disabled:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS matches ("
+                    " key TEXT PRIMARY KEY,"
+                    " data BLOB NOT NULL,"
+                    " size INTEGER NOT NULL,"
+                    " accessed REAL NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS ix_matches_accessed ON matches (accessed)")
+                self.total_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM matches").fetchone()[0]
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Match store {self.path} unavailable, disabled: {e}")
+                self._disabled = True
+        return self._db
+
+    def _get(self, key: str) -> Optional[bytes]:
+        db = self._connect()
+        if db is None:
+            return None
+        row = db.execute("SELECT data FROM matches WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        db.execute("UPDATE matches SET accessed = ? WHERE key = ?", (time.time(), key))
+        db.commit()
+        return row[0]
+
+    def _put(self, key: str, blob: bytes):
+        db = self._connect()
+        if db is None:
+            return
+        previous = db.execute("SELECT size FROM matches WHERE key = ?", (key,)).fetchone()
+        db.execute(
+            "INSERT OR REPLACE INTO matches (key, data, size, accessed) VALUES (?, ?, ?, ?)",
+            (key, blob, len(blob), time.time())
+        )
+        self.total_bytes += len(blob) - (previous[0] if previous else 0)
+
+        if self.total_bytes > self.max_bytes:
+            # Вытесняем с запасом, чтобы не чистить на каждой записи
+            target = self.max_bytes * 0.9
+            cursor = db.execute("SELECT key, size FROM matches ORDER BY accessed")
+            evicted = []
+            for old_key, size in cursor:
+                if self.total_bytes <= target:
+                    break
+                evicted.append((old_key,))
+                self.total_bytes -= size
+            cursor.close()
+            db.executemany("DELETE FROM matches WHERE key = ?", evicted)
+            self.stats['evictions'] += len(evicted)
+        db.commit()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Данные матча из хранилища или None"""
+        try:
+            blob = await self._run(self._get, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Match store read failed for {key}: {e}")
+            blob = None
+
+        if blob is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return json.loads(zlib.decompress(blob))
+
+    async def put(self, key: str, value: Dict):
+        """Сохранить данные завершенного матча навсегда"""
+        payload = json.dumps(value, separators=(',', ':'), default=str).encode()
+        blob = zlib.compress(payload, 6)
+        try:
+            await self._run(self._put, key, blob)
+            self.stats['stored'] += 1
+        except sqlite3.Error as e:
+            logger.warning(f"Match store write failed for {key}: {e}")
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]],
+                           is_final: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Отдать матч из хранилища, иначе загрузить и сохранить.
+
+        Сохраняется только непустой результат, для которого `is_final`
+        (если задан) подтверждает, что матч завершен.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        value = await fetch()
+        if value and (is_final is None or is_final(value)):
+            await self.put(key, value)
+        return value
+
+    async def close(self):
+        def _close():
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+        await self._run(_close)
+        self._executor.shutdown(wait=False)
+
+
+_store: Optional[MatchStore] = None
+
+
+def get_match_store() -> MatchStore:
+    """Общее хранилище завершенных матчей (файл на диске Render)"""
+    global _store
+    if _store is None:
+        from bot.config import config
+        _store = MatchStore(config.MATCH_STORE_PATH, max_bytes=config.MATCH_STORE_MAX_BYTES)
+    return _store
+
+
+async def close_match_store():
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None
+
+
+def stored_match(namespace: str):
+    """Хранить результат async-метода деталей матча навсегда.
+
+    Первый аргумент метода — идентификатор матча; остальные (регион,
+    платформа) на ключ не влияют, так как идентификатор матча уникален.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, match_id, *args, **kwargs):
+            return await get_match_store().get_or_fetch(
+                f"{namespace}:{match_id}", lambda: func(self, match_id, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
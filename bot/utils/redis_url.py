@@ -0,0 +1,44 @@
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+import functools
+import os
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def redis_reachable(redis_url: str) -> bool:
+    """Отвечает ли сервер Redis на PING (таймаут — секунда)"""
+    client = redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+    try:
+        return bool(client.ping())
+    except (redis.RedisError, OSError):
+        return False
+    finally:
+        client.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_redis_url() -> Optional[str]:
+    """Адрес Redis процесса для кэша, лимитов, FSM и шардов или None.
+
+    Redis используется, если REDIS_URL задан в окружении. Адрес по
+    умолчанию из конфига (внутренний хост Render) — только если сервер
+    отвечает на PING: вне Render процесс работает без Redis, а не упирается
+    в таймауты недоступного хоста. Решение принимается один раз на процесс.
+    """
+    from bot.config import config
+    if not REDIS_AVAILABLE:
+        return None
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        return redis_url
+    if config.REDIS_URL and redis_reachable(config.REDIS_URL):
+        return config.REDIS_URL
+    logger.warning("Redis is not configured or unreachable, running without Redis")
+    return None
@@ -1,11 +1,17 @@
 import asyncio
+import math
+import os
 from datetime import datetime, timedelta
+from typing import Optional
 from aiogram import Bot
 from bot.database import async_session
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, and_, or_
 from bot.models.match import Match
 from bot.models.user import User
 from bot.models.subscription import Subscription
+from bot.config import config
+from bot.services.retention import RetentionJob
+from bot.services.admin_stats import get_admin_stats
 from bot.services.notification_service import NotificationService
 
 class TimerManager:
@@ -13,85 +19,107 @@ class TimerManager:
         self.bot = bot
         self.notification_service = NotificationService(bot)
         self.running = True
+        # Upper bound of the reminder windows already processed
+        self.last_check: Optional[datetime] = None
+    
+    @staticmethod
+    def _load_last_check() -> Optional[datetime]:
+        try:
+            with open(config.SUBSCRIPTION_CHECK_STATE_PATH) as f:
+                return datetime.fromisoformat(f.read().strip())
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _save_last_check(checked_at: datetime):
+        path = config.SUBSCRIPTION_CHECK_STATE_PATH
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path + '.tmp', 'w') as f:
+                f.write(checked_at.isoformat())
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"Error saving subscription check time: {e}")
     
     async def check_subscriptions(self):
         """Check and update subscription statuses"""
+        interval = config.SUBSCRIPTION_CHECK_INTERVAL
+        # After a restart, continue from the last persisted check
+        self.last_check = self._load_last_check() or datetime.utcnow() - timedelta(seconds=interval)
         while self.running:
             try:
+                now = datetime.utcnow()
+                
+                # Deactivate expired subscriptions with one bulk UPDATE
                 async with async_session() as session:
-                    # Get expiring subscriptions (within 3 days)
-                    result = await session.execute(
-                        select(Subscription).where(
-                            and_(
-                                Subscription.is_active == True,
-                                Subscription.end_date <= datetime.utcnow() + timedelta(days=3),
-                                Subscription.end_date > datetime.utcnow()
-                            )
-                        )
-                    )
-                    expiring_subs = result.scalars().all()
-                    
-                    for sub in expiring_subs:
-                        # Get user info
-                        user_result = await session.execute(
-                            select(User).where(User.id == sub.user_id)
-                        )
-                        user = user_result.scalar_one_or_none()
-                        
-                        if user:
-                            days_left = (sub.end_date - datetime.utcnow()).days
-                            await self.notification_service.send_subscription_reminder(
-                                user.telegram_id,
-                                user.language,
-                                days_left
-                            )
-                    
-                    # Deactivate expired subscriptions
                     result = await session.execute(
-                        select(Subscription).where(
+                        update(Subscription)
+                        .where(
                             and_(
                                 Subscription.is_active == True,
-                                Subscription.end_date <= datetime.utcnow()
+                                Subscription.end_date <= now
                             )
                         )
+                        .values(is_active=False, updated_at=now)
+                        .returning(Subscription.user_id)
+                        .execution_options(synchronize_session=False)
                     )
-                    expired_subs = result.scalars().all()
-                    
-                    for sub in expired_subs:
-                        sub.is_active = False
-                    
+                    expired = len(result.all())
                     await session.commit()
+                
+                sent = await self.notification_service.send_subscription_reminders(
+                    self.expiring_subscriptions(self.last_check, now)
+                )
+                self.last_check = now
+                self._save_last_check(now)
+                if expired or sent:
+                    print(f"Subscriptions: {expired} expired, {sent} reminders sent")
                     
             except Exception as e:
                 print(f"Error in subscription check: {e}")
             
-            await asyncio.sleep(3600)  # Check every hour
+            await asyncio.sleep(interval)
     
-    async def reset_daily_limits(self):
-        """Reset daily match limits at midnight UTC"""
-        while self.running:
-            try:
-                now = datetime.utcnow()
-                # Calculate time until next midnight
-                next_midnight = (now + timedelta(days=1)).replace(
-                    hour=0, minute=0, second=0, microsecond=0
-                )
-                wait_seconds = (next_midnight - now).total_seconds()
-                
-                # Wait until midnight
-                await asyncio.sleep(wait_seconds)
-                
-                # Reset daily stats
-                async with async_session() as session:
-                    await session.execute(
-                        "UPDATE daily_stats SET matches_used = 0, last_reset = :now",
-                        {'now': datetime.utcnow()}
+    async def expiring_subscriptions(self, since: datetime, now: datetime, page_size: int = 1000):
+        """Stream (telegram_id, language, days_left) of subscriptions to remind about
+        
+        A subscription is picked up once per remaining day: when its end_date
+        crosses 3, 2 or 1 days ahead between the previous check (`since`) and
+        this one, so processing time and downtime leave no gaps.
+        Pages are read by subscription id, each in its own short query.
+        """
+        windows = [
+            and_(
+                Subscription.end_date > since + timedelta(days=days),
+                Subscription.end_date <= now + timedelta(days=days)
+            )
+            for days in (1, 2, 3)
+        ]
+        last_id = 0
+        while True:
+            async with async_session() as session:
+                result = await session.execute(
+                    select(Subscription.id, User.telegram_id, User.language, Subscription.end_date)
+                    .join(User, User.id == Subscription.user_id)
+                    .where(
+                        and_(
+                            Subscription.is_active == True,
+                            Subscription.id > last_id,
+                            or_(*windows)
+                        )
                     )
-                    await session.commit()
-                    
-            except Exception as e:
-                print(f"Error resetting daily limits: {e}")
-                await asyncio.sleep(60)  # Retry after error
+                    .order_by(Subscription.id)
+                    .limit(page_size)
+                )
+                rows = result.all()
+            
+            for sub_id, telegram_id, language, end_date in rows:
+                days_left = math.ceil((end_date - now).total_seconds() / 86400)
+                yield telegram_id, language, days_left
+            
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1][0]
     
     async def update_live_matches(self):
         """Update live match statistics every 3 minutes"""
@@ -119,12 +147,35 @@ class TimerManager:
             
             await asyncio.sleep(180)  # Update every 3 minutes
     
+    async def run_retention(self):
+        """Periodically compact old match updates and player stats"""
+        job = RetentionJob()
+        while self.running:
+            try:
+                await job.run_once()
+            except Exception as e:
+                print(f"Error in retention job: {e}")
+            
+            await asyncio.sleep(config.RETENTION_INTERVAL)
+    
+    async def refresh_admin_stats(self):
+        """Keep the admin statistics snapshot fresh"""
+        service = get_admin_stats()
+        while self.running:
+            try:
+                await service.refresh()
+            except Exception as e:
+                print(f"Error refreshing admin stats: {e}")
+            
+            await asyncio.sleep(service.interval)
+    
     async def start_all(self):
         """Start all timer tasks"""
         tasks = [
             self.check_subscriptions(),
-            self.reset_daily_limits(),
-            self.update_live_matches()
+            self.update_live_matches(),
+            self.run_retention(),
+            self.refresh_admin_stats()
         ]
         await asyncio.gather(*tasks)
 
@@ -1,8 +1,8 @@
 import re
 from typing import Optional, Tuple
 from datetime import datetime
-import aiohttp
 from bot.config import config
+from bot.services.http_session import get_http_session
 
 class ValidationError(Exception):
     """Исключение при валидации"""
@@ -33,25 +33,25 @@ async def validate_steam_id(steam_id: str) -> Tuple[bool, str]:
             'steamids': steam_id
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    players = data.get('response', {}).get('players', [])
+        session = get_http_session()
+        async with session.get(url, params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+                players = data.get('response', {}).get('players', [])
                     
-                    if not players:
-                        return False, "Steam аккаунт не найден"
+                if not players:
+                    return False, "Steam аккаунт не найден"
                     
-                    player = players[0]
-                    nickname = player.get('personaname', f'Steam_{steam_id[-8:]}')
+                player = players[0]
+                nickname = player.get('personaname', f'Steam_{steam_id[-8:]}')
                     
-                    # Проверяем, не забанен ли аккаунт
-                    if player.get('communitybanned') or player.get('vacbanned'):
-                        return False, "Steam аккаунт имеет ограничения"
+                # Проверяем, не забанен ли аккаунт
+                if player.get('communitybanned') or player.get('vacbanned'):
+                    return False, "Steam аккаунт имеет ограничения"
                     
-                    return True, nickname
+                return True, nickname
                 
-                return False, f"Ошибка Steam API: {response.status}"
+            return False, f"Ошибка Steam API: {response.status}"
     
     except Exception as e:
         return False, f"Ошибка при проверке Steam ID: {str(e)}"
@@ -87,16 +87,16 @@ async def validate_riot_id(riot_id: str, game: str = 'valorant') -> Tuple[bool,
         if game == 'valorant':
             url = f"https://api.henrikdev.xyz/valorant/v1/account/{username}/{tag}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('status') == 200:
-                            return True, f"{username}#{tag}"
-                        else:
-                            return False, "Riot аккаунт не найден"
+            session = get_http_session()
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data.get('status') == 200:
+                        return True, f"{username}#{tag}"
                     else:
-                        return False, f"Ошибка Valorant API: {response.status}"
+                        return False, "Riot аккаунт не найден"
+                else:
+                    return False, f"Ошибка Valorant API: {response.status}"
         
         # Для LoL
         elif game == 'lol':
@@ -145,21 +145,21 @@ async def validate_wot_id(wot_id: str, region: str = 'ru') -> Tuple[bool, str]:
             'fields': 'nickname,account_id'
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('status') == 'ok':
-                        account_data = data.get('data', {}).get(wot_id, {})
-                        if account_data:
-                            nickname = account_data.get('nickname', f'WoT_{wot_id[-6:]}')
-                            return True, nickname
-                        else:
-                            return False, "Аккаунт WoT не найден"
+        session = get_http_session()
+        async with session.get(url, params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+                if data.get('status') == 'ok':
+                    account_data = data.get('data', {}).get(wot_id, {})
+                    if account_data:
+                        nickname = account_data.get('nickname', f'WoT_{wot_id[-6:]}')
+                        return True, nickname
                     else:
-                        return False, f"Ошибка WoT API: {data.get('error', {}).get('message', 'Unknown error')}"
+                        return False, "Аккаунт WoT не найден"
+                else:
+                    return False, f"Ошибка WoT API: {data.get('error', {}).get('message', 'Unknown error')}"
                 
-                return False, f"Ошибка HTTP: {response.status}"
+            return False, f"Ошибка HTTP: {response.status}"
     
     except Exception as e:
         return False, f"Ошибка при проверке WoT ID: {str(e)}"
@@ -188,20 +188,20 @@ async def validate_pubg_id(pubg_id: str, platform: str = 'steam') -> Tuple[bool,
             'Accept': 'application/vnd.api+json'
         }
         
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('data'):
-                        player = data['data'][0]
-                        nickname = player.get('attributes', {}).get('name', pubg_id)
-                        return True, nickname
-                    else:
-                        return False, "Игрок PUBG не найден"
-                elif response.status == 404:
-                    return False, "Игрок PUBG не найден"
+        session = get_http_session()
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                if data.get('data'):
+                    player = data['data'][0]
+                    nickname = player.get('attributes', {}).get('name', pubg_id)
+                    return True, nickname
                 else:
-                    return False, f"Ошибка PUBG API: {response.status}"
+                    return False, "Игрок PUBG не найден"
+            elif response.status == 404:
+                return False, "Игрок PUBG не найден"
+            else:
+                return False, f"Ошибка PUBG API: {response.status}"
     
     except Exception as e:
         return False, f"Ошибка при проверке PUBG ID: {str(e)}"
@@ -0,0 +1,230 @@
+import asyncio
+import hmac
+import time
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from aiogram import Bot, Dispatcher, types
+from aiohttp import web
+
+from bot.config import config
+from bot.services.api_gateway import get_api_gateway
+from bot.utils.cache import get_stats_cache
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+def chat_id(update: Dict[str, Any]) -> Optional[int]:
+    """Чат (или пользователь), к которому относится апдейт"""
+    for key in ('message', 'edited_message', 'channel_post', 'edited_channel_post'):
+        if key in update:
+            return update[key].get('chat', {}).get('id')
+    for key, value in update.items():
+        if isinstance(value, dict):
+            message = value.get('message')
+            if isinstance(message, dict) and 'chat' in message:
+                return message['chat'].get('id')
+            if 'from' in value:
+                return value['from'].get('id')
+    return None
+
+
+def shard_of(update: Dict[str, Any], shards: int, stride: int = 1) -> int:
+    """Номер шарда апдейта: (hash(chat_id) // stride) % shards, без чата — по update_id.
+
+    stride — число шардов уровнем выше: внутри шарда s все чаты имеют
+    hash % stride == s, и без деления на stride воркеры пула шарда
+    получали бы апдейты неравномерно.
+    """
+    key = chat_id(update)
+    if key is None:
+        key = update.get('update_id', 0)
+    return (hash(key) // stride) % shards
+
+
+class UpdatePool:
+    """Пул воркеров обработки апдейтов в одном процессе.
+
+    Апдейты одного чата всегда попадают к одному воркеру, поэтому порядок
+    сообщений и переходы FSM пользователя сохраняются, а разные чаты
+    обрабатываются параллельно. `on_done(token)` вызывается после обработки
+    каждого апдейта, поставленного через put(..., token). `stride` — число
+    шардов, между которыми апдейты уже разложены (см. shard_of).
+    """
+
+    def __init__(self, dp: Dispatcher, workers: int, queue_size: int,
+                 on_done: Optional[Callable[[Any], Any]] = None, stride: int = 1):
+        self.dp = dp
+        self.workers = workers
+        self.stride = stride
+        self.on_done = on_done
+        self._queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=max(queue_size // workers, 1)) for _ in range(workers)
+        ]
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {'received': 0, 'processed': 0, 'failed': 0, 'rejected': 0}
+        self.busy_seconds = 0.0
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+
+    async def submit(self, update: Dict[str, Any]) -> bool:
+        """Поставить апдейт в очередь без ожидания; False — очередь заполнена"""
+        try:
+            self._queues[shard_of(update, self.workers, self.stride)].put_nowait((update, None))
+        except asyncio.QueueFull:
+            self.stats['rejected'] += 1
+            return False
+        self.stats['received'] += 1
+        return True
+
+    async def put(self, update: Dict[str, Any], token: Any = None):
+        """Поставить апдейт в очередь, дождавшись места"""
+        await self._queues[shard_of(update, self.workers, self.stride)].put((update, token))
+        self.stats['received'] += 1
+
+    async def _worker(self, queue: asyncio.Queue):
+        Bot.set_current(self.dp.bot)
+        Dispatcher.set_current(self.dp)
+        while True:
+            update, token = await queue.get()
+            started = time.monotonic()
+            try:
+                await self.dp.process_update(types.Update(**update))
+                self.stats['processed'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"Error processing update {update.get('update_id')}: {e}")
+            try:
+                if self.on_done is not None and token is not None:
+                    await self.on_done(token)
+            except Exception as e:
+                logger.error(f"Error acknowledging update {update.get('update_id')}: {e}")
+            finally:
+                self.busy_seconds += time.monotonic() - started
+                queue.task_done()
+
+    def alive(self) -> bool:
+        return bool(self._tasks) and not any(task.done() for task in self._tasks)
+
+    async def backlog(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    async def close(self, timeout: float = 10):
+        """Доработать очередь (не дольше `timeout` секунд) и остановить воркеров"""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Update pool shutdown: {await self.backlog()} updates left unprocessed")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class WebhookServer:
+    """Прием апдейтов Telegram через webhook на aiohttp.
+
+    POST на config.WEBHOOK_PATH только передает апдейт в `sink` и сразу
+    отвечает 200. По умолчанию sink — UpdatePool из config.WEBHOOK_WORKERS
+    воркеров в этом же процессе; в многопроцессном режиме — ShardRouter
+    (bot.sharding). Если sink переполнен, возвращается 503 и Telegram
+    повторит доставку позже.
+
+    Также отдает /health (проверка Render) и /metrics (формат Prometheus).
+    """
+
+    def __init__(self, dp: Dispatcher, path: Optional[str] = None, sink=None,
+                 secret: Optional[str] = None):
+        self.dp = dp
+        self.path = path or config.WEBHOOK_PATH
+        self.sink = sink or UpdatePool(dp, config.WEBHOOK_WORKERS, config.WEBHOOK_QUEUE_SIZE)
+        self.secret = config.WEBHOOK_SECRET if secret is None else secret
+        self._started = time.monotonic()
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get('/health', self.health)
+        app.router.add_get('/metrics', self.metrics)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        if self.secret and not hmac.compare_digest(request.headers.get(SECRET_HEADER, ''), self.secret):
+            return web.Response(status=403)
+
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        if not await self.sink.submit(update):
+            return web.Response(status=503)
+        return web.Response(status=200)
+
+    async def health(self, request: web.Request) -> web.Response:
+        alive = self.sink.alive()
+        data = {
+            'status': 'ok' if alive else 'degraded',
+            'uptime': round(time.monotonic() - self._started),
+            'queued': await self.sink.backlog()
+        }
+        return web.json_response(data, status=200 if alive else 503)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        lines = ['# TYPE bot_updates_total counter']
+        for name, value in self.sink.stats.items():
+            lines.append(f'bot_updates_total{{result="{name}"}} {value}')
+        lines += [
+            '# TYPE bot_update_queue_depth gauge',
+            f'bot_update_queue_depth {await self.sink.backlog()}',
+            '# TYPE bot_uptime_seconds gauge',
+            f'bot_uptime_seconds {time.monotonic() - self._started:.0f}',
+        ]
+        if isinstance(self.sink, UpdatePool):
+            lines += [
+                '# TYPE bot_update_processing_seconds_total counter',
+                f'bot_update_processing_seconds_total {self.sink.busy_seconds:.3f}',
+            ]
+
+        gateway = get_api_gateway()
+        lines.append('# TYPE api_requests_total counter')
+        for priority, counters in gateway.stats.items():
+            for result, value in counters.items():
+                lines.append(f'api_requests_total{{priority="{priority}",result="{result}"}} {value}')
+        lines.append('# TYPE api_quota_usage gauge')
+        for api, usage in (await gateway.rate_limiter.usage()).items():
+            lines.append(f'api_quota_usage{{api="{api}"}} {usage:.3f}')
+
+        lines.append('# TYPE stats_cache_total counter')
+        for name, value in get_stats_cache().stats.items():
+            lines.append(f'stats_cache_total{{result="{name}"}} {value}')
+
+        return web.Response(text='\n'.join(lines) + '\n', content_type='text/plain')
+
+    async def run(self, host: Optional[str] = None, port: Optional[int] = None):
+        """Запустить сервер, зарегистрировать webhook и работать до отмены"""
+        self.sink.start()
+        runner = web.AppRunner(self.build_app(), access_log=None)
+        await runner.setup()
+        host = host or config.WEBAPP_HOST
+        port = port or config.WEBAPP_PORT
+        await web.TCPSite(runner, host, port).start()
+
+        await self.dp.bot.set_webhook(
+            config.WEBHOOK_URL,
+            max_connections=config.WEBHOOK_MAX_CONNECTIONS,
+            secret_token=self.secret or None
+        )
+        logger.info(f"Webhook mode: listening on {host}:{port}")
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            # Сначала перестаем принимать апдейты, затем дорабатываем очередь.
+            # Webhook не снимаем: при перезапуске апдейты дождутся нового экземпляра.
+            await runner.cleanup()
+            await self.sink.close()
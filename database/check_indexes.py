@@ -0,0 +1,138 @@
+"""Проверка, что горячие запросы используют индексы (EXPLAIN).
+
+    python database/check_indexes.py                 # временная SQLite
+    python database/check_indexes.py --url "$DATABASE_URL"
+
+Для SQLite схема создается во временном файле и к ней применяются миграции.
+Для Postgres используется существующая схема; последовательное сканирование
+отключается на время проверки, чтобы маленькие таблицы не скрывали индекс.
+Код возврата 1, если хотя бы один запрос идет полным сканированием.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, select, text
+
+from bot.database import Database
+from bot.models import GameAccount, Match, MatchUpdate, Subscription, User
+from bot.services.user_search import username_condition
+
+now = datetime(2024, 1, 1)
+
+# (описание, запрос, ожидаемые индексы — подходит любой из них)
+HOT_QUERIES = [
+    (
+        "LiveMatchUpdater._save_match_update",
+        select(Match).where(and_(
+            Match.user_id == 1, Match.game == 'dota2',
+            Match.match_id == '123', Match.is_completed == False
+        )),
+        ('matches_match_id_key', 'sqlite_autoindex_matches_1'),
+    ),
+    (
+        "TimerManager.update_live_matches",
+        select(Match).where(and_(Match.is_tracked == True, Match.is_completed == False)),
+        ('ix_matches_tracked_open',),
+    ),
+    (
+        "Админ-статистика: матчи за сегодня",
+        select(Match).where(Match.start_time >= now),
+        ('ix_matches_start_time',),
+    ),
+    (
+        "Игровые хендлеры: аккаунт пользователя",
+        select(GameAccount).where(and_(GameAccount.user_id == 1, GameAccount.game == 'csgo')),
+        ('ix_game_accounts_user_game',),
+    ),
+    (
+        "TimerManager.check_subscriptions",
+        select(Subscription).where(and_(
+            Subscription.is_active == True,
+            Subscription.end_date <= now + timedelta(days=3),
+            Subscription.end_date > now
+        )),
+        ('ix_subscriptions_active_end_date',),
+    ),
+    (
+        "Обновления матча по времени",
+        select(MatchUpdate).where(MatchUpdate.match_id == 1).order_by(MatchUpdate.update_time),
+        ('ix_match_updates_match_time',),
+    ),
+]
+
+
+def dialect_queries(dialect: str):
+    """Запросы, текст которых зависит от СУБД"""
+    return [
+        (
+            "Админ-поиск пользователя по части username",
+            select(User).where(User.id > 0, username_condition(dialect, 'player'))
+            .order_by(User.id).limit(11),
+            ('ix_users_username_trgm', 'users_fts'),
+        ),
+    ]
+
+
+async def explain(conn, dialect: str, query) -> str:
+    sql = str(query.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+    if dialect == 'sqlite':
+        result = await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+        return '\n'.join(row[-1] for row in result)
+    result = await conn.execute(text(f"EXPLAIN {sql}"))
+    return '\n'.join(row[0] for row in result)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default=None, help="URL базы (по умолчанию — временная SQLite)")
+    args = parser.parse_args()
+
+    tmp = None
+    url = args.url
+    if url is None:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'check.db')}"
+
+    db = Database(url)
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        await db.create_tables()
+        await db.run_migrations()
+
+    print(f"🔍 Проверка индексов ({dialect})...")
+    print("=" * 50)
+
+    all_ok = True
+    async with db.engine.connect() as conn:
+        if dialect == 'postgresql':
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+
+        for name, query, indexes in HOT_QUERIES + dialect_queries(dialect):
+            plan = await explain(conn, dialect, query)
+            used = next((index for index in indexes if index in plan), None)
+            if used:
+                print(f"✅ {name}: {used}")
+            else:
+                all_ok = False
+                print(f"❌ {name}: индекс не используется")
+                print('   ' + plan.replace('\n', '\n   '))
+
+        await conn.rollback()
+
+    await db.close()
+    if tmp:
+        tmp.cleanup()
+
+    print("=" * 50)
+    print("✅ Все запросы используют индексы" if all_ok else "❌ Есть запросы без индексов")
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,27 +1,29 @@
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
 from bot.config import config
+from bot.utils.cache import cached
+from bot.utils.match_store import get_match_store, stored_match
+from bot.services.api_gateway import get_api_gateway
+from bot.services.http_session import get_http_session
+from bot.services.pubg_telemetry import get_player_telemetry
 import json
 
 class PUBGIntegration:
     """Интеграция с PUBG API"""
     
     def __init__(self):
+        self.gateway = get_api_gateway()
         self.api_key = config.PUBG_API_KEY
-        self.session = None
+        self.headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Accept': 'application/vnd.api+json'
+        }
         self.platforms = ['steam', 'xbox', 'psn', 'kakao']
         self.base_url = "https://api.pubg.com/shards"
     
     async def get_session(self):
-        if not self.session:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Accept': 'application/vnd.api+json'
-            }
-            self.session = aiohttp.ClientSession(headers=headers)
-        return self.session
+        return get_http_session()
     
     async def find_player(self, player_name: str, platform: str = 'steam') -> Optional[Dict]:
         """Найти игрока по имени"""
@@ -29,13 +31,14 @@ class PUBGIntegration:
         params = {'filter[playerNames]': player_name}
         
         session = await self.get_session()
-        async with session.get(url, params=params) as response:
+        async with self.gateway.get(session, url, 'pubg', params=params, headers=self.headers) as response:
             if response.status == 200:
                 data = await response.json()
                 if data.get('data'):
                     return data['data'][0]
         return None
     
+    @cached('pubg_player_stats', game='pubg')
     async def get_player_stats(self, player_id: str, platform: str = 'steam', season_id: str = None) -> Dict:
         """Получить статистику игрока"""
         if not season_id:
@@ -43,7 +46,7 @@ class PUBGIntegration:
             seasons_url = f"{self.base_url}/{platform}/seasons"
             session = await self.get_session()
             
-            async with session.get(seasons_url) as response:
+            async with self.gateway.get(session, seasons_url, 'pubg', headers=self.headers) as response:
                 if response.status == 200:
                     seasons_data = await response.json()
                     for season in seasons_data.get('data', []):
@@ -57,7 +60,7 @@ class PUBGIntegration:
         # Получить статистику сезона
         stats_url = f"{self.base_url}/{platform}/players/{player_id}/seasons/{season_id}"
         
-        async with session.get(stats_url) as response:
+        async with self.gateway.get(session, stats_url, 'pubg', headers=self.headers) as response:
             if response.status == 200:
                 data = await response.json()
                 
@@ -100,33 +103,34 @@ class PUBGIntegration:
                 return stats
         return {}
     
+    @cached('pubg_match_history', game='pubg')
     async def get_match_history(self, player_id: str, platform: str = 'steam', count: int = 10) -> List[Dict]:
         """Получить историю матчей"""
         # Сначала получаем данные игрока
         player_url = f"{self.base_url}/{platform}/players/{player_id}"
         
         session = await self.get_session()
-        async with session.get(player_url) as response:
-            if response.status == 200:
-                player_data = await response.json()
-                match_ids = player_data.get('data', {}).get('relationships', {}).get('matches', {}).get('data', [])
-                
-                matches = []
-                for match_data in match_ids[:count]:
-                    match_id = match_data.get('id')
-                    match_info = await self.get_match_details(match_id, platform)
-                    if match_info:
-                        matches.append(match_info)
-                
-                return matches
-        return []
+        async with self.gateway.get(session, player_url, 'pubg', headers=self.headers) as response:
+            if response.status != 200:
+                return []
+            player_data = await response.json()
+        
+        match_ids = player_data.get('data', {}).get('relationships', {}).get('matches', {}).get('data', [])
+        
+        # Детали матчей запрашиваем параллельно; неудачные матчи пропускаются
+        return await self.gateway.fan_out(
+            'pubg',
+            lambda match_id: self.get_match_details(match_id, platform),
+            [match_data.get('id') for match_data in match_ids[:count]]
+        )
     
+    @stored_match('pubg_match')
     async def get_match_details(self, match_id: str, platform: str = 'steam') -> Optional[Dict]:
         """Получить детали матча"""
         url = f"{self.base_url}/{platform}/matches/{match_id}"
         
         session = await self.get_session()
-        async with session.get(url) as response:
+        async with self.gateway.get(session, url, 'pubg', headers=self.headers) as response:
             if response.status == 200:
                 data = await response.json()
                 
@@ -159,7 +163,20 @@ class PUBGIntegration:
                 return match_info
         return None
     
+    async def get_match_telemetry(self, match_id: str, player_id: str, platform: str = 'steam') -> Dict:
+        """Сводка телеметрии матча по игроку: высадка, перемещение, бой"""
+        async def fetch():
+            match_info = await self.get_match_details(match_id, platform)
+            if not match_info or not match_info.get('telemetry_url'):
+                return {}
+            summary = await get_player_telemetry(match_info['telemetry_url'], player_id)
+            if summary:
+                summary['match_id'] = match_id
+            return summary
+        
+        return await get_match_store().get_or_fetch(f"pubg_telemetry:{match_id}:{player_id}", fetch)
+    
     async def close(self):
         """Закрыть сессию"""
-        if self.session:
-            await self.session.close()
\ No newline at end of file
+        # Сессия общая для процесса и закрывается при остановке бота
+        pass
\ No newline at end of file
@@ -1,16 +1,20 @@
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
 from bot.config import config
+from bot.utils.cache import cached
+from bot.utils.match_store import stored_match
+from bot.services.api_gateway import get_api_gateway
+from bot.services.http_session import get_http_session
 import json
 
 class RiotIntegration:
     """Интеграция с Riot Games API для Valorant и LoL"""
     
     def __init__(self):
+        self.gateway = get_api_gateway()
         self.api_key = config.RIOT_API_KEY
-        self.session = None
+        self.headers = {'X-Riot-Token': self.api_key}
         self.regions = {
             'valorant': {
                 'eu': 'eu',
@@ -36,80 +40,89 @@ class RiotIntegration:
         }
     
     async def get_session(self):
-        if not self.session:
-            headers = {'X-Riot-Token': self.api_key}
-            self.session = aiohttp.ClientSession(headers=headers)
-        return self.session
+        return get_http_session()
     
     async def get_valorant_account(self, riot_id: str, tag: str, region: str = 'eu') -> Dict:
         """Получить аккаунт Valorant"""
         url = f"https://{region}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{riot_id}/{tag}"
         
         session = await self.get_session()
-        async with session.get(url) as response:
+        async with self.gateway.get(session, url, 'riot', headers=self.headers) as response:
             if response.status == 200:
                 return await response.json()
         return {}
     
+    @cached('valorant_stats', game='valorant')
     async def get_valorant_stats(self, puuid: str, region: str = 'eu') -> Dict:
         """Получить статистику Valorant"""
         # Получить последние матчи
         url = f"https://{region}.api.riotgames.com/val/match/v1/matchlists/by-puuid/{puuid}"
         
         session = await self.get_session()
-        async with session.get(url) as response:
+        async with self.gateway.get(session, url, 'riot', headers=self.headers) as response:
+            if response.status != 200:
+                return {}
+            matches = await response.json()
+        
+        stats = {
+            'total_matches': len(matches),
+            'recent_matches': matches[:10],
+            'agents_played': {},
+            'maps_played': {}
+        }
+        
+        # Анализируем матчи: детали запрашиваются параллельно
+        match_details = await self.gateway.fan_out(
+            'riot', lambda match_id: self.get_valorant_match(match_id, region), matches[:5]
+        )
+        for match_data in match_details:
+            # Обрабатываем статистику
+            pass
+        
+        return stats
+    
+    @stored_match('valorant_match')
+    async def get_valorant_match(self, match_id: str, region: str = 'eu') -> Optional[Dict]:
+        """Получить детали матча Valorant"""
+        url = f"https://{region}.api.riotgames.com/val/match/v1/matches/{match_id}"
+        
+        session = await self.get_session()
+        async with self.gateway.get(session, url, 'riot', headers=self.headers) as response:
             if response.status == 200:
-                matches = await response.json()
-                
-                stats = {
-                    'total_matches': len(matches),
-                    'recent_matches': matches[:10],
-                    'agents_played': {},
-                    'maps_played': {}
-                }
-                
-                # Анализируем матчи
-                for match_id in matches[:5]:
-                    match_url = f"https://{region}.api.riotgames.com/val/match/v1/matches/{match_id}"
-                    async with session.get(match_url) as match_response:
-                        if match_response.status == 200:
-                            match_data = await match_response.json()
-                            # Обрабатываем статистику
-                            pass
-                
-                return stats
-        return {}
+                return await response.json()
+        return None
     
     async def get_lol_account(self, riot_id: str, tag: str, region: str = 'euw1') -> Dict:
         """Получить аккаунт LoL"""
         url = f"https://{region}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{riot_id}/{tag}"
         
         session = await self.get_session()
-        async with session.get(url) as response:
+        async with self.gateway.get(session, url, 'riot', headers=self.headers) as response:
             if response.status == 200:
                 return await response.json()
         return {}
     
+    @cached('lol_stats', game='lol')
     async def get_lol_stats(self, summoner_id: str, region: str = 'euw1') -> Dict:
         """Получить статистику LoL"""
         # Получить информацию о summoner
         summoner_url = f"https://{region}.api.riotgames.com/lol/summoner/v4/summoners/{summoner_id}"
         
         session = await self.get_session()
-        async with session.get(summoner_url) as response:
+        async with self.gateway.get(session, summoner_url, 'riot', headers=self.headers) as response:
             if response.status == 200:
                 summoner_data = await response.json()
                 
                 # Получить ранги
                 ranks_url = f"https://{region}.api.riotgames.com/lol/league/v4/entries/by-summoner/{summoner_id}"
-                async with session.get(ranks_url) as ranks_response:
+                async with self.gateway.get(session, ranks_url, 'riot', headers=self.headers) as ranks_response:
                     if ranks_response.status == 200:
                         ranks_data = await ranks_response.json()
                     
                 # Получить историю матчей
                 matches_url = f"https://{region}.api.riotgames.com/lol/match/v5/matches/by-puuid/{summoner_data['puuid']}/ids"
                 params = {'count': 20}
-                async with session.get(matches_url, params=params) as matches_response:
+                async with self.gateway.get(session, matches_url, 'riot', params=params, headers=self.headers) as matches_response:
                     if matches_response.status == 200:
                         matches = await matches_response.json()
                 
@@ -126,5 +139,5 @@ class RiotIntegration:
     
     async def close(self):
         """Закрыть сессию"""
-        if self.session:
-            await self.session.close()
\ No newline at end of file
+        # Сессия общая для процесса и закрывается при остановке бота
+        pass
\ No newline at end of file
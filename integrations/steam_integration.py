@@ -1,22 +1,22 @@
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
 from bot.config import config
+from bot.utils.cache import cached
+from bot.services.api_gateway import get_api_gateway
+from bot.services.http_session import get_http_session
 import json
 
 class SteamIntegration:
     """Интеграция с Steam API для CS:GO и Dota 2"""
     
     def __init__(self):
+        self.gateway = get_api_gateway()
         self.api_key = config.STEAM_API_KEY
         self.base_url = "https://api.steampowered.com"
-        self.session = None
     
     async def get_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        return get_http_session()
     
     async def verify_steam_account(self, steam_id: str) -> Dict:
         """Проверить Steam аккаунт"""
@@ -27,7 +27,7 @@ class SteamIntegration:
         }
         
         session = await self.get_session()
-        async with session.get(url, params=params) as response:
+        async with self.gateway.get(session, url, 'steam', params=params) as response:
             if response.status == 200:
                 data = await response.json()
                 players = data.get('response', {}).get('players', [])
@@ -35,6 +35,7 @@ class SteamIntegration:
                     return players[0]
         return {}
     
+    @cached('csgo_stats', game='csgo')
     async def get_csgo_stats(self, steam_id: str) -> Dict:
         """Получить статистику CS:GO"""
         url = f"{self.base_url}/ISteamUserStats/GetUserStatsForGame/v2/"
@@ -45,12 +46,13 @@ class SteamIntegration:
         }
         
         session = await self.get_session()
-        async with session.get(url, params=params) as response:
+        async with self.gateway.get(session, url, 'steam', params=params) as response:
             if response.status == 200:
                 data = await response.json()
                 return data.get('playerstats', {}).get('stats', [])
         return []
     
+    @cached('dota_stats', game='dota2')
     async def get_dota_stats(self, steam_id: str) -> Dict:
         """Получить статистику Dota 2"""
         url = f"{self.base_url}/ISteamUserStats/GetUserStatsForGame/v2/"
@@ -61,12 +63,13 @@ class SteamIntegration:
         }
         
         session = await self.get_session()
-        async with session.get(url, params=params) as response:
+        async with self.gateway.get(session, url, 'steam', params=params) as response:
             if response.status == 200:
                 data = await response.json()
                 return data.get('playerstats', {}).get('stats', [])
         return []
     
+    @cached('steam_recent_matches')
     async def get_recent_matches(self, steam_id: str, game: str, count: int = 10) -> List[Dict]:
         """Получить последние матчи"""
         if game == 'dota2':
@@ -75,7 +78,7 @@ class SteamIntegration:
             params = {'limit': count}
             
             session = await self.get_session()
-            async with session.get(url, params=params) as response:
+            async with self.gateway.get(session, url, 'opendota', params=params) as response:
                 if response.status == 200:
                     return await response.json()
         elif game == 'csgo':
@@ -105,7 +108,7 @@ class SteamIntegration:
         }
         
         session = await self.get_session()
-        async with session.get(url, params=params) as response:
+        async with self.gateway.get(session, url, 'steam', params=params) as response:
             if response.status == 200:
                 data = await response.json()
                 return data.get('friendslist', {}).get('friends', [])
@@ -113,5 +116,5 @@ class SteamIntegration:
     
     async def close(self):
         """Закрыть сессию"""
-        if self.session:
-            await self.session.close()
\ No newline at end of file
+        # Сессия общая для процесса и закрывается при остановке бота
+        pass
\ No newline at end of file
@@ -1,14 +1,19 @@
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
 from bot.config import config
+from bot.utils.cache import cached
+from bot.services.api_gateway import get_api_gateway
+from bot.services.http_session import get_http_session
+from bot.services.wot_batcher import get_wot_batcher
 import json
 
 class WoTIntegration:
     """Интеграция с World of Tanks API"""
     
     def __init__(self):
+        self.gateway = get_api_gateway()
+        self.batcher = get_wot_batcher()
         self.application_id = config.WOT_APPLICATION_ID
         self.regions = {
             'eu': 'https://api.worldoftanks.eu/wot/',
@@ -16,12 +21,9 @@ class WoTIntegration:
             'na': 'https://api.worldoftanks.com/wot/',
             'asia': 'https://api.worldoftanks.asia/wot/'
         }
-        self.session = None
     
     async def get_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        return get_http_session()
     
     async def find_account(self, nickname: str, region: str = 'ru') -> Optional[Dict]:
         """Найти аккаунт по никнейму"""
@@ -33,52 +35,48 @@ class WoTIntegration:
         }
         
         session = await self.get_session()
-        async with session.get(url, params=params) as response:
+        async with self.gateway.get(session, url, 'wargaming', params=params) as response:
             if response.status == 200:
                 data = await response.json()
                 if data.get('status') == 'ok' and data.get('data'):
                     return data['data'][0]
         return None
     
+    @cached('wot_account_stats', game='wot')
     async def get_account_stats(self, account_id: str, region: str = 'ru') -> Dict:
         """Получить статистику аккаунта"""
-        url = f"{self.regions[region]}account/info/"
-        params = {
-            'application_id': self.application_id,
+        # Одновременные запросы склеиваются в один вызов account/info/ на регион
+        account_data = await self.batcher.get_account_info(
+            account_id,
+            region,
+            'nickname,account_id,statistics.all,global_rating,created_at,last_battle_time'
+        )
+        if not account_data:
+            return {}
+        
+        stats = account_data.get('statistics', {}).get('all', {})
+        
+        # Рассчитываем WN8 (упрощенная версия)
+        wn8 = self.calculate_wn8(stats)
+        
+        return {
             'account_id': account_id,
-            'fields': 'nickname,account_id,statistics.all,global_rating,created_at,last_battle_time'
+            'nickname': account_data.get('nickname', ''),
+            'global_rating': account_data.get('global_rating', 0),
+            'created_at': account_data.get('created_at', 0),
+            'last_battle_time': account_data.get('last_battle_time', 0),
+            'stats': stats,
+            'wn8': wn8,
+            'battles': stats.get('battles', 0),
+            'wins': stats.get('wins', 0),
+            'losses': stats.get('losses', 0),
+            'survived_battles': stats.get('survived_battles', 0),
+            'avg_damage': stats.get('damage_dealt', 0) / max(stats.get('battles', 1), 1),
+            'avg_kills': stats.get('frags', 0) / max(stats.get('battles', 1), 1),
+            'avg_xp': stats.get('xp', 0) / max(stats.get('battles', 1), 1)
         }
-        
-        session = await self.get_session()
-        async with session.get(url, params=params) as response:
-            if response.status == 200:
-                data = await response.json()
-                if data.get('status') == 'ok':
-                    account_data = data.get('data', {}).get(str(account_id), {})
-                    
-                    stats = account_data.get('statistics', {}).get('all', {})
-                    
-                    # Рассчитываем WN8 (упрощенная версия)
-                    wn8 = self.calculate_wn8(stats)
-                    
-                    return {
-                        'account_id': account_id,
-                        'nickname': account_data.get('nickname', ''),
-                        'global_rating': account_data.get('global_rating', 0),
-                        'created_at': account_data.get('created_at', 0),
-                        'last_battle_time': account_data.get('last_battle_time', 0),
-                        'stats': stats,
-                        'wn8': wn8,
-                        'battles': stats.get('battles', 0),
-                        'wins': stats.get('wins', 0),
-                        'losses': stats.get('losses', 0),
-                        'survived_battles': stats.get('survived_battles', 0),
-                        'avg_damage': stats.get('damage_dealt', 0) / max(stats.get('battles', 1), 1),
-                        'avg_kills': stats.get('frags', 0) / max(stats.get('battles', 1), 1),
-                        'avg_xp': stats.get('xp', 0) / max(stats.get('battles', 1), 1)
-                    }
-        return {}
     
+    @cached('wot_tank_stats', game='wot')
     async def get_tank_stats(self, account_id: str, region: str = 'ru') -> List[Dict]:
         """Получить статистику по танкам"""
         url = f"{self.regions[region]}account/tanks/"
@@ -89,7 +87,7 @@ class WoTIntegration:
         }
         
         session = await self.get_session()
-        async with session.get(url, params=params) as response:
+        async with self.gateway.get(session, url, 'wargaming', params=params) as response:
             if response.status == 200:
                 data = await response.json()
                 if data.get('status') == 'ok':
@@ -150,5 +148,5 @@ class WoTIntegration:
     
     async def close(self):
         """Закрыть сессию"""
-        if self.session:
-            await self.session.close()
\ No newline at end of file
+        # Сессия общая для процесса и закрывается при остановке бота
+        pass
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""Индексы для горячих запросов Match, GameAccount, Subscription, MatchUpdate
+
+Revision ID: 0001_hot_query_indexes
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+Таблицы создаются через Base.metadata.create_all, поэтому в новой базе
+индексы уже есть (объявлены в моделях) — здесь они создаются только если
+их нет. Для таблицы, которой еще нет, индексы создаст create_all.
+На Postgres индексы строятся CONCURRENTLY, чтобы не блокировать запись.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_hot_query_indexes'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя, таблица, колонки, условие частичного индекса)
+INDEXES = [
+    ('ix_game_accounts_user_game', 'game_accounts', ['user_id', 'game'], None),
+    ('ix_subscriptions_active_end_date', 'subscriptions', ['end_date'],
+     sa.column('is_active') == sa.true()),
+    ('ix_matches_tracked_open', 'matches', ['user_id'],
+     sa.and_(sa.column('is_tracked') == sa.true(), sa.column('is_completed') == sa.false())),
+    ('ix_matches_start_time', 'matches', ['start_time'], None),
+    ('ix_match_updates_match_time', 'match_updates', ['match_id', 'update_time'], None),
+]
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        tables = {table for _, table, _, _ in INDEXES}
+    else:
+        tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, condition in INDEXES:
+            if table not in tables:
+                continue
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_where=condition,
+                sqlite_where=condition,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
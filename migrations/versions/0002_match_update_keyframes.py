@@ -0,0 +1,43 @@
+"""Признак ключевого кадра в match_updates
+
+Revision ID: 0002_match_update_keyframes
+Revises: 0001_hot_query_indexes
+Create Date: 2026-10-17 00:00:00
+
+История live-обновлений хранится ключевыми кадрами (полный снимок) и
+дельтами к предыдущему обновлению. Все существующие строки — полные снимки,
+поэтому колонка добавляется со значением true по умолчанию.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_match_update_keyframes'
+down_revision: Union[str, None] = '0001_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column() -> bool:
+    if op.get_context().as_sql:
+        return False
+    inspector = sa.inspect(op.get_bind())
+    if 'match_updates' not in inspector.get_table_names():
+        # Таблицу вместе с колонкой создаст create_all
+        return True
+    return any(column['name'] == 'is_keyframe' for column in inspector.get_columns('match_updates'))
+
+
+def upgrade() -> None:
+    if not _has_column():
+        op.add_column(
+            'match_updates',
+            sa.Column('is_keyframe', sa.Boolean(), nullable=True, server_default=sa.true())
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('match_updates', 'is_keyframe')
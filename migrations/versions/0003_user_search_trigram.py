@@ -0,0 +1,67 @@
+"""Триграммный поиск пользователей по username
+
+Revision ID: 0003_user_search_trigram
+Revises: 0002_match_update_keyframes
+Create Date: 2026-10-17 00:00:00
+
+Поиск по части username (LIKE '%x%') не использует B-tree индекс.
+На Postgres — GIN-индекс pg_trgm, который обслуживает ILIKE '%x%'.
+На SQLite — внешняя FTS5-таблица users_fts с токенизатором trigram,
+синхронизируемая триггерами. В моделях индекс не объявлен: create_all
+выполняется до миграций и без расширения pg_trgm упал бы.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_user_search_trigram'
+down_revision: Union[str, None] = '0002_match_update_keyframes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts
+       USING fts5(username, content='users', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+           INSERT INTO users_fts(rowid, username) VALUES (new.id, new.username);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+           INSERT INTO users_fts(users_fts, rowid, username) VALUES ('delete', old.id, old.username);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF username ON users BEGIN
+           INSERT INTO users_fts(users_fts, rowid, username) VALUES ('delete', old.id, old.username);
+           INSERT INTO users_fts(rowid, username) VALUES (new.id, new.username);
+       END""",
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_users_username_trgm', 'users', ['username'],
+                if_not_exists=True,
+                postgresql_using='gin',
+                postgresql_ops={'username': 'gin_trgm_ops'},
+                postgresql_concurrently=True
+            )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_users_username_trgm', table_name='users',
+                          if_exists=True, postgresql_concurrently=True)
+    elif dialect == 'sqlite':
+        for trigger in ('users_fts_insert', 'users_fts_delete', 'users_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS users_fts")
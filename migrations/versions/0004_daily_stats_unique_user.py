@@ -0,0 +1,39 @@
+"""Одна строка daily_stats на пользователя
+
+Revision ID: 0004_daily_stats_unique_user
+Revises: 0003_user_search_trigram
+Create Date: 2026-10-17 00:00:00
+
+Дневной лимит считается атомарным upsert по user_id с ленивым сбросом,
+для ON CONFLICT нужен уникальный индекс. Дубликаты, если они есть,
+удаляются — остается последняя строка пользователя.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_daily_stats_unique_user'
+down_revision: Union[str, None] = '0003_user_search_trigram'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not op.get_context().as_sql:
+        if 'daily_stats' not in sa.inspect(op.get_bind()).get_table_names():
+            # Таблицу вместе с индексом создаст create_all
+            return
+
+    op.execute(
+        "DELETE FROM daily_stats WHERE user_id IS NOT NULL AND id NOT IN "
+        "(SELECT max(id) FROM daily_stats WHERE user_id IS NOT NULL GROUP BY user_id)"
+    )
+    op.create_index('ix_daily_stats_user_id', 'daily_stats', ['user_id'],
+                    unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_stats_user_id', table_name='daily_stats', if_exists=True)
@@ -0,0 +1,82 @@
+"""user_id подписок, аккаунтов и платежей — users.id, а не Telegram ID
+
+Revision ID: 0005_rekey_user_ids
+Revises: 0004_daily_stats_unique_user
+Create Date: 2026-10-18 00:00:00
+
+Часть хендлеров записывала в game_accounts.user_id, subscriptions.user_id
+и payments.user_id Telegram ID пользователя, хотя колонки ссылаются на
+users.id. Такие строки переписываются на users.id через users.telegram_id;
+строки, user_id которых уже совпадает с users.id, не трогаются.
+
+Если у пользователя есть подписка под обоими ключами (уникальный
+subscriptions.user_id), остается подписка с более поздним end_date.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_rekey_user_ids'
+down_revision: Union[str, None] = '0004_daily_stats_unique_user'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('game_accounts', 'subscriptions', 'payments')
+
+# user_id строки — Telegram ID существующего пользователя, а не users.id
+KEYED_BY_TELEGRAM_ID = (
+    "NOT EXISTS (SELECT 1 FROM users WHERE users.id = {t}.user_id) "
+    "AND EXISTS (SELECT 1 FROM users WHERE users.telegram_id = {t}.user_id)"
+)
+
+# Подписка под Telegram ID, у владельца которой есть подписка под users.id
+# с не меньшим end_date
+TELEGRAM_DUPLICATE_LOSES = (
+    KEYED_BY_TELEGRAM_ID.format(t='subscriptions')
+    + " AND EXISTS (SELECT 1 FROM subscriptions kept"
+    " JOIN users ON users.id = kept.user_id"
+    " WHERE users.telegram_id = subscriptions.user_id"
+    " AND (subscriptions.end_date IS NULL OR kept.end_date >= subscriptions.end_date))"
+)
+
+# Подписка под users.id, у владельца которой осталась подписка под Telegram ID
+USER_DUPLICATE_LOSES = (
+    "EXISTS (SELECT 1 FROM subscriptions other"
+    " JOIN users ON users.telegram_id = other.user_id"
+    " WHERE users.id = subscriptions.user_id"
+    " AND NOT EXISTS (SELECT 1 FROM users owner WHERE owner.id = other.user_id))"
+)
+
+
+def upgrade() -> None:
+    tables = TABLES
+    if not op.get_context().as_sql:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+        if 'users' not in existing:
+            # Пустая база — таблицы создаст create_all
+            return
+        tables = [table for table in TABLES if table in existing]
+
+    if 'subscriptions' in tables:
+        for duplicate in (TELEGRAM_DUPLICATE_LOSES, USER_DUPLICATE_LOSES):
+            if 'payments' in tables:
+                op.execute(
+                    "UPDATE payments SET subscription_id = NULL WHERE subscription_id IN "
+                    "(SELECT id FROM subscriptions WHERE " + duplicate + ")"
+                )
+            op.execute("DELETE FROM subscriptions WHERE " + duplicate)
+
+    for table in tables:
+        op.execute(
+            f"UPDATE {table} SET user_id = "
+            f"(SELECT users.id FROM users WHERE users.telegram_id = {table}.user_id) "
+            f"WHERE " + KEYED_BY_TELEGRAM_ID.format(t=table)
+        )
+
+
+def downgrade() -> None:
+    # Данные переписаны в верные ключи; обратное преобразование не нужно
+    pass